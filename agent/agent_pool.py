@@ -0,0 +1,151 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+
+class AgentPoolTimeout(Exception):
+    """Nenhum agente ficou livre dentro do tempo de espera"""
+
+
+class AgentPool:
+    """
+    Pool de agentes OABAgent ja construidos (LLM, prompt e AgentExecutor),
+    compartilhado entre as perguntas do servidor. Cada pergunta pega um agente
+    emprestado e devolve no final; a query (sincrona) roda numa thread do
+    proprio pool, entao ate size perguntas andam ao mesmo tempo. No stream
+    o agente fica emprestado ate o ultimo evento.
+    """
+
+    def __init__(self, size: Optional[int] = None, llm_provider: Optional[str] = None,
+                 api_base_url: Optional[str] = None, lease_timeout: Optional[float] = None,
+                 factory: Optional[Callable[[], Any]] = None):
+        from .config import Config
+        self.size = size or Config.AGENT_POOL_SIZE
+        self.llm_provider = llm_provider or Config.LLM_PROVIDER
+        self.api_base_url = api_base_url
+        self.lease_timeout = lease_timeout if lease_timeout is not None else Config.AGENT_POOL_LEASE_TIMEOUT
+        self.factory = factory or self._novo_agente
+
+        self._agents: List[Any] = []
+        self._queue: "asyncio.Queue[Any]" = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started = False
+        self._leased = 0
+        self._waiting = 0
+        self._total_queries = 0
+        self._paths: Dict[str, int] = {}
+
+    def _novo_agente(self):
+        from .llm_agent import OABAgent
+        return OABAgent(api_base_url=self.api_base_url, llm_provider=self.llm_provider)
+
+    async def start(self) -> "AgentPool":
+        ''' Constroi os agentes (em paralelo, fora do event loop) '''
+        if self._started:
+            return self
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="agent-pool")
+        loop = asyncio.get_running_loop()
+        try:
+            self._agents = list(await asyncio.gather(
+                *(loop.run_in_executor(self._executor, self.factory) for _ in range(self.size))
+            ))
+        except Exception:
+            await self.stop()
+            raise
+        for agent in self._agents:
+            self._queue.put_nowait(agent)
+        self._started = True
+        print(f"Pool de agentes iniciado: {self.size} agente(s) ({self.llm_provider})")
+        return self
+
+    async def stop(self):
+        self._started = False
+        self._agents = []
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    @asynccontextmanager
+    async def agent(self):
+        ''' Empresta um agente: async with pool.agent() as agent '''
+        if not self._started:
+            raise RuntimeError("Pool de agentes nao iniciado")
+        self._waiting += 1
+        try:
+            agent = await asyncio.wait_for(self._queue.get(), timeout=self.lease_timeout)
+        except asyncio.TimeoutError:
+            raise AgentPoolTimeout(f"Nenhum agente livre no pool apos {self.lease_timeout}s")
+        finally:
+            self._waiting -= 1
+        self._leased += 1
+        try:
+            yield agent
+        finally:
+            self._leased -= 1
+            self._queue.put_nowait(agent)
+
+    async def query(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        ''' Resposta e last_query do agente (com o tempo de espera por um agente livre em "wait") '''
+        inicio = time.perf_counter()
+        async with self.agent() as agent:
+            espera = time.perf_counter() - inicio
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self._executor, agent.query, question)
+            info = {**agent.last_query, "wait": round(espera, 3)}
+        self._contar(info)
+        return response, info
+
+    async def stream(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        ''' Eventos do astream_query de um agente do pool (o evento final leva o "wait") '''
+        inicio = time.perf_counter()
+        async with self.agent() as agent:
+            espera = round(time.perf_counter() - inicio, 3)
+            async for evento in agent.astream_query(question):
+                if evento["event"] == "final":
+                    evento = {**evento, "wait": espera}
+                    self._contar(evento)
+                yield evento
+
+    def _contar(self, info: Dict[str, Any]):
+        self._total_queries += 1
+        path = info.get("path")
+        if path:
+            self._paths[path] = self._paths.get(path, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "llm_provider": self.llm_provider,
+            "leased": self._leased,
+            "available": self._queue.qsize() if self._queue else 0,
+            "waiting": self._waiting,
+            "total_queries": self._total_queries,
+            "paths": dict(self._paths),
+        }
+
+
+# Pool global usado pelo servidor do agente (iniciado no startup do FastAPI)
+_pool: Optional[AgentPool] = None
+
+
+def get_agent_pool() -> Optional[AgentPool]:
+    return _pool
+
+
+async def start_agent_pool(**kwargs) -> AgentPool:
+    global _pool
+    if _pool is None:
+        pool = AgentPool(**kwargs)
+        await pool.start()
+        _pool = pool
+    return _pool
+
+
+async def stop_agent_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.stop()
@@ -31,7 +31,32 @@ class Config:
     MAX_ITERATIONS: int = int(os.getenv("MAX_ITERATIONS", "5"))
     TIMEOUT: int = int(os.getenv("TIMEOUT", "120"))
     VERBOSE: bool = os.getenv("VERBOSE", "true").lower() == "true"
-    
+
+    # Ferramenta oab_search (chamadas a API do scraper)
+    TOOL_TIMEOUT: float = float(os.getenv("TOOL_TIMEOUT", os.getenv("TIMEOUT", "120")))  # segundos
+    TOOL_CONNECT_TIMEOUT: float = float(os.getenv("TOOL_CONNECT_TIMEOUT", "5"))
+    TOOL_RETRIES: int = int(os.getenv("TOOL_RETRIES", "2"))  # so erros de conexao e 502/503/504
+    TOOL_RETRY_BACKOFF: float = float(os.getenv("TOOL_RETRY_BACKOFF", "0.5"))  # dobra a cada tentativa
+    TOOL_MAX_CONNECTIONS: int = int(os.getenv("TOOL_MAX_CONNECTIONS", "20"))
+
+    # Memoizacao das observacoes da ferramenta (mesmo nome/UF entre queries do agente)
+    TOOL_CACHE_ENABLED: bool = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+    TOOL_CACHE_TTL: float = float(os.getenv("TOOL_CACHE_TTL", "3600"))  # segundos
+    TOOL_CACHE_SIZE: int = int(os.getenv("TOOL_CACHE_SIZE", "1000"))
+
+    # Atalho sem LLM p/ perguntas com nome completo e UF explicitos
+    FAST_PATH_ENABLED: bool = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+
+    # Cache exato das respostas do LLM (SQLite): provedor + modelo/temperatura + prompt
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", "10000"))  # respostas; sai a usada ha mais tempo
+
+    # Servidor HTTP do agente (python main.py server)
+    AGENT_SERVER_PORT: int = int(os.getenv("AGENT_SERVER_PORT", "8001"))
+    AGENT_POOL_SIZE: int = int(os.getenv("AGENT_POOL_SIZE", "4"))  # agentes pre-construidos = perguntas simultaneas
+    AGENT_POOL_LEASE_TIMEOUT: float = float(os.getenv("AGENT_POOL_LEASE_TIMEOUT", "60"))  # espera por um agente livre
+
     @classmethod
     def validate(cls) -> bool:
         """Validar configurações"""
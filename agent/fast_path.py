@@ -0,0 +1,126 @@
+import json
+import re
+from typing import List, Optional, Tuple
+
+UFS = {"AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA", "PB",
+       "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO"}
+
+# UF em maiusculo solta na frase, ou depois de "uf"/"seccional"/"estado" (qualquer caixa)
+_UF_SOLTA = re.compile(r"(?<![A-Za-zÀ-ÿ])([A-Z]{2})(?![A-Za-zÀ-ÿ])")
+_UF_ROTULADA = re.compile(r"\b(?:uf|seccional|estado)\s*(?:de|do|da)?\s*[:=\-]?\s*([A-Za-z]{2})(?![A-Za-zÀ-ÿ])", re.IGNORECASE)
+
+# Onde o nome comeca: "nome: ...", "advogado ...", "Dr. ..." ou o inicio da frase
+_INICIO_NOME = re.compile(r"\bnome\s*[:=]\s*|\badvogad[oa]\s+|\bdra?\.?\s+", re.IGNORECASE)
+
+# Conectores entre o nome e a UF ("na UF", "em", "da seccional de", ",", "(", "-"...)
+_CAUDA = re.compile(
+    r"(?:[\s,;:(\-/]|\b(?:na|no|em|de|do|da|pela|pelo|uf|seccional|estado|oab)\b)*$", re.IGNORECASE
+)
+
+# Mais de um advogado/UF na mesma pergunta
+_CONECTIVOS = re.compile(r"(?<![A-Za-zÀ-ÿ'])(?:e|ou)(?![A-Za-zÀ-ÿ'])|&", re.IGNORECASE)
+
+_PALAVRA_NOME = re.compile(r"^[A-Za-zÀ-ÿ][A-Za-zÀ-ÿ'’\-]*$")
+_PARTICULAS = {"de", "da", "do", "dos", "das", "d'"}
+# Palavras que indicam que o trecho nao e so um nome (pergunta mais complexa: vai para o LLM)
+_NAO_NOME = {
+    "qual", "quais", "quem", "como", "onde", "quando", "quantos", "quantas", "situacao", "situação",
+    "numero", "número", "oab", "inscricao", "inscrição", "advogado", "advogada", "advogados", "e", "ou",
+    "o", "a", "os", "as", "um", "uma", "sobre", "buscar", "busque", "consultar", "consulte", "pesquise",
+    "todos", "todas", "com", "sem", "que", "para", "por", "entre", "compare", "nome", "uf",
+    "mostre", "mostrar", "diga", "informe", "verifique", "veja", "procure", "encontre", "existe", "me",
+    # Preposicoes que nao sao particulas de nome terminam o nome ("Ana Souza em Sao Paulo")
+    "em", "na", "no", "nas", "nos", "num", "numa", "pela", "pelo", "pelas", "pelos", "ao", "aos", "à", "às",
+}
+
+
+def _uf(pergunta: str) -> Optional[Tuple[str, int, int]]:
+    ''' A UF da pergunta, onde comeca a mencao ("na UF SP") e onde termina; None se nao houver exatamente uma '''
+    encontradas = {}
+    for match in _UF_ROTULADA.finditer(pergunta):
+        uf = match.group(1).upper()
+        if uf in UFS:
+            encontradas.setdefault(uf, (match.start(), match.end()))
+    for match in _UF_SOLTA.finditer(pergunta):
+        if match.group(1) in UFS:
+            encontradas.setdefault(match.group(1), (match.start(), match.end()))
+    if len(encontradas) != 1:
+        return None
+    uf, (inicio, fim) = next(iter(encontradas.items()))
+    return uf, inicio, fim
+
+
+def _palavra_de_nome(palavra: str, maiuscula: bool) -> bool:
+    if palavra.lower() in _PARTICULAS:
+        return True
+    if not _PALAVRA_NOME.match(palavra) or palavra.lower() in _NAO_NOME:
+        return False
+    return not maiuscula or palavra[0].isupper()
+
+
+def _nome(trecho: str, maiuscula: bool) -> Tuple[Optional[str], List[str]]:
+    ''' As ultimas palavras do trecho que formam um nome (sem particulas nas pontas) e o que sobra antes '''
+    palavras = trecho.split()
+    inicio = len(palavras)
+    while inicio > 0 and _palavra_de_nome(palavras[inicio - 1], maiuscula):
+        inicio -= 1
+    while inicio < len(palavras) and palavras[inicio].lower() in _PARTICULAS:
+        inicio += 1
+    nome = palavras[inicio:]
+    if not 2 <= len(nome) <= 8 or nome[-1].lower() in _PARTICULAS:
+        return None, palavras[:inicio]
+    return " ".join(nome), palavras[:inicio]
+
+
+def extrair_consulta(pergunta: str) -> Optional[Tuple[str, str]]:
+    """
+    Nome completo e UF de perguntas diretas ("situação do advogado Fulano de Tal
+    na UF SP", "nome: Fulano de Tal, uf: SP", "Qual a OAB de Fulano de Tal em SP?").
+    Retorna None quando houver qualquer duvida (nenhuma ou varias UFs, mais de
+    um nome, nome curto, algo pedido depois da UF): essas perguntas vao para o LLM.
+    """
+    pergunta = (pergunta or "").strip()
+    if _CONECTIVOS.search(pergunta):
+        return None
+    achou = _uf(pergunta)
+    if achou is None:
+        return None
+    uf, inicio, fim = achou
+    # Depois da UF so pode sobrar pontuacao (senao a pergunta pede mais que a busca)
+    if re.search(r"[A-Za-zÀ-ÿ0-9]", pergunta[fim:]):
+        return None
+
+    antes = _CAUDA.sub("", pergunta[:inicio])
+    marcadores = list(_INICIO_NOME.finditer(antes))
+    if marcadores:
+        # "nome:", "advogado", "Dr." marcam o nome: aceita minusculas
+        nome, resto = _nome(antes[marcadores[-1].end():], maiuscula=False)
+        if resto:
+            return None
+    else:
+        # Sem marcador, so nomes com iniciais maiusculas no inicio da pergunta
+        # ou depois de "de/do/da" ("Qual a OAB de Fulano de Tal em SP?")
+        nome, resto = _nome(antes, maiuscula=True)
+        if resto and resto[-1].lower() not in _PARTICULAS:
+            return None
+    if nome is None:
+        return None
+    return nome, uf
+
+
+def responder(nome: str, uf: str, observacao: str) -> str:
+    ''' Resposta em portugues a partir da observacao da ferramenta oab_search '''
+    try:
+        dados = json.loads(observacao)
+    except (TypeError, ValueError):
+        dados = None
+    if isinstance(dados, dict):
+        return (
+            f"O advogado {dados.get('name', nome)} ({dados.get('uf', uf)}) tem inscrição na OAB "
+            f"nº {dados.get('oab', 'N/A')}. Categoria: {dados.get('categoria', 'N/A')}. "
+            f"Data de inscrição: {dados.get('data_inscricao', 'N/A')}. "
+            f"Situação: {dados.get('situacao', 'N/A')}."
+        )
+    if observacao.startswith("Erro na busca: Nenhum resultado"):
+        return f"Não encontrei nenhum advogado com o nome {nome} na seccional {uf}."
+    return f"Não foi possível consultar a OAB para {nome} ({uf}) agora. {observacao}"
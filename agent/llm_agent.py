@@ -2,34 +2,52 @@ import os
 import re
 import requests
 import json
-from typing import List, Optional, Dict, Any, Union
+from typing import AsyncIterator, List, Optional, Dict, Any, Union
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import Ollama
 from langchain_openai import ChatOpenAI
 from .oab_tool import OABSearchTool
+from .tool_cache import contar_consulta, get_tool_cache
+from .fast_path import extrair_consulta, responder
+from .llm_cache import ProviderCache, get_llm_cache
 import logging
+import time
 
 # Config logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+FINAL_ANSWER = "Final Answer:"
+
+
+def _pensamento(log: str) -> str:
+    ''' O "Thought" de uma saida do ReAct (o texto antes da Action ou da Final Answer) '''
+    texto = re.split(r"\n?\s*(?:Action\s*\d*\s*:|Final Answer:)", log or "", maxsplit=1)[0].strip()
+    return re.sub(r"^Thought\s*:\s*", "", texto).strip()
+
 
 class OABAgent:
     ''' Um Agente LLM para consultas sobre advogados na OAB '''
     
-    def __init__(self, api_base_url: str = None, llm_provider: str = "openai"):
+    def __init__(self, api_base_url: str = None, llm_provider: str = "openai", fast_path: Optional[bool] = None):
         ''' Inicializa o agente. 
         Args:
             api_base_url: URL base da API do scraper
             llm_provider: 'openai', 'ollama' ou pode ser o 'mock'
+            fast_path: responder sem o LLM quando a pergunta ja traz nome e UF (padrao: FAST_PATH_ENABLED)
         '''
+        from .config import Config
         # Usar variável de ambiente se não fornecida
         self.api_base_url = api_base_url or os.getenv("SCRAPER_API_URL", "http://scraper-api:8000")
         self.llm_provider = llm_provider
+        self.fast_path = fast_path if fast_path is not None else Config.FAST_PATH_ENABLED
 
-        # Iniciar ferramentas
-        self.tools = [OABSearchTool(api_base_url=self.api_base_url)]
+        # Iniciar ferramentas (observacoes memoizadas entre as queries)
+        self.tool_cache = get_tool_cache()
+        self.tools = [OABSearchTool(api_base_url=self.api_base_url, cache=self.tool_cache)]
+        # Caminho (fast_path/llm), chamadas da ferramenta, acertos do cache e tempo da ultima query
+        self.last_query: Dict[str, Any] = {}
         
         # Iniciar a LLM
         self.llm = self._setup_llm()
@@ -61,7 +79,8 @@ class OABAgent:
                     model=model,
                     temperature=0.1,
                     max_tokens=1000,
-                    openai_api_key=api_key
+                    openai_api_key=api_key,
+                    cache=self._llm_cache()
                 )
                 logger.info("✅ ChatOpenAI configurado com sucesso!")
                 return llm
@@ -81,15 +100,22 @@ class OABAgent:
                 max_tokens=1000,
                 openai_api_key=api_key,
                 openai_api_base=api_base,
-                default_headers={"Authorization": f"Bearer {cf_token}"} if cf_token else {}
+                default_headers={"Authorization": f"Bearer {cf_token}"} if cf_token else {},
+                cache=self._llm_cache()
             )
         elif self.llm_provider == "ollama":
             return Ollama(model="llama2",
-                          temperature=0.1)
+                          temperature=0.1,
+                          cache=self._llm_cache())
         elif self.llm_provider == "cloudflare":
-            return CloudflareLLM()
+            return CloudflareLLM(cache=get_llm_cache())
         else:
             return MockLLM() # Para testes local
+
+    def _llm_cache(self) -> Optional[ProviderCache]:
+        ''' Cache das respostas para os modelos do LangChain (None se LLM_CACHE_ENABLED=false) '''
+        store = get_llm_cache()
+        return ProviderCache(store, self.llm_provider) if store is not None else None
     
     def _create_prompt(self) -> PromptTemplate:
         ''' Cria o prompt para o agente '''
@@ -156,27 +182,134 @@ Question: {input}
         Returns:
             A resposta do agente
         """
+        inicio = time.perf_counter()
+        # Pergunta direta (nome completo + UF): busca e responde sem passar pelo LLM
+        consulta = extrair_consulta(question) if self.fast_path else None
+        with contar_consulta() as contagem:
+            if consulta is not None:
+                path = "fast_path"
+                name, uf = consulta
+                response = responder(name, uf, self.tools[0]._run(name, uf))
+            else:
+                path = "llm"
+                try:
+                    # Executa o agente
+                    result = self.agent.invoke({"input": question})
+
+                    # Extrair resposta
+                    response = result.get("output", "Não foi possível processar a pergunta")
+                except Exception as e:
+                    response = f"Desculpe, ocorreu um erro ao processar a pergunta: {str(e)}"
+        self.last_query = {"path": path, **contagem, "elapsed": round(time.perf_counter() - inicio, 3)}
+        logger.info(f"Query finalizada ({path}): {self.last_query['tool_calls']} chamada(s) da ferramenta, "
+                    f"{self.last_query['cache_hits']} do cache, {self.last_query['elapsed']}s")
+        return response
+
+    async def astream_query(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Versao assincrona do query que emite os eventos conforme acontecem.
+        Args:
+            question: A pergunta do usuário em português
+        Yields:
+            {"event": "thought", "text"}, {"event": "tool_start", "tool", "input"},
+            {"event": "tool_result", "tool", "output"}, {"event": "token", "text"}
+            (trechos da resposta final; um so trecho se o LLM nao fizer streaming)
+            e por ultimo {"event": "final", "answer", ...last_query}
+        """
+        inicio = time.perf_counter()
+        consulta = extrair_consulta(question) if self.fast_path else None
+        with contar_consulta() as contagem:
+            if consulta is not None:
+                path = "fast_path"
+                name, uf = consulta
+                tool = self.tools[0]
+                yield {"event": "tool_start", "tool": tool.name, "input": {"name": name, "uf": uf}}
+                observacao = await tool._arun(name, uf)
+                yield {"event": "tool_result", "tool": tool.name, "output": observacao}
+                response = responder(name, uf, observacao)
+                yield {"event": "token", "text": response}
+            else:
+                path = "llm"
+                response = None
+                async for evento in self._eventos_do_agente(question):
+                    if evento["event"] == "final":
+                        response = evento["answer"]
+                    else:
+                        yield evento
+        self.last_query = {"path": path, **contagem, "elapsed": round(time.perf_counter() - inicio, 3)}
+        logger.info(f"Query (stream) finalizada ({path}): {self.last_query['tool_calls']} chamada(s) da ferramenta, "
+                    f"{self.last_query['cache_hits']} do cache, {self.last_query['elapsed']}s")
+        yield {"event": "final", "answer": response, **self.last_query}
+
+    async def _eventos_do_agente(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        ''' Traduz os eventos do AgentExecutor (astream_events) nos eventos do astream_query '''
+        gerado: Dict[str, str] = {}  # texto de cada chamada do LLM ate agora (por run_id)
+        em_resposta: set = set()     # chamadas do LLM que ja chegaram na Final Answer
+        response = None
         try:
-            # Executa o agente
-            result = self.agent.invoke({"input": question})
-            
-            # Extrair resposta
-            response = result.get("output", "Não foi possível processar a pergunta")
-            
-            return response
+            async for ev in self.agent.astream_events({"input": question}, version="v2"):
+                tipo = ev["event"]
+                if tipo in ("on_chat_model_stream", "on_llm_stream"):
+                    chunk = ev["data"].get("chunk")
+                    texto = getattr(chunk, "content", None) or getattr(chunk, "text", None) or ""
+                    if not isinstance(texto, str):
+                        continue
+                    run_id = ev["run_id"]
+                    anterior = gerado.get(run_id, "")
+                    atual = gerado[run_id] = anterior + texto
+                    marcador = atual.find(FINAL_ANSWER)
+                    if marcador < 0:
+                        continue
+                    if run_id not in em_resposta:
+                        # Primeiro trecho da resposta: o pensamento vem antes dele
+                        em_resposta.add(run_id)
+                        pensamento = _pensamento(atual[:marcador])
+                        if pensamento:
+                            yield {"event": "thought", "text": pensamento}
+                    trecho = atual[max(marcador + len(FINAL_ANSWER), len(anterior)):]
+                    if len(anterior) <= marcador + len(FINAL_ANSWER):
+                        trecho = trecho.lstrip()
+                    if trecho:
+                        yield {"event": "token", "text": trecho}
+                elif tipo == "on_tool_start":
+                    yield {"event": "tool_start", "tool": ev["name"], "input": ev["data"].get("input")}
+                elif tipo == "on_tool_end":
+                    yield {"event": "tool_result", "tool": ev["name"], "output": str(ev["data"].get("output"))}
+                elif tipo == "on_chain_stream" and not ev.get("parent_ids"):
+                    # Saidas do proprio AgentExecutor: acoes decididas e a resposta final
+                    chunk = ev["data"]["chunk"]
+                    for action in chunk.get("actions", []):
+                        pensamento = _pensamento(getattr(action, "log", ""))
+                        if pensamento:
+                            yield {"event": "thought", "text": pensamento}
+                    if "output" in chunk:
+                        response = chunk["output"]
+                        if not em_resposta:
+                            # LLM sem streaming: pensamento e resposta chegam inteiros
+                            mensagens = chunk.get("messages") or []
+                            pensamento = _pensamento(mensagens[-1].content) if mensagens else ""
+                            if pensamento:
+                                yield {"event": "thought", "text": pensamento}
+                            yield {"event": "token", "text": response}
         except Exception as e:
-            return f"Desculpe, ocorreu um erro ao processar a pergunta: {str(e)}"
+            response = f"Desculpe, ocorreu um erro ao processar a pergunta: {str(e)}"
+            yield {"event": "token", "text": response}
+        if response is None:
+            response = "Não foi possível processar a pergunta"
+            yield {"event": "token", "text": response}
+        yield {"event": "final", "answer": response}
 
 
 class CloudflareLLM:
     """LLM usando Cloudflare Workers AI"""
     
-    def __init__(self):
-        from config import Config
+    def __init__(self, cache: Optional[Any] = None):
+        from .config import Config
         self.account_id = Config.CF_ACCOUNT_ID
         self.api_token = Config.CF_API_TOKEN
         self.model = Config.CF_MODEL
         self.temperature = 0.1
+        self.cache = cache  # LLMCache: prompts repetidos nao viram outra chamada
         
         if not self.account_id or not self.api_token:
             raise ValueError("CF_ACCOUNT_ID e CF_API_TOKEN são obrigatórios para usar Cloudflare Workers AI")
@@ -193,8 +326,15 @@ class CloudflareLLM:
                 prompt_text = str(prompt)
         else:
             prompt_text = prompt
+
+        llm_string = f"{self.model}|temperature={self.temperature}"
+        if self.cache is not None:
+            cached = self.cache.get("cloudflare", llm_string, prompt_text)
+            if cached is not None:
+                return cached
         
         try:
+            inicio = time.perf_counter()
             url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/ai/run/{self.model}"
             headers = {
                 "Authorization": f"Bearer {self.api_token}",
@@ -206,7 +346,7 @@ class CloudflareLLM:
                     {"role": "system", "content": "You are a friendly assistant"},
                     {"role": "user", "content": prompt_text}
                 ],
-                "temperature": 0.1
+                "temperature": self.temperature
             }
             
             response = requests.post(url, headers=headers, json=data, timeout=30)
@@ -214,7 +354,10 @@ class CloudflareLLM:
             
             result = response.json()
             if result.get("success") and result.get("result"):
-                return result["result"]["response"]
+                resposta = result["result"]["response"]
+                if self.cache is not None:
+                    self.cache.set("cloudflare", llm_string, prompt_text, resposta, time.perf_counter() - inicio)
+                return resposta
             else:
                 logger.error(f"Erro na resposta do Cloudflare: {result}")
                 return "Erro ao processar resposta do Cloudflare Workers AI"
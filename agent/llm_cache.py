@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    chave TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    resposta TEXT NOT NULL,
+    latencia REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_completions_uso ON completions (last_used);
+"""
+
+
+class LLMCache:
+    """
+    Cache exato (SQLite) das respostas do LLM, por provedor + modelo/temperatura
+    (llm_string) + prompt. A mesma pergunta ou o mesmo scratchpad do ReAct nao
+    vira outra chamada paga ao provedor. Guarda a latencia da chamada original
+    para medir o tempo economizado; acima de max_entries sai a resposta usada
+    ha mais tempo.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None):
+        from .config import Config
+        self.db_path = db_path if db_path is not None else Config.LLM_CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else Config.LLM_CACHE_SIZE
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Os agentes do pool chamam o LLM de threads diferentes: uma conexao protegida por lock
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._entries = self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def chave(provider: str, llm_string: str, prompt: str) -> str:
+        return hashlib.sha256(f"{provider}\0{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, provider: str, llm_string: str, prompt: str) -> Optional[str]:
+        chave = self.chave(provider, llm_string, prompt)
+        with self._lock:
+            row = self._db.execute("SELECT resposta, latencia FROM completions WHERE chave = ?", (chave,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE completions SET last_used = ? WHERE chave = ?", (time.time(), chave))
+            self._db.commit()
+            self.hits += 1
+            self.saved_seconds += row[1]
+        logger.info(f"Cache do LLM ({provider}): resposta reaproveitada, {row[1]:.2f}s economizados")
+        return row[0]
+
+    def set(self, provider: str, llm_string: str, prompt: str, resposta: str, latencia: float):
+        chave = self.chave(provider, llm_string, prompt)
+        agora = time.time()
+        with self._lock:
+            novo = self._db.execute("SELECT 1 FROM completions WHERE chave = ?", (chave,)).fetchone() is None
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (chave, provider, resposta, latencia, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (chave, provider, resposta, latencia, agora, agora)
+            )
+            self._entries += int(novo)
+            if self._entries > self.max_entries:
+                excesso = self._entries - self.max_entries
+                self._db.execute(
+                    "DELETE FROM completions WHERE chave IN "
+                    "(SELECT chave FROM completions ORDER BY last_used LIMIT ?)", (excesso,)
+                )
+                self._entries -= excesso
+                self.evicted += excesso
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM completions")
+            self._db.commit()
+            self._entries = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        consultas = self.hits + self.misses
+        return {
+            "entries": self._entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "hit_rate": round(self.hits / consultas, 3) if consultas else None,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+class ProviderCache(BaseCache):
+    """
+    Adaptador do LLMCache para os modelos do LangChain (ChatOpenAI, Ollama...):
+    passado em cache=..., o proprio LangChain consulta antes de chamar o provedor.
+    O llm_string do LangChain ja traz modelo, temperatura e stop.
+    """
+
+    def __init__(self, store: LLMCache, provider: str):
+        self.store = store
+        self.provider = provider
+        # Inicio das chamadas que nao estavam no cache (latencia medida no update)
+        self._inicios: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        resposta = self.store.get(self.provider, llm_string, prompt)
+        if resposta is not None:
+            return [loads(g) for g in json.loads(resposta)]
+        with self._lock:
+            if len(self._inicios) > 1000:  # chamadas que falharam nunca chegam no update
+                self._inicios.clear()
+            self._inicios[LLMCache.chave(self.provider, llm_string, prompt)] = time.perf_counter()
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        with self._lock:
+            inicio = self._inicios.pop(LLMCache.chave(self.provider, llm_string, prompt), None)
+        latencia = time.perf_counter() - inicio if inicio is not None else 0.0
+        self.store.set(self.provider, llm_string, prompt, json.dumps([dumps(g) for g in return_val]), latencia)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+
+# Cache global, aberto no primeiro uso (None quando LLM_CACHE_ENABLED=false)
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    global _cache
+    from .config import Config
+    with _cache_lock:
+        if _cache is None and Config.LLM_CACHE_ENABLED:
+            _cache = LLMCache()
+    return _cache
@@ -1,17 +1,79 @@
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
-import requests
+import asyncio
+import httpx
 import json
-from typing import Optional, Dict, Any, Type
-import os
+import re
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple, Type
 import logging
+from .tool_cache import chave_ferramenta, registrar_chamada
 
 logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+# Status em que vale tentar de novo (API reiniciando, proxy/gateway fora)
+STATUS_RETRY = {502, 503, 504}
+
 
 class OABSearchInput(BaseModel): # Modelo para entrada da ferramenta de busca OAB
     name: str = Field(..., description="Nome completo do advogado a ser buscado")
     uf: str = Field(..., description="UF/Seccional do advogado(ex: SP, MS, MG, etc...)")
-    
+
+
+# Clients HTTP compartilhados por base_url entre todas as ferramentas (e agentes):
+# as conexoes keep-alive com a API do scraper sao reaproveitadas entre chamadas
+_sync_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, Tuple[httpx.AsyncClient, Any]] = {}
+_clients_lock = threading.Lock()
+
+
+def _limites() -> httpx.Limits:
+    from .config import Config
+    return httpx.Limits(max_connections=Config.TOOL_MAX_CONNECTIONS,
+                        max_keepalive_connections=Config.TOOL_MAX_CONNECTIONS)
+
+
+def get_sync_client(base_url: str) -> httpx.Client:
+    with _clients_lock:
+        client = _sync_clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.Client(base_url=base_url, limits=_limites())
+            _sync_clients[base_url] = client
+        return client
+
+
+def get_async_client(base_url: str) -> httpx.AsyncClient:
+    # O AsyncClient fica preso ao event loop onde foi criado
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client, client_loop = _async_clients.get(base_url, (None, None))
+        if client is None or client.is_closed or client_loop is not loop:
+            client = httpx.AsyncClient(base_url=base_url, limits=_limites())
+            _async_clients[base_url] = (client, loop)
+        return client
+
+
+def close_clients():
+    ''' Fecha os clients sincronos (os assincronos fecham com aclose_clients no proprio loop) '''
+    with _clients_lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_clients():
+    ''' Fecha os clients assincronos criados no event loop atual '''
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        fechar = [base for base, (_, client_loop) in _async_clients.items() if client_loop is loop]
+        clients = [_async_clients.pop(base)[0] for base in fechar]
+    for client in clients:
+        await client.aclose()
+
+
 class OABSearchTool(BaseTool): # Ferramenta de busca OAB
     name: str = "oab_search"
     description: str = """
@@ -19,17 +81,35 @@ class OABSearchTool(BaseTool): # Ferramenta de busca OAB
     Recebe o nome completo do advogado e a UF/Seccional.
     Retorna os dados do advogado(OAB, nome, UF, categoria, data de inscrição, situação).
     """
-    
+
     args_schema: Type[BaseModel] = OABSearchInput
     api_base_url: str = "http://scraper-api:8000"
-    
-    def __init__(self, api_base_url: str = "http://localhost:8000"):
-        super().__init__()
-        self.api_base_url = api_base_url
-        
-    def _run(self, name: str, uf: str = None) -> str:
-        ''' Executa a busca na API do scraper '''
-        
+    timeout: float = 120  # Temp para a req (a consulta no CNA pode demorar)
+    connect_timeout: float = 5
+    retries: int = 2
+    retry_backoff: float = 0.5
+    cache: Optional[Any] = None  # ToolCache com as observacoes ja buscadas (memoizacao)
+
+    def __init__(self, api_base_url: str = "http://localhost:8000", timeout: Optional[float] = None,
+                 connect_timeout: Optional[float] = None, retries: Optional[int] = None,
+                 retry_backoff: Optional[float] = None, cache: Optional[Any] = None):
+        from .config import Config
+        super().__init__(
+            api_base_url=api_base_url.rstrip("/"),
+            timeout=timeout if timeout is not None else Config.TOOL_TIMEOUT,
+            connect_timeout=connect_timeout if connect_timeout is not None else Config.TOOL_CONNECT_TIMEOUT,
+            retries=retries if retries is not None else Config.TOOL_RETRIES,
+            retry_backoff=retry_backoff if retry_backoff is not None else Config.TOOL_RETRY_BACKOFF,
+            cache=cache,
+        )
+
+    @property
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+    @staticmethod
+    def _preparar(name: str, uf: str = None) -> Dict[str, Any]:
+        ''' Monta o payload da API a partir do que o LLM mandou '''
         # Corrige caso o campo 'name' venha como um JSON string (mock/teste)
         if isinstance(name, str) and name.strip().startswith('{') and name.strip().endswith('}'):
             try:
@@ -40,48 +120,109 @@ class OABSearchTool(BaseTool): # Ferramenta de busca OAB
                 pass
         # Se uf ainda for None, tenta extrair do name se possível
         if not uf and isinstance(name, str):
-            import re
             uf_match = re.search(r'uf[\s:]+([A-Z]{2})', name, re.IGNORECASE)
             if uf_match:
                 uf = uf_match.group(1)
-        try: # prepara a requisicao paraa a API
-            payload = {
-                "name": name,
-                "uf": uf
+        return {"name": name, "uf": uf}
+
+    @staticmethod
+    def _formatar(response: httpx.Response) -> str:
+        ''' Converte a resposta da API na observacao do agente '''
+        if response.status_code == 200:
+            data = response.json()
+
+            if data.get("error"): # Se houver erro
+                return f"Erro na busca: {data['error']}"
+
+            result = {
+                "oab": data.get("oab", "N/A"),
+                "name": data.get("name", "N/A"),
+                "uf": data.get("uf", "N/A"),
+                "categoria": data.get("categoria", "N/A"),
+                "data_inscricao": data.get("data_inscricao", "N/A"),
+                "situacao": data.get("situacao", "N/A")
             }
+            if data.get("nome_corrigido"): # a API buscou outro nome (o consultado nao existe no CNA)
+                result["consulta_original"] = data.get("consulta_original")
+                result["nome_corrigido"] = data["nome_corrigido"]
+            return json.dumps(result, ensure_ascii=False)
+        return f"Erro na API: {response.status_code} - {response.text}"
 
-            response = requests.post( #faz a req p/ API
-                f"{self.api_base_url}/fetch_oab",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=120 # Temp para a req
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get("error"): # Se houver erro
-                    return f"Erro na busca: {data['error']}"
-                
-                result = {
-                    "oab": data.get("oab", "N/A"),
-                    "name": data.get("name", "N/A"),
-                    "uf": data.get("uf", "N/A"),
-                    "categoria": data.get("categoria", "N/A"),
-                    "data_inscricao": data.get("data_inscricao", "N/A"),
-                    "situacao": data.get("situacao", "N/A")
-                }
-                return json.dumps(result, ensure_ascii=False)
-            else:
-                return f"Erro na API: {response.status_code} - {response.text}"
-            
-        except requests.exceptions.RequestException as e:
-            return f"Erro na conecao da API: {str(e)}"
-        except Exception as e:
-            return f"Erro inesperado: {str(e)}"
-        
-    async def _arun(self, name: str, uf: str) -> str:
-        return self._run(name, uf)
+    def _deve_repetir(self, tentativa: int, response: Optional[httpx.Response] = None,
+                      erro: Optional[Exception] = None) -> bool:
+        if tentativa >= self.retries:
+            return False
+        if erro is not None:
+            # Timeout de leitura: a consulta pode estar rodando, repetir so dobraria a espera
+            return isinstance(erro, httpx.TransportError) and not isinstance(erro, httpx.ReadTimeout)
+        return response is not None and response.status_code in STATUS_RETRY
+
+    @staticmethod
+    def _memorizavel(observacao: str) -> bool:
+        # Advogado encontrado ou nao encontrado; erros de API/conexao sao passageiros
+        return not observacao.startswith("Erro") or observacao.startswith("Erro na busca: Nenhum resultado")
+
+    def _do_cache(self, payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        chave = chave_ferramenta(payload.get("name"), payload.get("uf"))
+        observacao = self.cache.get(chave) if self.cache is not None else None
+        registrar_chamada(cache_hit=observacao is not None)
+        return chave, observacao
+
+    def _guardar(self, chave: Optional[str], observacao: str):
+        if self.cache is not None and self._memorizavel(observacao):
+            self.cache.set(chave, observacao)
+
+    def _run(self, name: str, uf: str = None) -> str:
+        ''' Executa a busca na API do scraper (ou responde do cache de observacoes) '''
+        payload = self._preparar(name, uf)
+        chave, observacao = self._do_cache(payload)
+        if observacao is None:
+            observacao = self._buscar(payload)
+            self._guardar(chave, observacao)
+        return observacao
+
+    async def _arun(self, name: str, uf: str = None) -> str:
+        ''' Mesma busca do _run sem bloquear o event loop do agente '''
+        payload = self._preparar(name, uf)
+        chave, observacao = self._do_cache(payload)
+        if observacao is None:
+            observacao = await self._abuscar(payload)
+            self._guardar(chave, observacao)
+        return observacao
+
+    def _buscar(self, payload: Dict[str, Any]) -> str:
+        client = get_sync_client(self.api_base_url)
+        tentativa = 0
+        while True:
+            try: # faz a req p/ API (conexao keep-alive do pool)
+                response = client.post("/fetch_oab", json=payload, timeout=self._timeout)
+                if not self._deve_repetir(tentativa, response=response):
+                    return self._formatar(response)
+            except httpx.HTTPError as e:
+                if not self._deve_repetir(tentativa, erro=e):
+                    return f"Erro na conecao da API: {str(e)}"
+            except Exception as e:
+                return f"Erro inesperado: {str(e)}"
+            tentativa += 1
+            logger.warning(f"Tentando de novo a busca na API ({tentativa}/{self.retries})")
+            time.sleep(self.retry_backoff * 2 ** (tentativa - 1))
+
+    async def _abuscar(self, payload: Dict[str, Any]) -> str:
+        client = get_async_client(self.api_base_url)
+        tentativa = 0
+        while True:
+            try:
+                response = await client.post("/fetch_oab", json=payload, timeout=self._timeout)
+                if not self._deve_repetir(tentativa, response=response):
+                    return self._formatar(response)
+            except httpx.HTTPError as e:
+                if not self._deve_repetir(tentativa, erro=e):
+                    return f"Erro na conecao da API: {str(e)}"
+            except Exception as e:
+                return f"Erro inesperado: {str(e)}"
+            tentativa += 1
+            logger.warning(f"Tentando de novo a busca na API ({tentativa}/{self.retries})")
+            await asyncio.sleep(self.retry_backoff * 2 ** (tentativa - 1))
 
     def run(self, *args, **kwargs):
         # Se vier apenas um argumento positional, pode ser o JSON
@@ -96,4 +237,12 @@ class OABSearchTool(BaseTool): # Ferramenta de busca OAB
         # Se vier como kwargs normais
         name = kwargs.get('name')
         uf = kwargs.get('uf')
-        return self._run(name, uf)
\ No newline at end of file
+        return self._run(name, uf)
+
+    async def arun(self, tool_input, *args, **kwargs):
+        # O ReAct manda o Action Input como string (JSON ou "nome, uf: XX"): vira name/uf
+        # antes da validacao, mantendo os callbacks (eventos de inicio/fim da ferramenta)
+        if isinstance(tool_input, str):
+            payload = self._preparar(tool_input)
+            tool_input = {"name": payload["name"], "uf": payload["uf"] or ""}
+        return await super().arun(tool_input, *args, **kwargs)
@@ -0,0 +1,139 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional
+from contextlib import asynccontextmanager
+import json
+import logging
+from .agent_pool import AgentPoolTimeout, get_agent_pool, start_agent_pool, stop_agent_pool
+from .oab_tool import aclose_clients, close_clients
+from .tool_cache import get_tool_cache
+from .llm_cache import get_llm_cache
+from .config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Os agentes sao construidos uma vez no startup; cada pergunta so pega um emprestado
+    await start_agent_pool(llm_provider=Config.LLM_PROVIDER, api_base_url=Config.SCRAPER_API_URL)
+    yield
+    await stop_agent_pool()
+    await aclose_clients()
+    close_clients()
+
+app = FastAPI(
+    title="OAB LLM Agent",
+    description="Agente LLM para perguntas sobre advogados da OAB",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+class QueryRequest(BaseModel): # Modelo para pergunta ao agente
+    question: str = Field(..., description="Pergunta em portugues sobre um advogado", min_length=1)
+
+    class Config:
+        json_schema_extra = {
+            "example": {"question": "Qual a situação do advogado Fulano de Tal na UF SP?"}
+        }
+
+class QueryResponse(BaseModel): # Modelo para resposta do agente
+    answer: str = Field(..., description="Resposta do agente")
+    path: Optional[str] = Field(None, description="Caminho da pergunta: fast_path (sem LLM) ou llm")
+    tool_calls: int = Field(0, description="Chamadas da ferramenta oab_search")
+    cache_hits: int = Field(0, description="Chamadas respondidas pelo cache de observacoes")
+    elapsed: float = Field(0, description="Tempo da query no agente (segundos)")
+    wait: float = Field(0, description="Espera por um agente livre no pool (segundos)")
+
+@app.get("/") # Endpoint raiz
+async def root():
+    return {
+        "message": "OAB LLM Agent",
+        "version": "1.0.0",
+        "endpoints": {
+            "query": "POST /query - Pergunta ao agente",
+            "query_stream": "POST /query/stream (ou GET /query/stream?question=...) - Eventos da resposta em SSE",
+            "health": "GET /health - Estado do pool de agentes"
+        }
+    }
+
+@app.get("/health") # Endpoint de status
+async def health_check():
+    pool = get_agent_pool()
+    return {
+        "status": "ok!",
+        "agent_pool": pool.stats() if pool else None,
+        "tool_cache": get_tool_cache().stats(),
+        "llm_cache": get_llm_cache().stats() if get_llm_cache() else None,
+    }
+
+@app.post("/query", response_model=QueryResponse)
+async def query(request: QueryRequest):
+    '''
+    Responde a pergunta com um agente do pool
+
+    Raises:
+        HTTPException: 400 se a pergunta for vazia, 503 se nenhum agente ficar livre a tempo
+    '''
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="A pergunta é obrigatória e não pode ser vazia.")
+    pool = get_agent_pool()
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Pool de agentes nao iniciado")
+    try:
+        answer, info = await pool.query(request.question)
+    except AgentPoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return QueryResponse(answer=answer, **info)
+
+def evento_sse(evento: dict) -> str:
+    return f"event: {evento['event']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+def responder_em_sse(question: str) -> StreamingResponse:
+    if not question.strip():
+        raise HTTPException(status_code=400, detail="A pergunta é obrigatória e não pode ser vazia.")
+    pool = get_agent_pool()
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Pool de agentes nao iniciado")
+
+    async def stream():
+        try:
+            async for evento in pool.stream(question):
+                yield evento_sse(evento)
+        except AgentPoolTimeout as e:
+            yield evento_sse({"event": "error", "error": str(e)})
+
+    # Sem buffer em proxies (nginx): cada evento sai assim que acontece
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest):
+    '''
+    Responde a pergunta em Server-Sent Events, conforme o agente avanca
+
+    Returns:
+        StreamingResponse: eventos thought, tool_start, tool_result, token (trechos
+            da resposta final) e final (resposta completa, path, tool_calls,
+            cache_hits, elapsed, wait); error se nenhum agente ficar livre a tempo
+    '''
+    return responder_em_sse(request.question)
+
+@app.get("/query/stream") # Mesmo stream para o EventSource do navegador (so faz GET)
+async def query_stream_get(question: str):
+    return responder_em_sse(question)
+
+if __name__ == "__main__": # python -m agent.server
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=Config.AGENT_SERVER_PORT, log_level="info")
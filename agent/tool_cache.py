@@ -0,0 +1,105 @@
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+# Contadores da consulta em andamento (cada query do agente tem os seus)
+_consulta_atual: ContextVar[Optional[Dict[str, int]]] = ContextVar("consulta_atual", default=None)
+
+
+def chave_ferramenta(name: Optional[str], uf: Optional[str]) -> Optional[str]:
+    ''' Nome sem acento, maiusculo e com espacos normalizados + UF; None se faltar algum '''
+    if not name or not uf or not isinstance(name, str) or not isinstance(uf, str):
+        return None
+    sem_acento = ''.join(c for c in unicodedata.normalize('NFD', name) if unicodedata.category(c) != 'Mn')
+    return f"{' '.join(sem_acento.upper().split())}|{uf.strip().upper()}"
+
+
+@contextmanager
+def contar_consulta() -> Iterator[Dict[str, int]]:
+    ''' Conta as chamadas da ferramenta (e acertos do cache) feitas dentro do bloco '''
+    contagem = {"tool_calls": 0, "cache_hits": 0}
+    token = _consulta_atual.set(contagem)
+    try:
+        yield contagem
+    finally:
+        _consulta_atual.reset(token)
+
+
+def registrar_chamada(cache_hit: bool):
+    contagem = _consulta_atual.get()
+    if contagem is not None:
+        contagem["tool_calls"] += 1
+        contagem["cache_hits"] += int(cache_hit)
+
+
+class ToolCache:
+    """
+    Memoizacao das observacoes da ferramenta oab_search, compartilhada entre
+    as queries do agente: o mesmo nome/UF nao vira outra consulta ao scraper
+    enquanto a observacao tiver menos de ttl segundos. LRU com no maximo
+    max_size entradas.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_size: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        from .config import Config
+        self.ttl = ttl if ttl is not None else Config.TOOL_CACHE_TTL
+        self.max_size = max_size if max_size is not None else Config.TOOL_CACHE_SIZE
+        self.enabled = enabled if enabled is not None else Config.TOOL_CACHE_ENABLED
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chave: Optional[str]) -> Optional[str]:
+        if not self.enabled or chave is None:
+            return None
+        with self._lock:
+            item = self._data.get(chave)
+            if item is not None and time.monotonic() - item[1] < self.ttl:
+                self._data.move_to_end(chave)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                del self._data[chave]
+            self.misses += 1
+        return None
+
+    def set(self, chave: Optional[str], observacao: str):
+        if not self.enabled or chave is None:
+            return
+        with self._lock:
+            self._data[chave] = (observacao, time.monotonic())
+            self._data.move_to_end(chave)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        consultas = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / consultas, 3) if consultas else None,
+        }
+
+
+# Cache global, compartilhado por todos os agentes do processo
+_cache: Optional[ToolCache] = None
+
+
+def get_tool_cache() -> ToolCache:
+    global _cache
+    if _cache is None:
+        _cache = ToolCache()
+    return _cache
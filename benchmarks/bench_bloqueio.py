@@ -0,0 +1,112 @@
+"""
+Benchmark do perfil de bloqueio de recursos.
+
+Abre a pagina inicial do CNA (ou CNA_BASE_URL) varias vezes com e sem o
+RoutingProfile e mede bytes transferidos, numero de requisicoes e o tempo
+ate a pagina ficar pronta para a busca (#txtName e #btnFind disponiveis).
+
+Uso:
+    python benchmarks/bench_bloqueio.py --runs 5 --output bench_bloqueio.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from playwright.async_api import async_playwright
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.resource_blocking import RoutingProfile
+from scraper.scraper_config import ScraperConfig
+
+
+async def carregar(browser, url: str, perfil: RoutingProfile = None) -> Dict[str, Any]:
+    """Carrega a pagina num contexto limpo e devolve bytes, requisicoes e tempos"""
+    context = await browser.new_context()
+    if perfil is not None:
+        await perfil.apply(context)
+    page = await context.new_page()
+
+    medidas = {"bytes": 0, "requisicoes": 0}
+
+    async def on_finished(request):
+        try:
+            tamanhos = await request.sizes()
+            medidas["bytes"] += tamanhos["responseBodySize"] + tamanhos["responseHeadersSize"]
+        except Exception:
+            pass
+        medidas["requisicoes"] += 1
+
+    page.on("requestfinished", on_finished)
+    try:
+        inicio = time.perf_counter()
+        await page.goto(url, wait_until="domcontentloaded", timeout=ScraperConfig.BROWSER_TIMEOUT)
+        await page.wait_for_selector("#txtName", state="attached")
+        await page.wait_for_selector("#btnFind", state="attached")
+        pronto = time.perf_counter() - inicio
+        await page.wait_for_load_state("load")
+        carregado = time.perf_counter() - inicio
+        # Da tempo para os eventos requestfinished pendentes
+        await page.wait_for_timeout(200)
+    finally:
+        await context.close()
+    return {**medidas, "pronto_ms": pronto * 1000, "load_ms": carregado * 1000}
+
+
+def resumir(execucoes):
+    return {
+        "bytes_media": round(statistics.mean(e["bytes"] for e in execucoes)),
+        "requisicoes_media": round(statistics.mean(e["requisicoes"] for e in execucoes), 1),
+        "pronto_ms_mediana": round(statistics.median(e["pronto_ms"] for e in execucoes), 1),
+        "load_ms_mediana": round(statistics.median(e["load_ms"] for e in execucoes), 1),
+    }
+
+
+async def rodar(url: str, runs: int) -> Dict[str, Any]:
+    perfil = RoutingProfile()
+    sem, com = [], []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            # Alterna as execucoes para nao favorecer nenhum lado com cache de DNS/conexao
+            for _ in range(runs):
+                sem.append(await carregar(browser, url))
+                com.append(await carregar(browser, url, perfil))
+        finally:
+            await browser.close()
+    return {
+        "url": url,
+        "runs": runs,
+        "sem_perfil": resumir(sem),
+        "com_perfil": resumir(com),
+        "perfil": perfil.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do bloqueio de recursos")
+    parser.add_argument("--url", default=ScraperConfig.CNA_BASE_URL + "/", help="Pagina a carregar")
+    parser.add_argument("--runs", type=int, default=5, help="Execucoes de cada lado (padrao: 5)")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(rodar(args.url, args.runs))
+    for lado in ("sem_perfil", "com_perfil"):
+        r = resultado[lado]
+        print(f"{lado:11}: {r['bytes_media'] / 1024:8.1f} KB  {r['requisicoes_media']:5} req  "
+              f"pronto {r['pronto_ms_mediana']:7.1f} ms  load {r['load_ms_mediana']:7.1f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Benchmark da extracao de dados das linhas de resultado do CNA.
+
+Compara a extracao antiga (um query_selector/inner_text por seletor) com a
+extracao numa unica chamada ao browser, usando paginas HTML salvas em
+benchmarks/fixtures. Tambem confere se as duas devolvem os mesmos dados.
+
+Uso:
+    python benchmarks/bench_extracao.py --iterations 50 --output bench_extracao.json
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from playwright.async_api import async_playwright
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.oab_scraper import extrair_dados_avancados, extrair_todas_linhas
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+async def extrair_dados_sequencial(page, row) -> Dict[str, Any]:
+    """
+    Implementacao anterior de extrair_dados_avancados: um query_selector/inner_text
+    por seletor (uma ida e volta ao browser cada). Mantida como referencia.
+    """
+    dados = {}
+    
+    try:
+        # Nome - múltiplos seletores possiveis
+        nome_selectors = [
+            ".rowName span:nth-child(2)",
+            ".rowName span:last-child",
+            ".rowName .nome",
+            ".nome"
+        ]
+        
+        for selector in nome_selectors:
+            nome_elem = await row.query_selector(selector)
+            if nome_elem:
+                dados["nome"] = (await nome_elem.inner_text()).strip()
+                break
+        
+        # Inscricao - múltiplos seletores
+        inscricao_selectors = [
+            ".rowInsc span:last-child",
+            ".rowInsc .inscricao",
+            ".inscricao"
+        ]
+        
+        for selector in inscricao_selectors:
+            inscricao_elem = await row.query_selector(selector)
+            if inscricao_elem:
+                dados["inscricao"] = (await inscricao_elem.inner_text()).strip()
+                break
+        
+        # UF - múltiplos seletores
+        uf_selectors = [
+            ".rowUf span:last-child",
+            ".rowUf .uf",
+            ".uf"
+        ]
+        
+        for selector in uf_selectors:
+            uf_elem = await row.query_selector(selector)
+            if uf_elem:
+                dados["uf"] = (await uf_elem.inner_text()).strip()
+                break
+        
+        # Categoria/Tipo - múltiplos seletores
+        tipo_selectors = [
+            ".rowTipoInsc span:last-child",
+            ".rowTipoInsc .tipo",
+            ".tipo",
+            ".categoria"
+        ]
+        
+        for selector in tipo_selectors:
+            tipo_elem = await row.query_selector(selector)
+            if tipo_elem:
+                dados["categoria"] = (await tipo_elem.inner_text()).strip()
+                break
+        
+        # Data de inscricao - busca por padroes de data
+        data_selectors = [
+            ".rowData span:last-child",
+            ".rowData .data",
+            ".data",
+            ".dataInscricao"
+        ]
+        
+        for selector in data_selectors:
+            data_elem = await row.query_selector(selector)
+            if data_elem:
+                data_text = (await data_elem.inner_text()).strip()
+                # Verifica se contém padrao de data
+                if re.search(r'\d{2}/\d{2}/\d{4}', data_text):
+                    dados["data_inscricao"] = data_text
+                    break
+        
+        # Situacao atual - busca por status/situacao
+        situacao_selectors = [
+            ".rowSituacao span:last-child",
+            ".rowSituacao .situacao",
+            ".situacao",
+            ".status",
+            ".rowStatus span:last-child"
+        ]
+        
+        for selector in situacao_selectors:
+            situacao_elem = await row.query_selector(selector)
+            if situacao_elem:
+                dados["situacao"] = (await situacao_elem.inner_text()).strip()
+                break
+        
+        # Se nao encontrou situacao especifica, tenta buscar no texto completo da linha
+        if "situacao" not in dados:
+            row_text = await row.inner_text()
+            # Busca por palavras-chave de situacao
+            situacao_keywords = ["ATIVO", "INATIVO", "SUSPENSO", "CANCELADO", "REGULAR", "FALECIDO"]
+            for keyword in situacao_keywords:
+                if keyword in row_text.upper():
+                    dados["situacao"] = keyword
+                    break
+        
+        # Busca alternativa: tenta extrair todos os spans da linha
+        if len(dados) < 4:  # Se nao conseguiu extrair pelo menos 4 campos
+            all_spans = await row.query_selector_all("span")
+            span_texts = []
+            for span in all_spans:
+                text = (await span.inner_text()).strip()
+                if text:
+                    span_texts.append(text)
+            
+            # Tenta identificar campos pelos textos
+            for i, text in enumerate(span_texts):
+                if re.search(r'\d{2}/\d{2}/\d{4}', text) and "data_inscricao" not in dados:
+                    dados["data_inscricao"] = text
+                elif re.search(r'^\d+$', text) and "inscricao" not in dados:
+                    dados["inscricao"] = text
+                elif len(text) == 2 and text.isupper() and "uf" not in dados:
+                    dados["uf"] = text
+                elif text.upper() in ["ADVOGADO", "ESTAGIÁRIO", "ESTAGIARIO"] and "categoria" not in dados:
+                    dados["categoria"] = text
+                elif text.upper() in ["ATIVO", "INATIVO", "SUSPENSO", "CANCELADO", "REGULAR", "FALECIDO"] and "situacao" not in dados:
+                    dados["situacao"] = text
+                elif len(text.split()) >= 2 and "nome" not in dados:
+                    dados["nome"] = text
+        
+    except Exception as e:
+        print(f"Erro ao extrair dados avancados: {e}")
+    
+    return dados
+
+
+# Estados possiveis de aguardar_resultados
+RESULTADOS = "resultados"
+SEM_RESULTADOS = "sem_resultados"
+
+# Avaliado no browser a cada frame ate o #divResult ficar pronto
+RESULTADOS_PRONTOS_JS = """
+(mensagensVazio) => {
+    const div = document.querySelector('#divResult');
+    if (!div) return null;
+    if (div.querySelector('.row')) return 'resultados';
+    const texto = (div.innerText || '')
+        .normalize('NFD').replace(/[\\u0300-\\u036f]/g, '').toUpperCase();
+    if (mensagensVazio.some((msg) => texto.includes(msg))) return 'sem_resultados';
+    return null;
+}
+"""
+
+# Mensagens que o CNA mostra quando a busca nao encontra ninguem (sem acento)
+MENSAGENS_SEM_RESULTADO = ["NENHUM", "NAO FORAM ENCONTRADOS", "NAO ENCONTRAD"]
+
+
+async def aguardar_resultados(page, timeout: int = None) -> str:
+    """
+    Espera a busca terminar de verdade em vez de um tempo fixo.
+    Retorna RESULTADOS quando o #divResult tem linhas, SEM_RESULTADOS quando o CNA
+    avisa que nao achou ninguem. Levanta PlaywrightTimeoutError se nada disso acontecer.
+    """
+    timeout = timeout if timeout is not None else ScraperConfig.RESULT_TIMEOUT
+    handle = await page.wait_for_function(
+        RESULTADOS_PRONTOS_JS, arg=MENSAGENS_SEM_RESULTADO, timeout=timeout
+    )
+    return await handle.json_value()
+
+
+async def medir(fn, repeticoes: int) -> float:
+    """Tempo medio (ms) de uma chamada"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        await fn()
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+async def rodar(iterations: int) -> Dict[str, Any]:
+    resultados = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        try:
+            for fixture in sorted(FIXTURES.glob("*.html")):
+                await page.set_content(fixture.read_text(encoding="utf-8"))
+                rows = await page.query_selector_all("#divResult .row")
+
+                # As duas implementacoes precisam devolver exatamente os mesmos dados
+                antigos = [await extrair_dados_sequencial(page, row) for row in rows]
+                novos = [await extrair_dados_avancados(page, row) for row in rows]
+                todas = await extrair_todas_linhas(page)
+                iguais = antigos == novos == todas
+
+                async def sequencial():
+                    for row in rows:
+                        await extrair_dados_sequencial(page, row)
+
+                async def por_linha():
+                    for row in rows:
+                        await extrair_dados_avancados(page, row)
+
+                async def pagina_inteira():
+                    await extrair_todas_linhas(page)
+
+                tempos = {
+                    "sequencial_ms": await medir(sequencial, iterations),
+                    "uma_chamada_por_linha_ms": await medir(por_linha, iterations),
+                    "uma_chamada_por_pagina_ms": await medir(pagina_inteira, iterations),
+                }
+                resultados[fixture.name] = {
+                    "linhas": len(rows),
+                    "resultados_iguais": iguais,
+                    **{k: round(v, 3) for k, v in tempos.items()},
+                    "speedup_por_linha": round(tempos["sequencial_ms"] / tempos["uma_chamada_por_linha_ms"], 2),
+                    "speedup_por_pagina": round(tempos["sequencial_ms"] / tempos["uma_chamada_por_pagina_ms"], 2),
+                }
+                if not iguais:
+                    print(f"⚠️  {fixture.name}: resultados diferentes")
+                    print(f"   antigo: {antigos}")
+                    print(f"   novo  : {novos}")
+        finally:
+            await browser.close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da extracao de dados do CNA")
+    parser.add_argument("--iterations", type=int, default=50, help="Repeticoes por fixture (padrao: 50)")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(rodar(args.iterations))
+    for nome, r in resultados.items():
+        print(f"{nome} ({r['linhas']} linhas, iguais={r['resultados_iguais']})")
+        print(f"   sequencial        : {r['sequencial_ms']:.2f} ms")
+        print(f"   1 chamada/linha   : {r['uma_chamada_por_linha_ms']:.2f} ms (x{r['speedup_por_linha']})")
+        print(f"   1 chamada/pagina  : {r['uma_chamada_por_pagina_ms']:.2f} ms (x{r['speedup_por_pagina']})")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultados salvos em {args.output}")
+
+    if not all(r["resultados_iguais"] for r in resultados.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
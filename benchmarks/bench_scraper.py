@@ -0,0 +1,254 @@
+"""
+Benchmark de ponta a ponta contra o CNA local (benchmarks/cna_local.py).
+
+Mede, para scrape_oab_async e para o endpoint /fetch_oab (app FastAPI em
+processo, via httpx.ASGITransport):
+- latencia de uma consulta por vez (media, p50, p95, p99);
+- vazao sustentada em varios niveis de concorrencia;
+- memoria (pico do tracemalloc e RSS do processo) em cada cenario.
+
+Cada consulta usa um nome diferente, e o registro local, a reescrita de nomes
+e o limitador ficam desligados (o limitador pode ser ligado com --limiter),
+para que toda consulta chegue de fato ao CNA local. O resultado vai para um
+JSON que pode ser comparado entre execucoes.
+
+Uso:
+    python benchmarks/bench_scraper.py --backend http --concurrency 1 4 16 --output bench_scraper.json
+    python benchmarks/bench_scraper.py --backend playwright --lookups 20 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+from cna_local import CNALocal
+from scraper.scraper_config import ScraperConfig
+
+Buscar = Callable[[str, str], Awaitable[Dict[str, Any]]]
+
+UFS_BENCH = ["SP", "RJ", "MG", "RS", "PR", "BA", "SC", "PE"]
+
+
+def rss_mb() -> Optional[float]:
+    ''' RSS atual do processo (Linux), ou None se nao der para ler '''
+    try:
+        with open("/proc/self/status") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return round(int(linha.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def resumir(latencias: List[float], erros: int, decorrido: float) -> Dict[str, Any]:
+    ms = [l * 1000 for l in latencias]
+    return {
+        "lookups": len(latencias),
+        "errors": erros,
+        "elapsed_s": round(decorrido, 3),
+        "throughput_per_s": round(len(latencias) / decorrido, 2) if decorrido > 0 else None,
+        "latency_ms": {
+            "mean": round(statistics.mean(ms), 1),
+            "p50": round(percentil(ms, 50), 1),
+            "p95": round(percentil(ms, 95), 1),
+            "p99": round(percentil(ms, 99), 1),
+            "max": round(max(ms), 1),
+        },
+    }
+
+
+class Nomes:
+    ''' Nomes unicos por consulta: nenhum cache ou coalescencia responde no lugar do CNA '''
+
+    def __init__(self, prefixo: str):
+        self.prefixo = prefixo
+        self.n = 0
+
+    def proximo(self):
+        self.n += 1
+        return f"ADVOGADO {self.prefixo} {self.n:06d}", UFS_BENCH[self.n % len(UFS_BENCH)]
+
+
+async def rodar_cenario(buscar: Buscar, nomes: Nomes, lookups: int, concurrency: int) -> Dict[str, Any]:
+    ''' `lookups` consultas com `concurrency` workers puxando da mesma fila '''
+    latencias: List[float] = []
+    erros = 0
+    restantes = iter(range(lookups))
+
+    async def worker():
+        nonlocal erros
+        for _ in restantes:
+            name, uf = nomes.proximo()
+            inicio = time.perf_counter()
+            try:
+                result = await buscar(name, uf)
+                # /fetch_oab devolve "oab" (e error=None); o scraper devolve "inscricao"
+                erros += int(bool(result.get("error")) or not (result.get("inscricao") or result.get("oab")))
+            except Exception:
+                erros += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    decorrido = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+
+    resumo = resumir(latencias, erros, decorrido)
+    resumo["concurrency"] = concurrency
+    resumo["memory"] = {"tracemalloc_peak_mb": round(pico / 1024 / 1024, 2), "rss_mb": rss_mb()}
+    return resumo
+
+
+async def rodar_alvo(nome_alvo: str, buscar: Buscar, args) -> Dict[str, Any]:
+    nomes = Nomes(nome_alvo.upper())
+    # Aquecimento: browser/pool, conexoes keep-alive, imports tardios
+    for _ in range(args.warmup):
+        name, uf = nomes.proximo()
+        await buscar(name, uf)
+
+    print(f"[{nome_alvo}] latencia de uma consulta por vez ({args.single} consultas)", file=sys.stderr)
+    unica = await rodar_cenario(buscar, nomes, args.single, 1)
+
+    vazao = []
+    for concurrency in args.concurrency:
+        lookups = max(args.lookups, concurrency)
+        print(f"[{nome_alvo}] vazao com concorrencia {concurrency} ({lookups} consultas)", file=sys.stderr)
+        vazao.append(await rodar_cenario(buscar, nomes, lookups, concurrency))
+    return {"single": unica, "throughput": vazao}
+
+
+def buscar_scraper(backend: str) -> Buscar:
+    from scraper.oab_scraper import scrape_oab_async
+
+    async def buscar(name: str, uf: str) -> Dict[str, Any]:
+        return await scrape_oab_async(name, uf, backend=backend, max_age=0)
+    return buscar
+
+
+def buscar_api(client: httpx.AsyncClient, backend: str) -> Buscar:
+    async def buscar(name: str, uf: str) -> Dict[str, Any]:
+        response = await client.post("/fetch_oab", json={"name": name, "uf": uf, "backend": backend})
+        if response.status_code != 200:
+            return {"error": f"HTTP {response.status_code}"}
+        return response.json()
+    return buscar
+
+
+def configurar(base_url: str, limiter: bool):
+    ''' Aponta o scraper para o CNA local e desliga o que responderia sem ir ao CNA '''
+    ScraperConfig.CNA_BASE_URL = base_url
+    ScraperConfig.REGISTRY_ENABLED = False
+    ScraperConfig.NAME_REWRITE_ENABLED = False
+    ScraperConfig.LIMITER_ENABLED = limiter
+
+
+async def rodar(args, base_url: str) -> Dict[str, Any]:
+    configurar(base_url, args.limiter)
+    # Importados depois de configurar: os singletons leem o ScraperConfig na criacao
+    from scraper.api import app
+    from scraper.backends import close_backends
+    from scraper.browser_pool import start_browser_pool, stop_browser_pool
+    from scraper.ocr_pool import stop_ocr_pool
+    from scraper.resource_blocking import get_routing_profile
+
+    if args.backend == "playwright" and ScraperConfig.POOL_ENABLED:
+        # Mesmo pool que o lifespan da API sobe (a fila de jobs nao entra no benchmark)
+        perfil = get_routing_profile()
+        await start_browser_pool(context_setup=perfil.apply if perfil else None)
+
+    resultados = {}
+    tracemalloc.start()
+    try:
+        if "scraper" in args.targets:
+            resultados["scrape_oab_async"] = await rodar_alvo("scraper", buscar_scraper(args.backend), args)
+        if "api" in args.targets:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                resultados["fetch_oab"] = await rodar_alvo("api", buscar_api(client, args.backend), args)
+    finally:
+        tracemalloc.stop()
+        await close_backends()
+        await stop_browser_pool()
+        stop_ocr_pool()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do scraper contra o CNA local")
+    parser.add_argument("--backend", default="http", choices=["http", "playwright"])
+    parser.add_argument("--targets", nargs="+", default=["scraper", "api"], choices=["scraper", "api"])
+    parser.add_argument("--single", type=int, default=20, help="Consultas do cenario de uma por vez")
+    parser.add_argument("--lookups", type=int, default=100, help="Consultas por nivel de concorrencia")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--limiter", action="store_true", help="Mantem o limitador adaptativo ligado")
+    parser.add_argument("--base-url", help="Usa um CNA local ja rodando em vez de subir um")
+    parser.add_argument("--latency", type=float, default=0.2, help="Espera da busca no CNA local (s)")
+    parser.add_argument("--detail-latency", type=float, default=0.05, help="Espera do detalhe e da imagem (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--results", type=int, default=1, help="Advogados encontrados por nome")
+    parser.add_argument("--verbose", action="store_true", help="Mostra os prints do scraper")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    cna = None
+    if not args.base_url:
+        cna = CNALocal(latency=args.latency, detail_latency=args.detail_latency,
+                       jitter=args.jitter, results=args.results).start()
+    base_url = args.base_url or cna.base_url
+
+    # O scraper imprime cada etapa de cada consulta; fora do --verbose isso so atrapalha
+    saida = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with saida:
+            resultados = asyncio.run(rodar(args, base_url))
+    finally:
+        if cna is not None:
+            cna.stop()
+
+    relatorio = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "backend": args.backend,
+            "limiter": args.limiter,
+            "base_url": base_url if args.base_url else "cna_local",
+            "cna_latency_s": None if args.base_url else args.latency,
+            "cna_detail_latency_s": None if args.base_url else args.detail_latency,
+            "cna_jitter": None if args.base_url else args.jitter,
+            "cna_results": None if args.base_url else args.results,
+            "cna_requests": cna.requests if cna is not None else None,
+        },
+        "results": resultados,
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmark do custo de uma chamada da ferramenta oab_search.
+
+Compara a implementacao anterior (requests.post sem sessao: uma conexao TCP
+nova por chamada, e _arun bloqueando o event loop) com a atual (httpx com
+pool de conexoes keep-alive e _arun nativo), contra uma API do scraper falsa
+que responde na hora (ou com --latency), para isolar o overhead da ferramenta.
+
+Uso:
+    python benchmarks/bench_tool.py --calls 500 --concurrency 16 --output bench_tool.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import requests
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent import oab_tool
+from agent.oab_tool import OABSearchTool
+
+RESPOSTA = {"oab": "123456", "name": "FULANO DE TAL", "uf": "SP", "categoria": "ADVOGADO",
+            "data_inscricao": "01/01/2000", "situacao": "Regular", "error": None}
+
+
+class APIFalsaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabecalho e corpo saem em writes separados: sem isso o keep-alive esbarra no delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        self.server.conexoes += 1
+        super().handle()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps(RESPOSTA).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ServidorAPIFalsa(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexoes do listen: o padrao (5) derruba conexoes nas rajadas concorrentes
+    request_queue_size = 128
+
+
+def run_antigo(api_base_url: str, name: str, uf: str) -> str:
+    """
+    Implementacao anterior de OABSearchTool._run: requests.post sem sessao
+    (uma conexao nova por chamada). Mantida como referencia.
+    """
+    try:
+        response = requests.post(
+            f"{api_base_url}/fetch_oab",
+            json={"name": name, "uf": uf},
+            headers={"Content-Type": "application/json"},
+            timeout=120
+        )
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("error"):
+                return f"Erro na busca: {data['error']}"
+            return json.dumps({k: data.get(k, "N/A") for k in RESPOSTA if k != "error"}, ensure_ascii=False)
+        return f"Erro na API: {response.status_code} - {response.text}"
+    except requests.exceptions.RequestException as e:
+        return f"Erro na conecao da API: {str(e)}"
+
+
+async def arun_antigo(api_base_url: str, name: str, uf: str) -> str:
+    # O _arun anterior so chamava o _run bloqueante
+    return run_antigo(api_base_url, name, uf)
+
+
+def resumir(latencias: List[float], decorrido: float) -> Dict[str, Any]:
+    ms = sorted(l * 1000 for l in latencias)
+    return {
+        "calls": len(ms),
+        "elapsed_s": round(decorrido, 3),
+        "calls_per_s": round(len(ms) / decorrido, 1),
+        "latency_ms_mean": round(statistics.mean(ms), 3),
+        "latency_ms_p50": round(ms[len(ms) // 2], 3),
+        "latency_ms_p95": round(ms[int(len(ms) * 0.95) - 1], 3),
+    }
+
+
+def medir_sync(chamar: Callable[[], str], calls: int) -> Dict[str, Any]:
+    latencias = []
+    inicio = time.perf_counter()
+    for _ in range(calls):
+        t = time.perf_counter()
+        chamar()
+        latencias.append(time.perf_counter() - t)
+    return resumir(latencias, time.perf_counter() - inicio)
+
+
+async def medir_async(chamar: Callable[[], Awaitable[str]], calls: int, concurrency: int) -> Dict[str, Any]:
+    latencias = []
+    restantes = iter(range(calls))
+
+    async def worker():
+        for _ in restantes:
+            t = time.perf_counter()
+            await chamar()
+            latencias.append(time.perf_counter() - t)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return resumir(latencias, time.perf_counter() - inicio)
+
+
+def rodar(calls: int, concurrency: int, latency: float) -> Dict[str, Any]:
+    server = ServidorAPIFalsa(("127.0.0.1", 0), APIFalsaHandler)
+    server.latency = latency
+    server.conexoes = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    tool = OABSearchTool(api_base_url=url)
+
+    def cenario(nome, fn):
+        server.conexoes = 0
+        print(f"{nome}...", file=sys.stderr)
+        resultado = fn()
+        resultado["tcp_connections"] = server.conexoes
+        return resultado
+
+    async def async_novo():
+        try:
+            return await medir_async(lambda: tool._arun("FULANO DE TAL", "SP"), calls, concurrency)
+        finally:
+            await oab_tool.aclose_clients()
+
+    try:
+        resultados = {
+            "sync_antigo": cenario("sync antigo (requests sem sessao)",
+                                   lambda: medir_sync(lambda: run_antigo(url, "FULANO DE TAL", "SP"), calls)),
+            "sync_novo": cenario("sync novo (httpx com pool)",
+                                 lambda: medir_sync(lambda: tool._run("FULANO DE TAL", "SP"), calls)),
+            "async_antigo": cenario(f"async antigo (concorrencia {concurrency})", lambda: asyncio.run(
+                medir_async(lambda: arun_antigo(url, "FULANO DE TAL", "SP"), calls, concurrency))),
+            "async_novo": cenario(f"async novo (concorrencia {concurrency})", lambda: asyncio.run(async_novo())),
+        }
+    finally:
+        oab_tool.close_clients()
+        server.shutdown()
+        server.server_close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do overhead da ferramenta oab_search")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16, help="Chamadas simultaneas nos cenarios async")
+    parser.add_argument("--latency", type=float, default=0.0, help="Espera da API falsa por chamada (s)")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    resultados = rodar(args.calls, args.concurrency, args.latency)
+    relatorio = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"calls": args.calls, "concurrency": args.concurrency, "latency_s": args.latency},
+        "results": resultados,
+        "speedup": {
+            "sync": round(resultados["sync_antigo"]["elapsed_s"] / resultados["sync_novo"]["elapsed_s"], 2),
+            "async": round(resultados["async_antigo"]["elapsed_s"] / resultados["async_novo"]["elapsed_s"], 2),
+        },
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+CNA local para benchmarks (e testes) sem depender do site real.
+
+Imita o que o scraper usa do CNA:
+- pagina inicial com o formulario (#txtName, #cmbSeccional, #btnFind) e o
+  token anti-CSRF, que faz a busca via JavaScript e monta as linhas do
+  #divResult (.rowName, .rowTipoInsc, .rowInsc, .rowUf, .rowData), a
+  paginacao (#divPagination .next a) e o modal com a imagem #imgDetail;
+- endpoints usados pelo backend HTTP (POST /Home/Search, /Home/DetailUrl e
+  /Product/ViewImage), com a imagem da situacao gerada pelo Pillow.
+
+A latencia de cada endpoint e a quantidade de resultados sao configuraveis.
+Nomes que comecam com INEXISTENTE nao tem resultados.
+
+Uso:
+    python benchmarks/cna_local.py --port 8090 --latency 0.3 --results 3
+    CNA_BASE_URL=http://127.0.0.1:8090 python main.py query "FULANO" SP
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from functools import lru_cache
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image, ImageDraw, ImageFont
+
+TOKEN = "token-cna-local"
+
+UFS = ["AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA", "PB",
+       "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO"]
+
+PREFIXO_SEM_RESULTADO = "INEXISTENTE"
+
+PAGINA_INICIAL = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>CNA local</title>
+<style>.modal {{ position: fixed; top: 10%; left: 10%; background: #fff; border: 1px solid #333; }}</style>
+</head>
+<body>
+<form id="frmSearch" onsubmit="return false">
+  <input name="__RequestVerificationToken" type="hidden" value="{token}" />
+  <input id="txtName" name="NomeAdvo" type="text" />
+  <select id="cmbSeccional" name="Uf"><option value="">Selecione</option>{opcoes}</select>
+  <button id="btnFind" type="button">Pesquisar</button>
+</form>
+<div id="divResult"></div>
+<div id="divPagination"></div>
+<div id="divModal"></div>
+<script>
+let pagina = 1;
+
+function span(texto) {{
+  const el = document.createElement('span');
+  el.textContent = texto;
+  return el;
+}}
+
+function campo(classe, rotulo, valor) {{
+  const div = document.createElement('div');
+  div.className = classe;
+  div.append(span(rotulo), span(valor));
+  return div;
+}}
+
+function fecharModal() {{
+  document.getElementById('divModal').innerHTML = '';
+}}
+
+async function abrirDetalhe(detailUrl) {{
+  const resposta = await fetch(detailUrl, {{headers: {{'X-Requested-With': 'XMLHttpRequest'}}}});
+  const json = await resposta.json();
+  const modal = document.createElement('div');
+  modal.className = 'modal show';
+  const fechar = document.createElement('button');
+  fechar.className = 'close';
+  fechar.type = 'button';
+  fechar.textContent = 'x';
+  fechar.onclick = fecharModal;
+  const img = document.createElement('img');
+  img.id = 'imgDetail';
+  img.src = json.Data.DetailUrl;
+  modal.append(fechar, img);
+  fecharModal();
+  document.getElementById('divModal').append(modal);
+}}
+
+function mostrar(json) {{
+  const div = document.getElementById('divResult');
+  const paginacao = document.getElementById('divPagination');
+  div.innerHTML = '';
+  paginacao.innerHTML = '';
+  if (!json.Data || !json.Data.length) {{
+    div.textContent = 'Nenhum resultado encontrado.';
+    return;
+  }}
+  for (const adv of json.Data) {{
+    const row = document.createElement('div');
+    row.className = 'row';
+    row.append(
+      campo('rowName', 'Nome:', adv.Nome),
+      campo('rowTipoInsc', 'Tipo:', adv.TipoInscOab),
+      campo('rowInsc', 'Inscrição:', adv.Inscricao),
+      campo('rowUf', 'UF:', adv.UF),
+      campo('rowData', 'Data de inscrição:', adv.DataInscricao),
+    );
+    row.onclick = () => abrirDetalhe(adv.DetailUrl);
+    div.append(row);
+  }}
+  if (json.TotalPaginas > 1) {{
+    const li = document.createElement('li');
+    li.className = pagina < json.TotalPaginas ? 'next' : 'next disabled';
+    const link = document.createElement('a');
+    link.href = '#';
+    link.textContent = 'Próxima';
+    link.onclick = (ev) => {{ ev.preventDefault(); if (pagina < json.TotalPaginas) buscar(pagina + 1); }};
+    li.append(link);
+    paginacao.append(li);
+  }}
+}}
+
+async function buscar(p) {{
+  pagina = p;
+  const form = new URLSearchParams({{
+    __RequestVerificationToken: document.querySelector('[name=__RequestVerificationToken]').value,
+    IsMobile: 'false',
+    NomeAdvo: document.getElementById('txtName').value,
+    Insc: '',
+    Uf: document.getElementById('cmbSeccional').value,
+    TipoInsc: '',
+    Pagina: String(p),
+  }});
+  const resposta = await fetch('/Home/Search', {{
+    method: 'POST', body: form, headers: {{'X-Requested-With': 'XMLHttpRequest'}},
+  }});
+  mostrar(await resposta.json());
+}}
+
+document.getElementById('btnFind').onclick = () => buscar(1);
+</script>
+</body>
+</html>
+"""
+
+
+@lru_cache(maxsize=None)
+def imagem_situacao(situacao: str) -> bytes:
+    ''' PNG com o texto da situacao, no formato que o OCR do scraper procura '''
+    image = Image.new("L", (480, 80), color=255)
+    draw = ImageDraw.Draw(image)
+    try:
+        fonte = ImageFont.load_default(size=32)
+    except TypeError:
+        # Pillow antigo: fonte bitmap de tamanho fixo
+        fonte = ImageFont.load_default()
+    draw.text((16, 20), f"SITUACAO: {situacao.upper()}", fill=0, font=fonte)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexoes do listen: o padrao (5) derruba conexoes nas rajadas concorrentes
+    request_queue_size = 128
+
+
+class CNALocal:
+    """
+    Servidor HTTP (em uma thread) que responde como o CNA.
+    latency: segundos de espera da busca (POST /Home/Search);
+    detail_latency: segundos de espera do detalhe e da imagem;
+    jitter: variacao aleatoria relativa das esperas (0.2 = +-20%);
+    results: advogados encontrados por nome; page_size: advogados por pagina.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.2,
+        detail_latency: float = 0.05,
+        jitter: float = 0.0,
+        results: int = 1,
+        page_size: int = 10,
+        situacao: str = "Regular",
+    ):
+        self.latency = latency
+        self.detail_latency = detail_latency
+        self.jitter = jitter
+        self.results = results
+        self.page_size = max(1, page_size)
+        self.situacao = situacao
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = _Servidor((host, port), _CNALocalHandler)
+        self._server.cna = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "CNALocal":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "CNALocal":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def esperar(self, segundos: float):
+        if segundos > 0:
+            if self.jitter:
+                segundos *= 1 + random.uniform(-self.jitter, self.jitter)
+            time.sleep(max(0.0, segundos))
+
+    def contar(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def advogados(self, nome: str, uf: str) -> List[Dict[str, Any]]:
+        ''' Advogados "encontrados" para a busca, deterministicos por nome/UF '''
+        nome = " ".join(nome.upper().split())
+        if not nome or not uf or nome.startswith(PREFIXO_SEM_RESULTADO):
+            return []
+        base = int(hashlib.sha1(f"{nome}|{uf}".encode()).hexdigest()[:8], 16) % 400000 + 100000
+        return [
+            {
+                "Nome": nome,
+                "TipoInscOab": "ADVOGADO",
+                "Inscricao": str(base + i),
+                "UF": uf,
+                "DataInscricao": f"{1 + i % 28:02d}/{1 + base % 12:02d}/{1990 + base % 30}",
+                "DetailUrl": f"/Home/DetailUrl?id={uf}-{base + i}",
+            }
+            for i in range(self.results)
+        ]
+
+
+class _CNALocalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabecalho e corpo saem em writes separados: sem isso o keep-alive esbarra no delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def cna(self) -> CNALocal:
+        return self.server.cna
+
+    def _send(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, data: Dict[str, Any]):
+        self._send(json.dumps(data).encode(), "application/json")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/":
+            self.cna.contar("home")
+            opcoes = "".join(f'<option value="{uf}">{uf}</option>' for uf in UFS)
+            html = PAGINA_INICIAL.format(token=escape(TOKEN), opcoes=opcoes)
+            self._send(html.encode(), "text/html; charset=utf-8")
+        elif url.path == "/Home/DetailUrl":
+            self.cna.contar("detail")
+            self.cna.esperar(self.cna.detail_latency)
+            id_ = parse_qs(url.query).get("id", [""])[0]
+            self._json({"Success": True, "Data": {"DetailUrl": f"/Product/ViewImage?id={id_}"}})
+        elif url.path == "/Product/ViewImage":
+            self.cna.contar("image")
+            self.cna.esperar(self.cna.detail_latency)
+            self._send(imagem_situacao(self.cna.situacao), "image/png")
+        else:
+            self._send(b"", "text/plain", 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        if urlparse(self.path).path != "/Home/Search":
+            self._send(b"", "text/plain", 404)
+            return
+        if form.get("__RequestVerificationToken") != [TOKEN]:
+            self._send(b"", "text/plain", 403)
+            return
+        self.cna.contar("search")
+        self.cna.esperar(self.cna.latency)
+        encontrados = self.cna.advogados(form.get("NomeAdvo", [""])[0], form.get("Uf", [""])[0].upper())
+        pagina = max(1, int(form.get("Pagina", ["1"])[0] or 1))
+        por_pagina = self.cna.page_size
+        total_paginas = max(1, -(-len(encontrados) // por_pagina))
+        self._json({
+            "Success": True,
+            "Data": encontrados[(pagina - 1) * por_pagina:pagina * por_pagina],
+            "TotalPaginas": total_paginas,
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CNA local para benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.2, help="Espera da busca (s)")
+    parser.add_argument("--detail-latency", type=float, default=0.05, help="Espera do detalhe e da imagem (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variacao relativa das esperas (0.2 = +-20%%)")
+    parser.add_argument("--results", type=int, default=1, help="Advogados encontrados por nome")
+    parser.add_argument("--page-size", type=int, default=10, help="Advogados por pagina")
+    args = parser.parse_args()
+
+    cna = CNALocal(host=args.host, port=args.port, latency=args.latency, detail_latency=args.detail_latency,
+                   jitter=args.jitter, results=args.results, page_size=args.page_size)
+    print(f"CNA local em {cna.base_url} (Ctrl+C para parar)")
+    try:
+        cna._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cna._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
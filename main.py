@@ -11,10 +11,6 @@ import os
 from pathlib import Path
 import logging
 
-# Adicionar diretórios ao path
-sys.path.append(str(Path(__file__).parent / "scraper"))
-sys.path.append(str(Path(__file__).parent / "agent"))
-
 # Silenciar TODOS os logs de forma mais agressiva
 logging.basicConfig(level=logging.CRITICAL, force=True)
 logging.getLogger().setLevel(logging.CRITICAL)
@@ -50,28 +46,68 @@ def main():
 Exemplos de uso:
   python main.py api                    # Executar apenas a API
   python main.py agent                  # Executar apenas o agente
+  python main.py server                 # Agente como servidor HTTP (POST /query na porta 8001)
   python main.py test                   # Testar o scraper
   python main.py query "João Silva SP"  # Consulta rápida
+  python main.py lookup "João Silva" --uf SP  # Consulta direta no scraper (usa o registro local)
+  python main.py bulk entrada.csv --output saida.jsonl  # Consulta em lote (retoma se interrompido)
         """
     )
     
     parser.add_argument(
         "command",
-        choices=["api", "agent", "server", "test", "query"],
+        choices=["api", "agent", "server", "test", "query", "lookup", "bulk"],
         help="Comando a executar"
     )
     
     parser.add_argument(
         "query_text",
         nargs="?",
-        help="Texto da consulta (para comando 'query')"
+        help="Texto da consulta (para 'query'), nome do advogado (para 'lookup') ou arquivo de entrada CSV/JSONL (para 'bulk')"
+    )
+    
+    parser.add_argument(
+        "--uf",
+        help="UF/Seccional do advogado (para comando 'lookup')"
+    )
+    
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=None,
+        help="Idade máxima (segundos) do registro local aceita no 'lookup' (0 = sempre consultar o CNA)"
+    )
+    
+    parser.add_argument(
+        "--backend",
+        choices=["playwright", "http"],
+        default=None,
+        help="Backend de busca do 'lookup'/'bulk' (padrão: SCRAPER_BACKEND)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        help="Arquivo de saída CSV/JSONL (para comando 'bulk')"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Consultas simultâneas no 'bulk' (padrão: 4)"
+    )
+    
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Arquivo de checkpoint do 'bulk' (padrão: <output>.checkpoint.json)"
     )
     
     parser.add_argument(
         "--port",
         type=int,
-        default=8000,
-        help="Porta para a API (padrão: 8000)"
+        default=None,
+        help="Porta para a API (padrão: 8000) ou para o servidor do agente (padrão: AGENT_SERVER_PORT, 8001)"
     )
     
     parser.add_argument(
@@ -84,11 +120,11 @@ Exemplos de uso:
     args = parser.parse_args()
     
     if args.command == "api":
-        run_api(args.port)
+        run_api(args.port or 8000)
     elif args.command == "agent":
         run_agent(args.llm_provider)
     elif args.command == "server":
-        run_agent_server(args.llm_provider)
+        run_agent_server(args.llm_provider, args.port)
     elif args.command == "test":
         run_test()
     elif args.command == "query":
@@ -96,6 +132,16 @@ Exemplos de uso:
             print("Erro: Forneça o texto da consulta")
             sys.exit(1)
         run_query(args.query_text, args.llm_provider)
+    elif args.command == "lookup":
+        if not args.query_text or not args.uf:
+            print("Erro: Forneça o nome do advogado e a UF (--uf)")
+            sys.exit(1)
+        run_lookup(args.query_text, args.uf, args.max_age, args.backend)
+    elif args.command == "bulk":
+        if not args.query_text or not args.output:
+            print("Erro: Forneça o arquivo de entrada e o de saída (--output)")
+            sys.exit(1)
+        run_bulk(args.query_text, args.output, args.concurrency, args.checkpoint, args.backend, args.max_age)
 
 def run_api(port=8000):
     """Executar servidor da API"""
@@ -183,34 +229,25 @@ def run_test():
         print(f"❌ Erro no teste: {e}")
         sys.exit(1)
 
-def run_agent_server(llm_provider="mock"):
-    """Executar agente LLM como servidor"""
-    print(f"🤖 Iniciando agente LLM como servidor (provedor: {llm_provider})...")
-    
+def run_agent_server(llm_provider="mock", port=None):
+    """Executar agente LLM como servidor HTTP (POST /query) com um pool de agentes"""
     try:
-        from agent.llm_agent import OABAgent
-        
-        agent = OABAgent(llm_provider=llm_provider)
-        
-        print("✅ Agente LLM inicializado e pronto!")
-        print("🔄 Aguardando consultas...")
-        print("💡 Para testar, use: docker exec oab-llm-agent python main.py query 'sua pergunta'")
-        
-        # Manter o processo rodando sem tentar ler input
-        import time
-        import signal
+        import uvicorn
+        from agent.config import Config
         
-        def signal_handler(signum, frame):
-            print("\n🛑 Encerrando agente LLM...")
-            sys.exit(0)
+        Config.LLM_PROVIDER = llm_provider
+        port = port or Config.AGENT_SERVER_PORT
+        print(f"🤖 Iniciando agente LLM como servidor na porta {port} "
+              f"(provedor: {llm_provider}, {Config.AGENT_POOL_SIZE} agente(s))...")
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        from agent.server import app
         
-        while True:
-            time.sleep(60)  # Aguardar 1 minuto
-            print("🔄 Agente LLM ainda ativo...")
-            
+        uvicorn.run(
+            app,
+            host="0.0.0.0",
+            port=port,
+            log_level="info"
+        )
     except ImportError as e:
         print(f"Erro: Dependências não encontradas: {e}")
         sys.exit(1)
@@ -238,5 +275,47 @@ def run_query(query_text, llm_provider="mock"):
         print(f"Erro na consulta: {e}")
         sys.exit(1)
 
+def run_lookup(name, uf, max_age=None, backend=None):
+    """Consultar um advogado direto no scraper (responde do registro local quando fresco)"""
+    try:
+        import json
+        from scraper.oab_scraper import scrape_oab_async
+        
+        result = asyncio.run(scrape_oab_async(name, uf, backend=backend, max_age=max_age))
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        
+        if "error" in result:
+            sys.exit(1)
+            
+    except ImportError as e:
+        print(f"Erro: Dependências não encontradas: {e}")
+        sys.exit(1)
+
+def run_bulk(input_path, output_path, concurrency=4, checkpoint=None, backend=None, max_age=None):
+    """Consultar em lote os pares nome/UF de um CSV/JSONL (retoma pelo checkpoint)"""
+    try:
+        from scraper.bulk import run_bulk as executar_lote
+        
+        print(f"📦 Consulta em lote: {input_path} -> {output_path} (concorrência {concurrency})")
+        # Progresso vai para o stderr; o scraper fala muito no stdout
+        suppress_output()
+        try:
+            resumo = asyncio.run(executar_lote(
+                input_path, output_path, concurrency=concurrency, checkpoint_path=checkpoint,
+                backend=backend, max_age=max_age
+            ))
+        finally:
+            restore_output()
+        print(f"✅ Lote finalizado: {resumo['processed']} consulta(s) em {resumo['elapsed']}s, {resumo['errors']} erro(s)")
+        
+    except KeyboardInterrupt:
+        restore_output()
+        print("\n⏸️  Interrompido. Execute o mesmo comando para continuar do checkpoint.")
+        sys.exit(130)
+    except (ValueError, OSError) as e:
+        restore_output()
+        print(f"Erro no lote: {e}")
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,8 +3,9 @@ OAB Scraper - Scraper para buscar informações de advogados no site da OAB
 '''
 
 from .oab_scraper import scrape_oab
+from .oab_client import OABClient
 
 __author__ = "Yan G. Santana"
 __email__ = "yan.santana@gmail.com"
 __status__ = "Development"
-__all__ = ["scrape_oab"]
\ No newline at end of file
+__all__ = ["scrape_oab", "OABClient"]
\ No newline at end of file
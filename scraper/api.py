@@ -1,20 +1,55 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, Dict, Any, List, Union
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import logging
-from oab_scraper import scrape_oab_async
+from .oab_scraper import scrape_oab_async, scrape_oab_todos_async, chave_consulta
+from .browser_pool import start_browser_pool, stop_browser_pool, get_browser_pool
+from .backends import BACKENDS, close_backends
+from .ocr_pool import get_ocr_pool, stop_ocr_pool
+from .ocr_cache import get_ocr_cache
+from .resource_blocking import get_routing_profile
+from .result_cache import get_result_cache
+from .singleflight import get_singleflight
+from .job_queue import start_job_queue, stop_job_queue, get_job_queue
+from .rate_limiter import get_rate_limiter
+from .registry import get_registry
+from .name_index import get_name_index
+from .metrics import REGISTRY
+from .scraper_config import ScraperConfig
 
 #Config do logging 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sobe o pool de browsers junto com a API e fecha no shutdown
+    if ScraperConfig.POOL_ENABLED:
+        try:
+            # Cada contexto novo do pool recebe o perfil de bloqueio de recursos
+            perfil = get_routing_profile()
+            await start_browser_pool(context_setup=perfil.apply if perfil else None)
+        except Exception as e:
+            logger.warning(f"Nao foi possivel iniciar o pool de browsers, usando browser por consulta: {e}")
+    # Workers dos jobs assincronos (POST /jobs)
+    await start_job_queue(executar_job)
+    yield
+    await stop_job_queue()
+    await close_backends()
+    await stop_browser_pool()
+    stop_ocr_pool()
+
 app = FastAPI(
     title="OAB Scraper API",
     description="API para buscar informações de advogados no site da  OAB",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 #Configuração do CORS - Acesso a API de qualquer origem
@@ -29,6 +64,9 @@ app.add_middleware(
 class OABRequest(BaseModel): # Modelo para requisicao de colsulta OAB
     name: str = Field(..., description="Nome Completo do advogado", min_length=1)
     uf: str = Field(..., description="UF/Seccional do advogado", min_length=2, max_length=2)
+    backend: Optional[str] = Field(None, description="Backend de busca: 'playwright' ou 'http' (padrao: SCRAPER_BACKEND)")
+    todos: bool = Field(False, description="Retorna todos os advogados encontrados (com paginacao) em vez do primeiro")
+    max_results: Optional[int] = Field(None, description="Maximo de advogados quando todos=true (padrao: MAX_RESULTS)", ge=1)
     
     class Config:
         json_schema_extra = {
@@ -38,6 +76,12 @@ class OABRequest(BaseModel): # Modelo para requisicao de colsulta OAB
             }
         }
 
+class NameSuggestion(BaseModel): # Modelo para sugestao de nome ("voce quis dizer")
+    name: str = Field(..., description="Nome conhecido do advogado")
+    uf: str = Field(..., description="UF/Seccional do advogado")
+    oab: str = Field(..., description="Numero de inscricao do advogado")
+    score: float = Field(..., description="Similaridade com o nome consultado (0 a 1)")
+
 class OABResponse(BaseModel): # Modelo para resposta da consulta OAB
     oab: Optional[str] = Field(None, description="Numero de inscricao do advogado(AOB)")
     name: Optional[str] = Field(None, description="Nome completo do advogado")
@@ -46,6 +90,11 @@ class OABResponse(BaseModel): # Modelo para resposta da consulta OAB
     data_inscricao: Optional[str] = Field(None, description="Data de inscricao do advogado")
     situacao: Optional[str] = Field(None, description="Situacao do advogado")
     error: Optional[str] = Field(None, description="Mensagem de erro se a consulta falhar")
+    cached: bool = Field(False, description="True se a resposta veio do cache")
+    cache_age: Optional[float] = Field(None, description="Idade dos dados do cache em segundos")
+    suggestions: Optional[List[NameSuggestion]] = Field(None, description="Nomes parecidos ja conhecidos, quando nada foi encontrado")
+    consulta_original: Optional[str] = Field(None, description="Nome consultado, quando a busca foi refeita com o nome corrigido")
+    nome_corrigido: Optional[str] = Field(None, description="Nome conhecido usado na busca no lugar do consultado")
         
     class Config:
         json_schema_extra = {
@@ -59,10 +108,117 @@ class OABResponse(BaseModel): # Modelo para resposta da consulta OAB
             }
         }
 
+class OABMultiResponse(BaseModel): # Modelo para resposta com todos os advogados encontrados
+    results: List[OABResponse] = Field(default_factory=list, description="Advogados encontrados")
+    total: int = Field(0, description="Quantidade de advogados retornados")
+    truncated: bool = Field(False, description="True se havia mais advogados alem de max_results")
+    error: Optional[str] = Field(None, description="Mensagem de erro se a consulta falhar (pode vir junto de resultados parciais)")
+    cached: bool = Field(False, description="True se a resposta veio do cache")
+    cache_age: Optional[float] = Field(None, description="Idade dos dados do cache em segundos")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "results": [
+                    {
+                        "oab": "123456",
+                        "name": "FULANO DE TAL",
+                        "uf": "SP",
+                        "categoria": "Advogado",
+                        "data_inscricao": "01/01/2000",
+                        "situacao": "Ativo"
+                    }
+                ],
+                "total": 1,
+                "truncated": False
+            }
+        }
+
+class OABBatchRequest(BaseModel): # Modelo para consulta em lote
+    # Cada item e validado sozinho (consultar_item): um item malformado vira uma linha de erro, nao um 422 do lote
+    items: List[Any] = Field(..., description="Consultas a executar (mesmo formato do /fetch_oab)", min_length=1)
+    concurrency: Optional[int] = Field(None, description="Consultas simultaneas (padrao e maximo: BATCH_CONCURRENCY)", ge=1)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"name": "FULANO DE TAL", "uf": "SP"},
+                    {"name": "BELTRANO DA SILVA", "uf": "RJ"}
+                ],
+                "concurrency": 4
+            }
+        }
+
+class JobResponse(BaseModel): # Modelo para o estado de um job assincrono
+    job_id: str = Field(..., description="Identificador do job")
+    status: str = Field(..., description="queued, running, done ou failed")
+    result: Optional[Dict[str, Any]] = Field(None, description="Resposta do /fetch_oab quando status=done")
+    error: Optional[str] = Field(None, description="Mensagem de erro quando status=failed")
+    created_at: float = Field(..., description="Criacao do job (epoch em segundos)")
+    started_at: Optional[float] = Field(None, description="Inicio da execucao (epoch em segundos)")
+    finished_at: Optional[float] = Field(None, description="Fim da execucao (epoch em segundos)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2c9a7e5b1d4c08a6e2f0b9d8c7a615",
+                "status": "done",
+                "result": {"oab": "123456", "name": "FULANO DE TAL", "uf": "SP", "situacao": "Ativo"},
+                "created_at": 1700000000.0,
+                "started_at": 1700000000.1,
+                "finished_at": 1700000004.2
+            }
+        }
+
 class ErrorResponse(BaseModel): # Modelo para resposta de erro
     error: str = Field(..., description="Mensagem de erro")
     detail: Optional[str] = Field(None, description="Detalhes do erro")
     
+def montar_resposta(result: Dict[str, Any]) -> OABResponse:
+    ''' Converte o dicionario do scraper no OABResponse '''
+    if "error" in result:
+        return OABResponse(error=result["error"])
+    # Mapeia os campos do resultado para os nomes esperados pelo OABResponse
+    result["oab"] = result.get("inscricao")
+    result["name"] = result.get("nome")
+    return OABResponse(**result)
+
+def sugerir_nomes(name: str, uf: Optional[str] = None, limit: int = 5) -> List[NameSuggestion]:
+    ''' Nomes conhecidos mais parecidos com a consulta '''
+    return [
+        NameSuggestion(name=s["nome"], uf=s["uf"], oab=s["inscricao"], score=s["score"])
+        for s in get_name_index().search(name, uf, limit=limit)
+    ]
+
+def validar_requisicao(request: OABRequest):
+    ''' Validação extra para nome, UF e backend (HTTPException 400 se invalido) '''
+    valid_ufs = [
+        "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", 
+        "MG", "MS", "MT", "PA", "PB", "PE", "PI", "PR", "RJ", "RN", 
+        "RO", "RR", "RS", "SC", "SE", "SP", "TO"]
+
+    if not request.name or not request.name.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="O nome do advogado é obrigatório e não pode ser vazio."
+        )
+    if not request.uf or not request.uf.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="A UF é obrigatória e não pode ser vazia."
+        )
+    if request.uf.upper() not in valid_ufs:
+        raise HTTPException(
+            status_code=400,
+            detail=f"UF invalida: {request.uf}. UFs validas: {', '.join(valid_ufs)}"
+        )
+    if request.backend and request.backend.lower() not in BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Backend invalido: {request.backend}. Backends validos: {', '.join(BACKENDS)}"
+        )
+
 @app.get("/") # Endpoint raiz da API
 async def root():
     return {
@@ -70,18 +226,72 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "fetch_oab": "POST /fetch_oab - Consulta dados do advogado",
+            "fetch_oab_batch": "POST /fetch_oab/batch - Consulta em lote (resposta em NDJSON)",
+            "jobs": "POST /jobs - Cria um job de consulta; GET /jobs/{job_id}?wait=N - Estado/resultado",
+            "suggest": "GET /suggest?name=...&uf=.. - Nomes conhecidos parecidos (voce quis dizer)",
+            "limits": "GET /limits - Limites atuais e vazao das consultas ao CNA",
+            "metrics": "GET /metrics - Metricas no formato do Prometheus",
             "health": "GET /health - Verifica o status da API"
         }
     }
     
 @app.get("/health") # Endpoint de status da API
 async def health_check():
+    pool = get_browser_pool()
     return {
         "status": "ok!", 
-        "message": "API esta online!!"
+        "message": "API esta online!!",
+        "browser_pool": pool.stats() if pool else None,
+        "ocr_pool": get_ocr_pool().stats(),
+        "ocr_cache": get_ocr_cache().stats(),
+        "routing": get_routing_profile().stats() if get_routing_profile() else None,
+        "result_cache": get_result_cache().stats(),
+        "singleflight": get_singleflight().stats(),
+        "jobs": get_job_queue().stats() if get_job_queue() else None,
+        "registry": get_registry().stats() if get_registry() else None,
+        "name_index": get_name_index().stats()
         }
     
-@app.post("/fetch_oab", response_model=OABResponse)
+@app.get("/metrics", response_class=PlainTextResponse) # Metricas para o Prometheus
+async def metrics():
+    '''
+    Histogramas de duracao por etapa (goto, formulario, espera dos resultados,
+    extracao, modal, download da imagem, OCR), contadores de consultas por UF e
+    resultado e gauges de consultas em andamento, no formato texto do Prometheus
+    '''
+    # Os gauges ja mudam a cada emprestimo de pagina, imagem na fila do OCR e consulta
+    # no limitador; aqui so garante o valor inicial antes da primeira consulta
+    pool = get_browser_pool()
+    if pool is not None:
+        pool.publicar_metricas()
+    get_ocr_pool().publicar_metricas()
+    get_rate_limiter().publicar_metricas()
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+    
+@app.get("/suggest", response_model=List[NameSuggestion]) # Sugestoes de nome
+async def suggest(name: str, uf: Optional[str] = None, limit: int = 5):
+    '''
+    Busca aproximada (sem acento, tolerante a erros de digitacao e nomes do meio
+    faltando) nos advogados ja conhecidos
+    
+    Args:
+        name: Nome (ou parte do nome) do advogado
+        uf: Filtra pela UF/Seccional (opcional)
+        limit: Maximo de sugestoes (1 a 50)
+    '''
+    if not name.strip():
+        raise HTTPException(status_code=400, detail="O nome é obrigatório e não pode ser vazio.")
+    return sugerir_nomes(name, uf, min(max(limit, 1), 50))
+    
+@app.get("/limits") # Limites adaptativos das consultas ao CNA
+async def limits():
+    '''
+    Limites atuais do limitador (global e por UF), consultas em andamento,
+    esperando vaga e vazao (consultas/segundo no ultimo minuto)
+    '''
+    return get_rate_limiter().stats()
+    
+@app.post("/fetch_oab", response_model=Union[OABMultiResponse, OABResponse])
 async def fetch_oab(request: OABRequest):
     '''
     Consulta dados do advogado na OAB
@@ -91,6 +301,7 @@ async def fetch_oab(request: OABRequest):
         
     Returns:
         OABResponse: Dados do advogado ou se ocorrer erro
+        OABMultiResponse: Todos os advogados encontrados, quando todos=true
         
     Raises:
         HttpException: Se caso de erro na validacao ou processamento
@@ -98,42 +309,48 @@ async def fetch_oab(request: OABRequest):
     try:
         logger.info(f"🔎 Iniciando Consulta para: {request.name} - {request.uf}")
         
-        valid_ufs = [
-            "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", 
-            "MG", "MS", "MT", "PA", "PB", "PE", "PI", "PR", "RJ", "RN", 
-            "RO", "RR", "RS", "SC", "SE", "SP", "TO"]
+        validar_requisicao(request)
         
-        # Validação extra para nome e UF
-        if not request.name or not request.name.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="O nome do advogado é obrigatório e não pode ser vazio."
-            )
-        if not request.uf or not request.uf.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="A UF é obrigatória e não pode ser vazia."
+        name = request.name.strip()
+        uf = request.uf.upper()
+        cache = get_result_cache()
+
+        if request.todos:
+            # Busca todos os advogados com esse nome, seguindo a paginacao
+            result, cached, idade = await cache.obter(
+                chave_consulta(name, uf, "todos", request.max_results or ""),
+                lambda: scrape_oab_todos_async(name, uf, max_results=request.max_results, backend=request.backend)
             )
-        if request.uf.upper() not in valid_ufs:
-            raise HTTPException(
-                status_code=400,
-                detail=f"UF invalida: {request.uf}. UFs validas: {', '.join(valid_ufs)}"
+            logger.info(f"🔎 Consulta finalizada: {result.get('total', 0)} advogado(s) (cache: {cached})")
+            if "error" in result:
+                logger.warning(f"🔴 Erro na consulta: {result['error']}")
+            return OABMultiResponse(
+                results=[montar_resposta(r) for r in result.get("resultados", [])],
+                total=result.get("total", 0),
+                truncated=result.get("truncado", False),
+                error=result.get("error"),
+                cached=cached,
+                cache_age=idade
             )
+
+        # Executa o scraper de forma assíncrona (ou responde do cache)
+        result, cached, idade = await cache.obter(
+            chave_consulta(name, uf),
+            lambda: scrape_oab_async(name, uf, backend=request.backend)
+        )
         
-        # Executa o scraper de forma assíncrona
-        result = await scrape_oab_async(request.name.strip(), request.uf.upper())
-        
-        logger.info(f"🔎 Consulta finalizada para: {result}")
+        logger.info(f"🔎 Consulta finalizada para: {result} (cache: {cached})")
         
         # Verifica se ocorreu erro
         if "error" in result:
             logger.warning(f"🔴 Erro na consulta: {result['error']}")
-            return OABResponse(error=result["error"])
-        # Mapeia os campos do resultado para os nomes esperados pelo OABResponse
-        result["oab"] = result.get("inscricao")
-        result["name"] = result.get("nome")
         # Retorna os dados encontrados
-        return OABResponse(**result)
+        response = montar_resposta(result)
+        if result.get("error", "").startswith("Nenhum resultado"):
+            response.suggestions = sugerir_nomes(name, uf)
+        response.cached = cached
+        response.cache_age = idade
+        return response
     
     except HTTPException:
         raise
@@ -144,6 +361,117 @@ async def fetch_oab(request: OABRequest):
             detail=f"Erro interno no servidor: {str(e)}"
         )
 
+def erro_de_validacao(e: ValidationError) -> str:
+    return "Erro de validação: " + "; ".join(
+        f"{'.'.join(str(p) for p in erro['loc']) or 'item'}: {erro['msg']}" for erro in e.errors()
+    )
+
+async def consultar_item(index: int, item: Any) -> Dict[str, Any]:
+    ''' Executa uma consulta do lote; falhas viram uma linha de erro em vez de derrubar o lote '''
+    try:
+        response = await fetch_oab(OABRequest.model_validate(item))
+        status = 200
+    except ValidationError as e:
+        response, status = OABResponse(error=erro_de_validacao(e)), 422
+    except HTTPException as e:
+        response, status = OABResponse(error=str(e.detail)), e.status_code
+    except Exception as e:
+        logger.error(f"Erro inesperado no item {index} do lote: {e}")
+        response, status = OABResponse(error=f"Erro interno no servidor: {str(e)}"), 500
+    return {"index": index, "status": status, "result": response.model_dump()}
+
+@app.post("/fetch_oab/batch")
+async def fetch_oab_batch(request: OABBatchRequest):
+    '''
+    Consulta varios advogados de uma vez
+    
+    Args:
+        request: Lista de consultas (mesmo formato do /fetch_oab) e limite de concorrencia
+        
+    Returns:
+        StreamingResponse: Uma linha NDJSON por item, na ordem em que terminam:
+            {"index": <posicao no lote>, "status": <codigo HTTP do item>, "result": <OABResponse>}
+    
+    Raises:
+        HttpException: Se o lote passar de BATCH_MAX_ITEMS
+    '''
+    if len(request.items) > ScraperConfig.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote com {len(request.items)} itens. Maximo: {ScraperConfig.BATCH_MAX_ITEMS}"
+        )
+
+    concurrency = min(request.concurrency or ScraperConfig.BATCH_CONCURRENCY, ScraperConfig.BATCH_CONCURRENCY)
+    logger.info(f"📦 Lote com {len(request.items)} consulta(s), concorrencia {concurrency}")
+
+    async def stream():
+        pendentes = iter(enumerate(request.items))
+        prontos: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            # Cada worker puxa o proximo item; no maximo `concurrency` consultas rodando
+            for index, item in pendentes:
+                await prontos.put(await consultar_item(index, item))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(request.items)))]
+        try:
+            for _ in range(len(request.items)):
+                yield json.dumps(await prontos.get(), ensure_ascii=False) + "\n"
+        finally:
+            # Cliente desconectou (ou lote terminou): nao deixa consultas orfas
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+async def executar_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    ''' Executa um job da fila com o mesmo fluxo do /fetch_oab '''
+    try:
+        response = await fetch_oab(OABRequest(**payload))
+    except HTTPException as e:
+        raise RuntimeError(e.detail)
+    return response.model_dump()
+
+def fila_de_jobs():
+    queue = get_job_queue()
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Fila de jobs nao iniciada")
+    return queue
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def criar_job(request: OABRequest):
+    '''
+    Cria um job de consulta e retorna o id na hora, sem esperar o scraper
+    
+    Args:
+        request: Mesmo corpo do /fetch_oab
+        
+    Returns:
+        JobResponse: Job com status queued; acompanhe em GET /jobs/{job_id}
+    '''
+    validar_requisicao(request)
+    job = fila_de_jobs().submit(request.model_dump())
+    logger.info(f"🧾 Job {job['job_id']} criado para: {request.name} - {request.uf}")
+    return job
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def consultar_job(job_id: str, wait: float = 0):
+    '''
+    Estado e resultado de um job
+    
+    Args:
+        job_id: Id retornado pelo POST /jobs
+        wait: Segundos para esperar o job terminar (long-poll, maximo JOBS_MAX_WAIT)
+        
+    Raises:
+        HttpException: 404 se o job nao existe (ou ja foi apagado pela retencao)
+    '''
+    job = await fila_de_jobs().wait(job_id, min(max(wait, 0), ScraperConfig.JOBS_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job nao encontrado: {job_id}")
+    return job
+
 # Handler para erros de validação dos campos obrigatórios
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -158,7 +486,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "api:app",
+        "scraper.api:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
@@ -0,0 +1,326 @@
+from playwright.async_api import async_playwright
+import asyncio
+import re
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union
+import httpx
+from .browser_pool import BrowserPool, get_browser_pool, PoolLeaseTimeout
+from .oab_scraper import _buscar_na_pagina, _iterar_na_pagina, completar_campos, ocr_situacao, situacao_da_imagem
+from .oab_scraper import MAIS_RESULTADOS
+from .resource_blocking import get_routing_profile
+from .metrics import STAGE_SECONDS
+from .rate_limiter import ERRO_OCUPADO, descontar_espera
+from .scraper_config import ScraperConfig
+
+
+class SearchBackend:
+    """
+    Interface dos backends de busca no CNA.
+    Recebe nome e UF ja validados e devolve o mesmo dicionario de scrape_oab_async.
+    """
+    name: str = ""
+
+    async def buscar(self, name_clean: str, uf_clean: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def iterar(self, name_clean: str, uf_clean: str, max_results: Optional[int] = None,
+               com_situacao: bool = True, sondar: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Gera todos os advogados encontrados (seguindo a paginacao) ate max_results.
+        Com sondar, ao parar em max_results gera {MAIS_RESULTADOS: True} se o CNA
+        tiver mais um advogado (sem buscar o detalhe dele).
+        Erros viram um ultimo item com "error".
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+async def _nova_pagina(browser):
+    ''' Pagina avulsa (fora do pool) com o perfil de bloqueio de recursos '''
+    page = await browser.new_page()
+    perfil = get_routing_profile()
+    if perfil is not None:
+        await perfil.apply(page)
+    return page
+
+
+class PlaywrightBackend(SearchBackend):
+    """Fluxo original: preenche o formulario do CNA num Chromium de verdade"""
+    name = "playwright"
+
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        # Pool proprio (ex: o de um OABClient); sem ele usa o pool global da API
+        self.pool = pool
+
+    def _pool(self) -> Optional[BrowserPool]:
+        pool = self.pool or get_browser_pool()
+        # Pool de outro event loop nao serve (a fila e as paginas sao dele): abre browser avulso
+        if pool is not None and not pool.do_loop_atual():
+            return None
+        return pool
+
+    async def buscar(self, name_clean: str, uf_clean: str) -> Dict[str, Any]:
+        # Usa uma pagina do pool quando ele estiver iniciado (API ou OABClient)
+        pool = self._pool()
+        if pool is not None:
+            espera = time.monotonic()
+            try:
+                async with pool.page() as page:
+                    # A latencia do limitador comeca com a pagina em maos
+                    descontar_espera(time.monotonic() - espera)
+                    return await _buscar_na_pagina(page, name_clean, uf_clean)
+            except PoolLeaseTimeout as e:
+                descontar_espera(time.monotonic() - espera)
+                print(f"Pool de browsers ocupado: {e}")
+                return {"error": f"{ERRO_OCUPADO}, tente novamente: {e}"}
+            except Exception as e:
+                print(f"Erro durante a navegacao ou busca: {e}")
+                return {"error": f"Erro durante a navegacao ou busca: {e}"}
+
+        # Senao abre um browser so para esta consulta
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=ScraperConfig.HEADLESS)
+            page = await _nova_pagina(browser)
+            try:
+                data = await _buscar_na_pagina(page, name_clean, uf_clean)
+            except Exception as e:
+                print(f"Erro durante a navegacao ou busca: {e}")
+                data = {"error": f"Erro durante a navegacao ou busca: {e}"}
+            finally:
+                await browser.close()
+            return data
+
+    async def iterar(self, name_clean: str, uf_clean: str, max_results: Optional[int] = None,
+                     com_situacao: bool = True, sondar: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        espera = time.monotonic()
+        try:
+            pool = self._pool()
+            if pool is not None:
+                async with pool.page() as page:
+                    descontar_espera(time.monotonic() - espera)
+                    async with aclosing(_iterar_na_pagina(page, name_clean, uf_clean, max_results,
+                                                          com_situacao, sondar)) as itens:
+                        async for item in itens:
+                            yield item
+                return
+
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=ScraperConfig.HEADLESS)
+                try:
+                    page = await _nova_pagina(browser)
+                    async with aclosing(_iterar_na_pagina(page, name_clean, uf_clean, max_results,
+                                                          com_situacao, sondar)) as itens:
+                        async for item in itens:
+                            yield item
+                finally:
+                    await browser.close()
+        except PoolLeaseTimeout as e:
+            descontar_espera(time.monotonic() - espera)
+            print(f"Pool de browsers ocupado: {e}")
+            yield {"error": f"{ERRO_OCUPADO}, tente novamente: {e}"}
+        except Exception as e:
+            print(f"Erro durante a navegacao ou busca: {e}")
+            yield {"error": f"Erro durante a navegacao ou busca: {e}"}
+
+
+class HttpBackend(SearchBackend):
+    """
+    Chama direto os endpoints que a pagina do CNA usa (busca e detalhe),
+    sem browser. O httpx.AsyncClient com keep-alive e reaproveitado (um por event loop).
+    """
+    name = "http"
+
+    TOKEN_RE = re.compile(r'name="__RequestVerificationToken"[^>]*value="([^"]+)"')
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        ocr: Optional[Callable[[bytes], str]] = None,
+    ):
+        self.base_url = (base_url or ScraperConfig.CNA_BASE_URL).rstrip("/")
+        self.timeout = timeout or ScraperConfig.HTTP_TIMEOUT
+        self.max_connections = max_connections or ScraperConfig.HTTP_MAX_CONNECTIONS
+        self.ocr = ocr or ocr_situacao
+        # Um client (e token anti-CSRF) por event loop: o AsyncClient fica preso ao
+        # loop onde foi criado e o pool global e usado por loops diferentes
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._tokens: Dict[asyncio.AbstractEventLoop, Optional[str]] = {}
+        self._token_locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            self._descartar_loops_fechados()
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"X-Requested-With": "XMLHttpRequest"},
+                follow_redirects=True,
+            )
+            self._clients[loop] = client
+            self._tokens[loop] = None
+            self._token_locks[loop] = asyncio.Lock()
+        return client
+
+    def _descartar_loops_fechados(self):
+        # Loop encerrado nao roda mais o aclose do client dele
+        for loop in [loop for loop in self._clients if loop.is_closed()]:
+            del self._clients[loop], self._tokens[loop], self._token_locks[loop]
+
+    async def close(self):
+        ''' Fecha os clients de todos os loops (os de outros loops ainda rodando fecham no proprio loop) '''
+        atual = asyncio.get_running_loop()
+        clients = self._clients
+        self._clients, self._tokens, self._token_locks = {}, {}, {}
+        for loop, client in clients.items():
+            if loop is atual:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    async def _get_token(self, renovar: bool = False) -> str:
+        ''' Token anti-CSRF da pagina inicial (o cookie fica no client) '''
+        client = self.client
+        loop = asyncio.get_running_loop()
+        async with self._token_locks[loop]:
+            if self._tokens[loop] is None or renovar:
+                response = await client.get("/")
+                response.raise_for_status()
+                match = self.TOKEN_RE.search(response.text)
+                self._tokens[loop] = match.group(1) if match else ""
+            return self._tokens[loop]
+
+    async def _search(self, name_clean: str, uf_clean: str, pagina: int = 1) -> Dict[str, Any]:
+        ''' POST no endpoint de busca; devolve o JSON {"Success": ..., "Data": [...]} '''
+        with STAGE_SECONDS.time(stage="http_search"):
+            return await self._post_search(name_clean, uf_clean, pagina)
+
+    async def _post_search(self, name_clean: str, uf_clean: str, pagina: int) -> Dict[str, Any]:
+        for tentativa in range(2):
+            token = await self._get_token(renovar=tentativa > 0)
+            form = {
+                "__RequestVerificationToken": token,
+                "IsMobile": "false",
+                "NomeAdvo": name_clean,
+                "Insc": "",
+                "Uf": uf_clean,
+                "TipoInsc": "",
+            }
+            if pagina > 1:
+                form["Pagina"] = str(pagina)
+            response = await self.client.post(ScraperConfig.CNA_SEARCH_PATH, data=form)
+            # Token expirado: pega outro e tenta de novo uma vez
+            if response.status_code in (400, 403) and tentativa == 0:
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def _situacao(self, detail_url: str) -> Optional[str]:
+        ''' Busca a imagem de detalhe e extrai a situacao via OCR '''
+        with STAGE_SECONDS.time(stage="http_detail"):
+            response = await self.client.get(detail_url)
+            response.raise_for_status()
+        detail = response.json().get("Data") or {}
+        img_url = detail.get("DetailUrl")
+        if not img_url:
+            return None
+        with STAGE_SECONDS.time(stage="image_download"):
+            img = await self.client.get(img_url)
+            img.raise_for_status()
+        return await situacao_da_imagem(img.content, self.ocr)
+
+    async def buscar(self, name_clean: str, uf_clean: str) -> Dict[str, Any]:
+        try:
+            print(f"Iniciando busca HTTP no CNA para: {name_clean} - {uf_clean}")
+            resultado = await self._search(name_clean, uf_clean)
+            registros = resultado.get("Data") or []
+            if not resultado.get("Success", True) or not registros:
+                return {"error": f"Nenhum resultado encontrado para: {name_clean} - {uf_clean}"}
+
+            return await self._converter(registros[0])
+        except Exception as e:
+            print(f"Erro durante a busca HTTP: {e}")
+            return {"error": f"Erro durante a busca HTTP: {e}"}
+
+    async def iterar(self, name_clean: str, uf_clean: str, max_results: Optional[int] = None,
+                     com_situacao: bool = True, sondar: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            print(f"Iniciando busca HTTP no CNA para: {name_clean} - {uf_clean}")
+            total = 0
+            pagina = 1
+            while True:
+                resultado = await self._search(name_clean, uf_clean, pagina)
+                registros = resultado.get("Data") or []
+                if pagina == 1 and (not resultado.get("Success", True) or not registros):
+                    yield {"error": f"Nenhum resultado encontrado para: {name_clean} - {uf_clean}"}
+                    return
+                # Paginacao: o CNA informa o total de paginas quando ha mais de uma
+                total_paginas = int(resultado.get("TotalPaginas") or resultado.get("TotalPages") or 1)
+                for indice, registro in enumerate(registros):
+                    yield await self._converter(registro, com_situacao)
+                    total += 1
+                    if max_results and total >= max_results:
+                        # So olha se existe mais um advogado, sem abrir o detalhe dele
+                        if sondar and (indice < len(registros) - 1 or pagina < total_paginas):
+                            yield {MAIS_RESULTADOS: True}
+                        return
+                if not registros or pagina >= total_paginas:
+                    return
+                pagina += 1
+        except Exception as e:
+            print(f"Erro durante a busca HTTP: {e}")
+            yield {"error": f"Erro durante a busca HTTP: {e}"}
+
+    async def _converter(self, registro: Dict[str, Any], com_situacao: bool = True) -> Dict[str, Any]:
+        ''' Converte um registro do JSON do CNA no dicionario do scraper '''
+        data = {
+            "nome": (registro.get("Nome") or "").strip(),
+            "inscricao": str(registro.get("Inscricao") or "").strip(),
+            "uf": (registro.get("UF") or "").strip(),
+            "categoria": (registro.get("TipoInscOab") or "").strip(),
+            "data_inscricao": (registro.get("DataInscricao") or "").strip(),
+        }
+        if com_situacao and registro.get("DetailUrl"):
+            try:
+                data["situacao"] = await self._situacao(registro["DetailUrl"])
+            except Exception as e:
+                print(f"Erro ao extrair situacao: {e}")
+        return completar_campos(data)
+
+
+BACKENDS = {
+    PlaywrightBackend.name: PlaywrightBackend,
+    HttpBackend.name: HttpBackend,
+}
+
+# Uma instancia por backend, criada na primeira consulta
+_instances: Dict[str, SearchBackend] = {}
+
+
+def get_backend(name: Union[str, SearchBackend, None] = None) -> SearchBackend:
+    ''' Retorna o backend pelo nome (ou o configurado em SCRAPER_BACKEND); uma instancia passa direto '''
+    if isinstance(name, SearchBackend):
+        return name
+    name = (name or ScraperConfig.SCRAPER_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Backend invalido: {name}. Backends validos: {', '.join(BACKENDS)}")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+async def close_backends():
+    for backend in list(_instances.values()):
+        await backend.close()
+    _instances.clear()
@@ -0,0 +1,292 @@
+from playwright.async_api import async_playwright
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from .metrics import BROWSER_POOL_PAGES
+from .scraper_config import ScraperConfig
+
+
+class PoolLeaseTimeout(Exception):
+    """Nenhuma pagina ficou livre dentro do tempo de espera"""
+
+
+class _BrowserEntry:
+    def __init__(self, browser):
+        self.browser = browser
+        self.contexts: List["_ContextEntry"] = []
+
+
+class _ContextEntry:
+    def __init__(self, browser_entry: _BrowserEntry, context):
+        self.browser_entry = browser_entry
+        self.context = context
+        self.slots: List["_PageSlot"] = []
+        self.leased = 0
+        self.uses = 0
+        self.retiring = False
+        self.dead = False
+
+
+class _PageSlot:
+    def __init__(self, context_entry: _ContextEntry, page):
+        self.context_entry = context_entry
+        self.page = page
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Pool de browsers Chromium aquecidos, compartilhado entre as consultas.
+    Cada consulta pega uma pagina emprestada (lease) e devolve no final.
+    Paginas e contextos sao reciclados depois de um numero de usos.
+    """
+
+    def __init__(
+        self,
+        browsers: Optional[int] = None,
+        contexts_per_browser: Optional[int] = None,
+        pages_per_context: Optional[int] = None,
+        lease_timeout: Optional[float] = None,
+        max_uses_per_page: Optional[int] = None,
+        max_uses_per_context: Optional[int] = None,
+        headless: Optional[bool] = None,
+        context_setup: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ):
+        self.browsers = browsers or ScraperConfig.POOL_BROWSERS
+        self.contexts_per_browser = contexts_per_browser or ScraperConfig.POOL_CONTEXTS_PER_BROWSER
+        self.pages_per_context = pages_per_context or ScraperConfig.POOL_PAGES_PER_CONTEXT
+        self.lease_timeout = lease_timeout if lease_timeout is not None else ScraperConfig.POOL_LEASE_TIMEOUT
+        self.max_uses_per_page = max_uses_per_page if max_uses_per_page is not None else ScraperConfig.POOL_MAX_USES_PER_PAGE
+        self.max_uses_per_context = max_uses_per_context if max_uses_per_context is not None else ScraperConfig.POOL_MAX_USES_PER_CONTEXT
+        self.headless = headless if headless is not None else ScraperConfig.HEADLESS
+        self.context_setup = context_setup  # ex: rotas de bloqueio aplicadas em cada contexto novo
+
+        self._playwright = None
+        self._browser_entries: List[_BrowserEntry] = []
+        self._queue: "asyncio.Queue[_PageSlot]" = None
+        self._relaunch_lock: asyncio.Lock = None
+        self._started = False
+        self._closing = False
+        self._loop = None
+        self._leased = 0
+        self._total_leases = 0
+        self._recycled_pages = 0
+        self._recycled_contexts = 0
+        self._relaunched_browsers = 0
+
+    @property
+    def size(self) -> int:
+        return self.browsers * self.contexts_per_browser * self.pages_per_context
+
+    async def start(self) -> "BrowserPool":
+        ''' Sobe o playwright, os browsers, contextos e paginas '''
+        if self._started:
+            return self
+        self._queue = asyncio.Queue()
+        self._relaunch_lock = asyncio.Lock()
+        self._loop = asyncio.get_running_loop()
+        self._closing = False
+        self._playwright = await async_playwright().start()
+        try:
+            for _ in range(self.browsers):
+                entry = _BrowserEntry(await self._launch_browser())
+                self._browser_entries.append(entry)
+                for _ in range(self.contexts_per_browser):
+                    await self._new_context(entry)
+        except Exception:
+            await self.stop()
+            raise
+        self._started = True
+        self.publicar_metricas()
+        print(f"Pool de browsers iniciado: {self.size} paginas")
+        return self
+
+    async def stop(self):
+        ''' Fecha todas as paginas, contextos e browsers '''
+        self._closing = True
+        for entry in self._browser_entries:
+            try:
+                await entry.browser.close()
+            except Exception:
+                pass
+        self._browser_entries = []
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+        self._started = False
+        BROWSER_POOL_PAGES.set(0, state="leased")
+        BROWSER_POOL_PAGES.set(0, state="available")
+
+    def do_loop_atual(self) -> bool:
+        ''' A fila e as paginas ficam presas ao event loop onde o pool foi iniciado '''
+        try:
+            return self._loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    async def acquire(self) -> _PageSlot:
+        ''' Espera uma pagina livre por ate lease_timeout segundos '''
+        if not self._started or self._closing:
+            raise RuntimeError("Pool de browsers nao iniciado")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lease_timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise PoolLeaseTimeout(f"Nenhuma pagina livre no pool apos {self.lease_timeout}s")
+            try:
+                slot = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                raise PoolLeaseTimeout(f"Nenhuma pagina livre no pool apos {self.lease_timeout}s")
+            # Slots de contextos substituidos (ou sendo aposentados) ficam para tras
+            if slot.context_entry.dead or slot.context_entry.retiring:
+                continue
+            slot.context_entry.leased += 1
+            self._leased += 1
+            self._total_leases += 1
+            self.publicar_metricas()
+            return slot
+
+    async def release(self, slot: _PageSlot, discard: bool = False):
+        ''' Devolve a pagina ao pool, reciclando se necessario '''
+        try:
+            await self._devolver(slot, discard)
+        finally:
+            self.publicar_metricas()
+
+    async def _devolver(self, slot: _PageSlot, discard: bool):
+        self._leased -= 1
+        slot.uses += 1
+        ctx = slot.context_entry
+        ctx.uses += 1
+        ctx.leased -= 1
+        if self._closing or ctx.dead:
+            return
+        try:
+            if not ctx.browser_entry.browser.is_connected():
+                await self._replace_browser(ctx.browser_entry)
+                return
+            if ctx.retiring or (self.max_uses_per_context and ctx.uses >= self.max_uses_per_context):
+                # So fecha o contexto quando nenhuma pagina dele estiver emprestada
+                ctx.retiring = True
+                if ctx.leased == 0:
+                    await self._replace_context(ctx)
+                return
+            if discard or slot.page.is_closed() or (self.max_uses_per_page and slot.uses >= self.max_uses_per_page):
+                await self._replace_page(slot)
+            self._queue.put_nowait(slot)
+        except Exception as e:
+            print(f"Erro ao reciclar pagina do pool: {e}")
+            await self._replace_context(ctx)
+
+    @asynccontextmanager
+    async def page(self):
+        ''' Empresta uma pagina: async with pool.page() as page '''
+        slot = await self.acquire()
+        discard = False
+        try:
+            yield slot.page
+        except GeneratorExit:
+            # Quem consumia um async generator parou antes do fim: a pagina continua boa
+            raise
+        except BaseException:
+            # Pagina pode ter ficado em estado ruim (navegacao quebrada, crash)
+            discard = True
+            raise
+        finally:
+            await self.release(slot, discard=discard)
+
+    def publicar_metricas(self):
+        ''' Atualiza o gauge de paginas (chamado a cada emprestimo e devolucao) '''
+        BROWSER_POOL_PAGES.set(self._leased, state="leased")
+        BROWSER_POOL_PAGES.set(self._queue.qsize() if self._queue else 0, state="available")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "leased": self._leased,
+            "available": self._queue.qsize() if self._queue else 0,
+            "total_leases": self._total_leases,
+            "recycled_pages": self._recycled_pages,
+            "recycled_contexts": self._recycled_contexts,
+            "relaunched_browsers": self._relaunched_browsers,
+        }
+
+    async def _launch_browser(self):
+        return await self._playwright.chromium.launch(headless=self.headless)
+
+    async def _new_context(self, browser_entry: _BrowserEntry) -> _ContextEntry:
+        context = await browser_entry.browser.new_context()
+        if self.context_setup:
+            await self.context_setup(context)
+        ctx = _ContextEntry(browser_entry, context)
+        for _ in range(self.pages_per_context):
+            ctx.slots.append(_PageSlot(ctx, await context.new_page()))
+        browser_entry.contexts.append(ctx)
+        for slot in ctx.slots:
+            self._queue.put_nowait(slot)
+        return ctx
+
+    async def _replace_page(self, slot: _PageSlot):
+        try:
+            await slot.page.close()
+        except Exception:
+            pass
+        slot.page = await slot.context_entry.context.new_page()
+        slot.uses = 0
+        self._recycled_pages += 1
+
+    async def _replace_context(self, ctx: _ContextEntry):
+        if ctx.dead:
+            return
+        ctx.dead = True
+        browser_entry = ctx.browser_entry
+        if ctx in browser_entry.contexts:
+            browser_entry.contexts.remove(ctx)
+        try:
+            await ctx.context.close()
+        except Exception:
+            pass
+        self._recycled_contexts += 1
+        if not self._closing:
+            await self._new_context(browser_entry)
+
+    async def _replace_browser(self, browser_entry: _BrowserEntry):
+        async with self._relaunch_lock:
+            if browser_entry.browser.is_connected():
+                return
+            for ctx in browser_entry.contexts:
+                ctx.dead = True
+            browser_entry.contexts = []
+            print("Browser do pool desconectado, iniciando outro...")
+            browser_entry.browser = await self._launch_browser()
+            self._relaunched_browsers += 1
+            for _ in range(self.contexts_per_browser):
+                await self._new_context(browser_entry)
+
+
+# Pool global usado pela API (iniciado no startup do FastAPI)
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    return _pool
+
+
+async def start_browser_pool(**kwargs) -> BrowserPool:
+    global _pool
+    if _pool is None:
+        pool = BrowserPool(**kwargs)
+        await pool.start()
+        _pool = pool
+    return _pool
+
+
+async def stop_browser_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.stop()
@@ -0,0 +1,293 @@
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Set, TextIO, Tuple
+from .oab_scraper import scrape_oab_async
+from .scraper_config import ScraperConfig
+
+# Colunas da saida (na ordem do CSV)
+CAMPOS_SAIDA = ["index", "input_name", "input_uf", "oab", "name", "uf",
+                "categoria", "data_inscricao", "situacao", "error"]
+
+
+def _formato(path: str) -> str:
+    sufixo = Path(path).suffix.lower()
+    if sufixo == ".csv":
+        return "csv"
+    if sufixo in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Formato nao suportado: {path} (use .csv, .jsonl ou .ndjson)")
+
+
+def _campo(row: Dict[str, Any], *nomes: str) -> str:
+    for nome in nomes:
+        valor = row.get(nome)
+        if valor:
+            return str(valor).strip()
+    return ""
+
+
+def ler_entrada(path: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Le os pares (indice, nome, uf) um de cada vez, sem carregar o arquivo.
+    CSV com cabecalho (colunas name/nome e uf) ou JSONL ({"name": ..., "uf": ...}).
+    Linhas invalidas saem com nome/uf vazios (viram erro na saida).
+    """
+    formato = _formato(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if formato == "csv":
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, _campo(row, "name", "nome"), _campo(row, "uf", "UF")
+            return
+        index = 0
+        for linha in f:
+            if not linha.strip():
+                continue
+            try:
+                row = json.loads(linha)
+            except json.JSONDecodeError:
+                row = {}
+            yield index, _campo(row, "name", "nome"), _campo(row, "uf", "UF")
+            index += 1
+
+
+def contar_entrada(path: str) -> int:
+    return sum(1 for _ in ler_entrada(path))
+
+
+class Checkpoint:
+    """
+    Progresso de uma execucao em lote: todos os indices abaixo de `ate` estao
+    prontos, mais os indices em `extras` (terminaram fora de ordem).
+    O tamanho nao cresce com o arquivo, so com a concorrencia.
+    """
+
+    def __init__(self, path: str, entrada: str):
+        self.path = path
+        self.entrada = os.path.abspath(entrada)
+        self.ate = 0
+        self.extras: Set[int] = set()
+
+    @classmethod
+    def carregar(cls, path: str, entrada: str) -> Optional["Checkpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        checkpoint = cls(path, entrada)
+        if data.get("input") != checkpoint.entrada:
+            raise ValueError(f"Checkpoint {path} e de outro arquivo de entrada: {data.get('input')}")
+        checkpoint.ate = data.get("done_upto", 0)
+        checkpoint.extras = set(data.get("done_extra", []))
+        return checkpoint
+
+    def feito(self, index: int) -> bool:
+        return index < self.ate or index in self.extras
+
+    def marcar(self, index: int):
+        self.extras.add(index)
+        while self.ate in self.extras:
+            self.extras.remove(self.ate)
+            self.ate += 1
+
+    @property
+    def total(self) -> int:
+        return self.ate + len(self.extras)
+
+    def salvar(self):
+        # Grava num temporario e troca: um checkpoint nunca fica pela metade
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"input": self.entrada, "done_upto": self.ate,
+                       "done_extra": sorted(self.extras)}, f)
+        os.replace(tmp, self.path)
+
+
+class SaidaLote:
+    ''' Escreve cada resultado assim que termina (CSV ou JSONL), com flush por linha '''
+
+    def __init__(self, path: str, continuar: bool):
+        self.formato = _formato(path)
+        novo = not continuar or not os.path.exists(path) or os.path.getsize(path) == 0
+        self.f: TextIO = open(path, "w" if novo else "a", newline="", encoding="utf-8")
+        self.writer = None
+        if self.formato == "csv":
+            self.writer = csv.DictWriter(self.f, fieldnames=CAMPOS_SAIDA)
+            if novo:
+                self.writer.writeheader()
+
+    def escrever(self, row: Dict[str, Any]):
+        if self.writer is not None:
+            self.writer.writerow(row)
+        else:
+            self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+def montar_linha(index: int, name: str, uf: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "input_name": name,
+        "input_uf": uf,
+        "oab": result.get("inscricao"),
+        "name": result.get("nome"),
+        "uf": result.get("uf"),
+        "categoria": result.get("categoria"),
+        "data_inscricao": result.get("data_inscricao"),
+        "situacao": result.get("situacao"),
+        "error": result.get("error"),
+    }
+
+
+def _duracao(segundos: float) -> str:
+    segundos = int(segundos)
+    return f"{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+
+
+class Progresso:
+    ''' Linha de progresso com vazao e ETA (no maximo uma por intervalo) '''
+
+    def __init__(self, total: int, ja_feitos: int, intervalo: float = 1.0, out: TextIO = sys.stderr):
+        self.total = total
+        self.feitos = ja_feitos
+        self.nesta_execucao = 0
+        self.erros = 0
+        self.inicio = time.monotonic()
+        self.ultimo = 0.0
+        self.intervalo = intervalo
+        self.out = out
+
+    def avancar(self, erro: bool):
+        self.feitos += 1
+        self.nesta_execucao += 1
+        self.erros += int(erro)
+        self.mostrar()
+
+    def mostrar(self, final: bool = False):
+        agora = time.monotonic()
+        if not final and agora - self.ultimo < self.intervalo:
+            return
+        self.ultimo = agora
+        decorrido = max(agora - self.inicio, 1e-9)
+        vazao = self.nesta_execucao / decorrido
+        restantes = max(self.total - self.feitos, 0)
+        eta = _duracao(restantes / vazao) if vazao > 0 else "--:--:--"
+        pct = 100 * self.feitos / self.total if self.total else 100.0
+        print(f"{self.feitos}/{self.total} ({pct:.1f}%) | {vazao:.2f}/s | ETA {eta} | erros {self.erros}",
+              file=self.out, flush=True)
+
+
+async def _iniciar_pool(backend: Optional[str]) -> bool:
+    '''
+    Sobe o pool de browsers (com o perfil de bloqueio de recursos) para o backend
+    playwright, como no lifespan da API; sem ele cada linha abriria um Chromium.
+    Retorna True se o pool foi aberto aqui (e deve ser fechado no fim do lote).
+    '''
+    from .browser_pool import get_browser_pool, start_browser_pool
+    from .resource_blocking import get_routing_profile
+    if (backend or ScraperConfig.SCRAPER_BACKEND).lower() != "playwright":
+        return False
+    if not ScraperConfig.POOL_ENABLED or get_browser_pool() is not None:
+        return False
+    try:
+        perfil = get_routing_profile()
+        await start_browser_pool(context_setup=perfil.apply if perfil else None)
+        return True
+    except Exception as e:
+        print(f"Nao foi possivel iniciar o pool de browsers, usando browser por consulta: {e}", file=sys.stderr)
+        return False
+
+
+async def run_bulk(
+    entrada: str,
+    saida: str,
+    concurrency: int = 4,
+    checkpoint_path: Optional[str] = None,
+    backend: Optional[str] = None,
+    max_age: Optional[float] = None,
+    buscar: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None,
+    progresso_out: TextIO = sys.stderr,
+) -> Dict[str, Any]:
+    """
+    Consulta todos os pares nome/UF de `entrada` com `concurrency` consultas
+    simultaneas e escreve cada resultado em `saida` assim que termina.
+    Se existir checkpoint (padrao: <saida>.checkpoint.json), continua de onde parou
+    e acrescenta na saida; ao terminar, o checkpoint e apagado.
+    Retorna um resumo {"total", "processed", "errors", "elapsed"}.
+    """
+    # Pool de browsers so para a busca real (buscar=None)
+    pool_proprio = buscar is None and await _iniciar_pool(backend)
+    try:
+        return await _executar_lote(entrada, saida, concurrency, checkpoint_path, backend, max_age,
+                                    buscar or scrape_oab_async, progresso_out)
+    finally:
+        if buscar is None:
+            from .backends import close_backends
+            from .browser_pool import stop_browser_pool
+            await close_backends()
+            if pool_proprio:
+                await stop_browser_pool()
+
+
+async def _executar_lote(entrada: str, saida: str, concurrency: int, checkpoint_path: Optional[str],
+                         backend: Optional[str], max_age: Optional[float],
+                         buscar: Callable[..., Awaitable[Dict[str, Any]]],
+                         progresso_out: TextIO) -> Dict[str, Any]:
+    checkpoint_path = checkpoint_path or f"{saida}.checkpoint.json"
+    checkpoint = Checkpoint.carregar(checkpoint_path, entrada)
+    continuar = checkpoint is not None
+    checkpoint = checkpoint or Checkpoint(checkpoint_path, entrada)
+
+    total = contar_entrada(entrada)
+    progresso = Progresso(total, checkpoint.total, out=progresso_out)
+    if continuar:
+        print(f"Continuando do checkpoint: {checkpoint.total}/{total} ja processados", file=progresso_out)
+
+    out = SaidaLote(saida, continuar)
+    pendentes = (item for item in ler_entrada(entrada) if not checkpoint.feito(item[0]))
+
+    async def consultar(index: int, name: str, uf: str) -> Dict[str, Any]:
+        if not name or not uf:
+            return {"error": "Linha invalida: nome e UF sao obrigatorios"}
+        try:
+            return await buscar(name, uf, backend=backend, max_age=max_age)
+        except Exception as e:
+            return {"error": f"Erro inesperado: {e}"}
+
+    async def worker():
+        # Cada worker puxa a proxima linha: no maximo `concurrency` linhas em memoria
+        for index, name, uf in pendentes:
+            result = await consultar(index, name, uf)
+            out.escrever(montar_linha(index, name, uf, result))
+            checkpoint.marcar(index)
+            checkpoint.salvar()
+            progresso.avancar("error" in result)
+
+    inicio = time.monotonic()
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        # Interrompido (ou erro ao escrever): para os outros workers antes de fechar a saida
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        out.close()
+        progresso.mostrar(final=True)
+
+    # Terminou tudo: o checkpoint nao e mais necessario
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return {
+        "total": total,
+        "processed": progresso.nesta_execucao,
+        "errors": progresso.erros,
+        "elapsed": round(time.monotonic() - inicio, 3),
+    }
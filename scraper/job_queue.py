@@ -0,0 +1,253 @@
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+from .scraper_config import ScraperConfig
+
+# Estados de um job
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINALIZADOS = (DONE, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+"""
+
+
+class JobQueue:
+    """
+    Fila de jobs da API com estado num arquivo SQLite.
+    submit() grava o job e devolve o id na hora; workers dentro do processo
+    executam runner(request) e gravam o resultado (ou o erro).
+    Ao iniciar, jobs que estavam rodando quando o processo caiu voltam para a fila.
+    Jobs finalizados sao apagados depois de `retention` segundos.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        db_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        retention: Optional[float] = None,
+        cleanup_interval: Optional[float] = None,
+        error_backoff: Optional[float] = None,
+    ):
+        self.runner = runner
+        self.db_path = db_path if db_path is not None else ScraperConfig.JOBS_DB_PATH
+        self.workers = workers if workers is not None else ScraperConfig.JOBS_WORKERS
+        self.retention = retention if retention is not None else ScraperConfig.JOBS_RETENTION
+        self.cleanup_interval = (cleanup_interval if cleanup_interval is not None
+                                 else ScraperConfig.JOBS_CLEANUP_INTERVAL)
+        self.error_backoff = error_backoff if error_backoff is not None else ScraperConfig.JOBS_ERROR_BACKOFF
+        self._db: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        # Eventos dos jobs que alguem esta esperando (long-poll)
+        self._waiters: Dict[str, asyncio.Event] = {}
+        self.completed = 0
+        self.failed = 0
+        self.recovered = 0
+        self.cleaned = 0
+        self.db_errors = 0
+
+    async def start(self) -> "JobQueue":
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+        # Jobs interrompidos por um reinicio voltam para a fila
+        cursor = self._db.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+        )
+        self.recovered = cursor.rowcount
+        self._db.commit()
+
+        self._queue = asyncio.Queue()
+        for row in self._db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)):
+            self._queue.put_nowait(row["id"])
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+        if self.cleanup_interval > 0:
+            self._tasks.append(asyncio.create_task(self._limpar_periodicamente()))
+        return self
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        ''' Grava o job na fila e retorna o registro (com o id) '''
+        job_id = uuid.uuid4().hex
+        self._db.execute(
+            "INSERT INTO jobs (id, status, request, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(request, ensure_ascii=False), time.time())
+        )
+        self._db.commit()
+        self._queue.put_nowait(job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "request": json.loads(row["request"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        ''' Long-poll: espera o job terminar (ate timeout) e retorna o estado atual '''
+        job = self.get(job_id)
+        if job is None or job["status"] in FINALIZADOS or timeout <= 0:
+            return job
+        evento = self._waiters.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(evento.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get(job_id)
+
+    async def _worker(self):
+        erros_seguidos = 0
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.get(job_id)
+                # Job pode ter sido apagado ou ja executado (entrou duas vezes na fila)
+                if job is None or job["status"] != QUEUED:
+                    continue
+                self._atualizar(job_id, status=RUNNING, started_at=time.time())
+                erros_seguidos = 0
+            except sqlite3.Error as e:
+                # Banco travado/com erro: o job continua na fila e o worker segue vivo
+                erros_seguidos += 1
+                await self._esperar_apos_erro(f"Erro ao pegar o job {job_id}", e, erros_seguidos)
+                self._queue.put_nowait(job_id)
+                continue
+
+            try:
+                result = await self.runner(job["request"])
+            except asyncio.CancelledError:
+                # Desligando: o job volta para a fila no proximo start
+                raise
+            except Exception as e:
+                self.failed += 1
+                await self._finalizar(job_id, status=FAILED, error=str(e) or type(e).__name__,
+                                      finished_at=time.time())
+            else:
+                self.completed += 1
+                await self._finalizar(job_id, status=DONE, result=json.dumps(result, ensure_ascii=False),
+                                      finished_at=time.time())
+
+            evento = self._waiters.pop(job_id, None)
+            if evento is not None:
+                evento.set()
+
+    async def _finalizar(self, job_id: str, **campos):
+        ''' Grava o fim do job, insistindo enquanto o SQLite der erro (o resultado so existe aqui) '''
+        tentativa = 1
+        while True:
+            try:
+                self._atualizar(job_id, **campos)
+                return
+            except sqlite3.Error as e:
+                await self._esperar_apos_erro(f"Erro ao gravar o fim do job {job_id}", e, tentativa)
+                tentativa += 1
+
+    async def _esperar_apos_erro(self, contexto: str, erro: sqlite3.Error, tentativa: int):
+        self.db_errors += 1
+        espera = min(self.error_backoff * 2 ** (tentativa - 1), 30.0)
+        print(f"{contexto}: {erro} (nova tentativa em {espera:.1f}s)")
+        await asyncio.sleep(espera)
+
+    def _atualizar(self, job_id: str, **campos):
+        colunas = ", ".join(f"{nome} = ?" for nome in campos)
+        self._db.execute(f"UPDATE jobs SET {colunas} WHERE id = ?", (*campos.values(), job_id))
+        self._db.commit()
+
+    def cleanup(self) -> int:
+        ''' Apaga jobs finalizados ha mais de `retention` segundos '''
+        cursor = self._db.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+            (*FINALIZADOS, time.time() - self.retention)
+        )
+        self._db.commit()
+        self.cleaned += cursor.rowcount
+        return cursor.rowcount
+
+    async def _limpar_periodicamente(self):
+        while True:
+            try:
+                self.cleanup()
+            except sqlite3.Error as e:
+                print(f"Erro ao limpar jobs antigos: {e}")
+            await asyncio.sleep(self.cleanup_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        contagem = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        if self._db is not None:
+            for row in self._db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+                contagem[row["status"]] = row["n"]
+        return {
+            "workers": self.workers,
+            "jobs": contagem,
+            "completed": self.completed,
+            "failed": self.failed,
+            "recovered": self.recovered,
+            "cleaned": self.cleaned,
+            "db_errors": self.db_errors,
+            "retention": self.retention,
+        }
+
+
+# Fila global da API (criada no startup)
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    return _queue
+
+
+async def start_job_queue(runner: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]], **kwargs) -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = await JobQueue(runner, **kwargs).start()
+    return _queue
+
+
+async def stop_job_queue():
+    global _queue
+    if _queue is not None:
+        await _queue.stop()
+        _queue = None
@@ -0,0 +1,231 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Buckets (segundos) das etapas do scraper: de cliques rapidos ate o timeout do browser
+BUCKETS_PADRAO = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(nomes: Sequence[str], valores: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metric:
+    tipo = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _chave(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[nome]) for nome in self.labelnames)
+
+    def _amostras(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        linhas = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.tipo}"]
+        with self._lock:
+            linhas.extend(self._amostras())
+        return "\n".join(linhas)
+
+
+class Counter(_Metric):
+    """Contador que so aumenta (ex: consultas por UF e resultado)"""
+    tipo = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._valores.get(self._chave(labels), 0)
+
+    def _amostras(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, chave)} {_numero(valor)}"
+                for chave, valor in sorted(self._valores.items())]
+
+
+class Gauge(_Metric):
+    """Valor que sobe e desce (ex: consultas em andamento)"""
+    tipo = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sem labels a serie existe desde o inicio (0)
+        self._valores: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+
+    def set(self, value: float, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = value
+
+    def inc(self, amount: float = 1, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._valores.get(self._chave(labels), 0)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _amostras(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, chave)} {_numero(valor)}"
+                for chave, valor in sorted(self._valores.items())]
+
+
+class Histogram(_Metric):
+    """Histograma de duracoes com buckets acumulados (formato do Prometheus)"""
+    tipo = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_PADRAO):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # chave -> (contagem por bucket, soma, total)
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        chave = self._chave(labels)
+        with self._lock:
+            serie = self._series.setdefault(chave, [[0] * len(self.buckets), 0.0, 0])
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += value
+            serie[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        ''' Mede o bloco (tambem serve para blocos com await dentro) '''
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **labels)
+
+    def count(self, **labels) -> int:
+        serie = self._series.get(self._chave(labels))
+        return serie[2] if serie else 0
+
+    def _amostras(self) -> List[str]:
+        linhas = []
+        for chave, (contagens, soma, total) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, n in zip(self.buckets, contagens):
+                acumulado += n
+                linhas.append(f"{self.name}_bucket{_labels(self.labelnames, chave, ('le', _numero(limite)))} {acumulado}")
+            linhas.append(f"{self.name}_sum{_labels(self.labelnames, chave)} {_numero(soma)}")
+            linhas.append(f"{self.name}_count{_labels(self.labelnames, chave)} {total}")
+        return linhas
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metrica ja registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = BUCKETS_PADRAO) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        ''' Texto no formato de exposicao do Prometheus (text/plain; version=0.0.4) '''
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Registro global e metricas do scraper
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "oab_stage_duration_seconds",
+    "Duracao de cada etapa da consulta no CNA (goto, formulario, espera, extracao, modal, imagem, ocr...)",
+    ["stage"],
+)
+LOOKUP_SECONDS = REGISTRY.histogram(
+    "oab_lookup_duration_seconds",
+    "Duracao total de scrape_oab_async por origem da resposta (cna ou registry)",
+    ["source"],
+)
+LOOKUPS = REGISTRY.counter(
+    "oab_lookups_total",
+    "Consultas por UF e resultado (success, not_found, error)",
+    ["uf", "outcome"],
+)
+LOOKUPS_IN_FLIGHT = REGISTRY.gauge(
+    "oab_lookups_in_flight",
+    "Consultas de scrape_oab_async em andamento",
+)
+CNA_IN_FLIGHT = REGISTRY.gauge(
+    "oab_cna_requests_in_flight",
+    "Consultas em andamento no CNA (dentro do limitador) por UF",
+    ["uf"],
+)
+OCR_CACHE_LOOKUPS = REGISTRY.counter(
+    "oab_ocr_cache_lookups_total",
+    "Consultas ao cache do OCR por resultado (hit, miss)",
+    ["result"],
+)
+
+# Estado dos componentes, atualizado pelo proprio componente quando muda
+# (emprestimo/devolucao de pagina, entrada/saida do OCR, fim de consulta no limitador)
+BROWSER_POOL_PAGES = REGISTRY.gauge(
+    "oab_browser_pool_pages",
+    "Paginas do pool de browsers por estado (leased, available)",
+    ["state"],
+)
+OCR_QUEUE_DEPTH = REGISTRY.gauge(
+    "oab_ocr_queue_depth",
+    "Imagens esperando ou em OCR no pool de processos",
+)
+LIMITER_LIMIT = REGISTRY.gauge(
+    "oab_limiter_limit",
+    "Limite atual de consultas simultaneas ao CNA (global ou por UF)",
+    ["scope"],
+)
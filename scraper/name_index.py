@@ -0,0 +1,191 @@
+import heapq
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+from .oab_scraper import normalizar_nome
+from .scraper_config import ScraperConfig
+
+
+def trigramas(nome_normalizado: str) -> Set[str]:
+    ''' Trigramas de cada palavra com bordas ("  JOAO " -> "  J", " JO", "JOA", "OAO", "AO ") '''
+    grams = set()
+    for palavra in nome_normalizado.split():
+        palavra = f"  {palavra} "
+        grams.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return grams
+
+
+_VAZIO: Dict[int, Set[tuple]] = {}
+
+
+def _palavras_parecidas(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    grams_a, grams_b = trigramas(a), trigramas(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b) >= 0.3
+
+
+def mesma_ordem(nome_a: str, nome_b: str) -> bool:
+    '''
+    As palavras de nome_a que tem uma parecida em nome_b aparecem na mesma ordem
+    nos dois nomes (nomes normalizados; palavras sobrando ou faltando sao aceitas)
+    '''
+    palavras_a, palavras_b = nome_a.split(), nome_b.split()
+    com_par = sum(1 for a in palavras_a if any(_palavras_parecidas(a, b) for b in palavras_b))
+    # Maior subsequencia comum de palavras parecidas
+    anterior = [0] * (len(palavras_b) + 1)
+    for a in palavras_a:
+        atual = [0]
+        for j, b in enumerate(palavras_b):
+            atual.append(anterior[j] + 1 if _palavras_parecidas(a, b) else max(anterior[j + 1], atual[j]))
+        anterior = atual
+    return anterior[-1] == com_par
+
+
+class NameIndex:
+    """
+    Indice em memoria de trigramas dos nomes ja conhecidos (normalizados sem acento).
+    search() rankeia pela similaridade de Jaccard entre os trigramas da consulta
+    e os de cada nome, filtrando por UF; cobre erros de digitacao, acentos e
+    nomes do meio faltando. So os nomes que ainda podem entrar no top `limit`
+    sao comparados (trigramas raros primeiro, postings separados por tamanho).
+    """
+
+    def __init__(self):
+        # Um nome por (uf, inscricao)
+        self._nomes: Dict[tuple, Dict[str, Any]] = {}
+        # (uf ou None, trigrama) -> numero de trigramas do nome -> chaves (uf, inscricao)
+        self._postings: Dict[tuple, Dict[int, Set[tuple]]] = defaultdict(lambda: defaultdict(set))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._nomes)
+
+    def add(self, nome: str, uf: str, inscricao: str):
+        if not nome or not uf or not inscricao:
+            return
+        chave = (uf.strip().upper(), str(inscricao).strip())
+        normalizado = normalizar_nome(nome)
+        grams = trigramas(normalizado)
+        with self._lock:
+            antigo = self._nomes.get(chave)
+            if antigo is not None:
+                if antigo["normalizado"] == normalizado:
+                    return
+                self._remover_postings(chave, antigo["grams"])
+            self._nomes[chave] = {"nome": nome, "normalizado": normalizado, "grams": grams}
+            for gram in grams:
+                self._postings[(None, gram)][len(grams)].add(chave)
+                self._postings[(chave[0], gram)][len(grams)].add(chave)
+
+    def add_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            if "error" not in record:
+                self.add(record.get("nome"), record.get("uf"), record.get("inscricao"))
+
+    def _remover_postings(self, chave: tuple, grams: Set[str]):
+        for gram in grams:
+            self._postings[(None, gram)][len(grams)].discard(chave)
+            self._postings[(chave[0], gram)][len(grams)].discard(chave)
+
+    def search(self, query: str, uf: Optional[str] = None, limit: int = 5,
+               min_score: Optional[float] = None) -> List[Dict[str, Any]]:
+        ''' Nomes mais parecidos com a consulta: [{"nome", "uf", "inscricao", "score"}] '''
+        min_score = min_score if min_score is not None else ScraperConfig.NAME_INDEX_MIN_SCORE
+        grams = trigramas(normalizar_nome(query))
+        if not grams or limit <= 0:
+            return []
+        filtro = uf.strip().upper() if uf else None
+        total = len(grams)
+
+        resultados = []
+        melhores: List[float] = []  # heap com os `limit` melhores scores
+
+        def descartar(teto: float) -> bool:
+            # Nem o maior score possivel passa do corte (min_score ou o pior dos `limit` melhores)
+            if teto < min_score:
+                return True
+            return len(melhores) == limit and teto < melhores[0] and round(teto, 3) < melhores[0]
+
+        with self._lock:
+            # Trigramas mais raros primeiro: um nome que so aparece a partir do i-esimo
+            # divide no maximo total - i trigramas com a consulta
+            postings = [self._postings.get((filtro, gram), _VAZIO) for gram in grams]
+            postings.sort(key=lambda por_tamanho: sum(map(len, por_tamanho.values())))
+            vistos: Set[tuple] = set()
+            for i, por_tamanho in enumerate(postings):
+                restantes = total - i
+                if descartar(restantes / total):
+                    break
+                # Tamanhos mais perto do da consulta primeiro: enchem os `limit` melhores mais cedo
+                for tamanho in sorted(por_tamanho, key=lambda tamanho: abs(tamanho - total)):
+                    chaves = por_tamanho[tamanho]
+                    # Score maximo de um nome com `tamanho` trigramas visto pela primeira vez aqui
+                    if descartar(min(restantes, tamanho) / max(total, tamanho + i)):
+                        continue
+                    novos = chaves - vistos
+                    vistos |= novos
+                    for chave in novos:
+                        entrada = self._nomes[chave]
+                        n = len(grams & entrada["grams"])
+                        score = n / (total + tamanho - n)
+                        if score < min_score:
+                            continue
+                        score = round(score, 3)
+                        if len(melhores) < limit:
+                            heapq.heappush(melhores, score)
+                        elif score >= melhores[0]:
+                            heapq.heappushpop(melhores, score)
+                        else:
+                            continue
+                        resultados.append({"nome": entrada["nome"], "uf": chave[0],
+                                           "inscricao": chave[1], "score": score})
+
+        resultados.sort(key=lambda r: (-r["score"], r["nome"], r["inscricao"]))
+        return resultados[:limit]
+
+    def canonical(self, query: str, uf: Optional[str] = None,
+                  min_score: Optional[float] = None) -> Optional[str]:
+        """
+        Nome conhecido para repetir a consulta que o CNA nao encontrou, ou None.
+        So reescreve quando o melhor nome passa de min_score, nao e o proprio
+        nome da consulta, tem as palavras na mesma ordem da consulta e nao
+        empata com outro nome diferente.
+        """
+        min_score = min_score if min_score is not None else ScraperConfig.NAME_REWRITE_MIN_SCORE
+        normalizado = normalizar_nome(query)
+        candidatos = self.search(query, uf, limit=10, min_score=min_score)
+        if not candidatos or normalizar_nome(candidatos[0]["nome"]) == normalizado:
+            return None
+        melhor = candidatos[0]
+        # Os trigramas ignoram a ordem: "JOAO SILVA SANTOS" nao e "JOAO SANTOS SILVA"
+        if not mesma_ordem(normalizado, normalizar_nome(melhor["nome"])):
+            return None
+        for outro in candidatos[1:]:
+            if normalizar_nome(outro["nome"]) != normalizar_nome(melhor["nome"]):
+                if outro["score"] >= melhor["score"]:
+                    return None
+                break
+        return melhor["nome"]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "names": len(self._nomes),
+            "trigrams": sum(1 for (uf, _), por_tamanho in self._postings.items()
+                            if uf is None and any(por_tamanho.values())),
+        }
+
+
+# Indice global, carregado do registro local no primeiro uso
+_index: Optional[NameIndex] = None
+
+
+def get_name_index() -> NameIndex:
+    global _index
+    if _index is None:
+        _index = NameIndex()
+        from .registry import get_registry
+        registry = get_registry()
+        if registry is not None:
+            _index.add_many(registry.all_names())
+    return _index
@@ -0,0 +1,169 @@
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Dict, Iterable, List, Optional, Tuple
+from .scraper_config import ScraperConfig
+
+
+class OABClient:
+    """
+    Cliente sincrono do scraper para scripts e workers (Celery, cron...).
+    Mantem uma thread com um event loop de vida longa: o pool de browsers, o
+    client HTTP do backend e os limitadores sao criados uma vez e reaproveitados
+    entre as consultas, em vez de um loop (e um browser) novo por chamada.
+    lookup() e lookup_many() podem ser chamados de varias threads ao mesmo tempo.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        max_age: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        pool: Optional[bool] = None,
+    ):
+        self.backend = (backend or ScraperConfig.SCRAPER_BACKEND).lower()
+        self.max_age = max_age
+        self.concurrency = concurrency or ScraperConfig.BATCH_CONCURRENCY
+        # O pool de browsers so faz sentido para o backend playwright
+        self.pool = pool if pool is not None else ScraperConfig.POOL_ENABLED and self.backend == "playwright"
+        self.lookups = 0
+        # Pool de browsers e backend playwright do proprio cliente (presos ao loop dele)
+        self._pool = None
+        self._playwright = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="oab-client", daemon=True)
+        self._thread.start()
+        if self.pool:
+            self._executar(self._iniciar_pool())
+
+    def _executar(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        ''' Roda a coroutine no loop do cliente e espera o resultado na thread de quem chamou '''
+        if self._closed:
+            coro.close()
+            raise RuntimeError("OABClient fechado")
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("OABClient nao pode ser chamado de dentro do proprio loop")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def _iniciar_pool(self):
+        from .browser_pool import BrowserPool
+        from .resource_blocking import get_routing_profile
+        # Um pool por cliente: o pool global (da API ou de outro cliente) e de outro event loop
+        try:
+            perfil = get_routing_profile()
+            self._pool = await BrowserPool(context_setup=perfil.apply if perfil else None).start()
+        except Exception as e:
+            print(f"Nao foi possivel iniciar o pool de browsers, usando browser por consulta: {e}")
+
+    def _backend(self, backend: Optional[str]):
+        ''' O backend playwright usa o pool deste cliente; os outros sao os globais '''
+        from .backends import PlaywrightBackend
+        nome = (backend or self.backend).lower()
+        if nome != PlaywrightBackend.name:
+            return nome
+        if self._playwright is None:
+            self._playwright = PlaywrightBackend(pool=self._pool)
+        return self._playwright
+
+    async def _consultar(self, name: str, uf: str, backend: Optional[str], max_age: Optional[float]) -> Dict[str, Any]:
+        from .oab_scraper import scrape_oab_async
+        self.lookups += 1
+        try:
+            return await scrape_oab_async(name, uf, backend=self._backend(backend),
+                                          max_age=max_age if max_age is not None else self.max_age)
+        except Exception as e:
+            return {"error": f"Erro inesperado: {e}"}
+
+    async def _consultar_varios(self, consultas: List[Tuple[str, str]], concurrency: int,
+                                backend: Optional[str], max_age: Optional[float]) -> List[Dict[str, Any]]:
+        vagas = asyncio.Semaphore(max(1, concurrency))
+
+        async def consultar(name: str, uf: str) -> Dict[str, Any]:
+            async with vagas:
+                return await self._consultar(name, uf, backend, max_age)
+
+        return await asyncio.gather(*(consultar(name, uf) for name, uf in consultas))
+
+    def lookup(self, name: str, uf: str, backend: Optional[str] = None, max_age: Optional[float] = None,
+               timeout: Optional[float] = None) -> Dict[str, Any]:
+        ''' Mesmo resultado de scrape_oab_async; timeout (segundos) levanta TimeoutError '''
+        return self._executar(self._consultar(name, uf, backend, max_age), timeout)
+
+    def lookup_many(self, consultas: Iterable[Tuple[str, str]], concurrency: Optional[int] = None,
+                    backend: Optional[str] = None, max_age: Optional[float] = None,
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        ''' Varios pares (nome, uf) com ate `concurrency` consultas simultaneas; resultados na ordem da entrada '''
+        consultas = list(consultas)
+        return self._executar(
+            self._consultar_varios(consultas, concurrency or self.concurrency, backend, max_age), timeout
+        )
+
+    async def _fechar(self):
+        from .backends import close_backends
+        await close_backends()
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.stop()
+
+    def close(self):
+        ''' Fecha o pool de browsers do cliente, os backends e o loop '''
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._executar(self._fechar())
+            except Exception as e:
+                print(f"Erro ao fechar o OABClient: {e}")
+            self._closed = True
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __enter__(self) -> "OABClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "lookups": self.lookups,
+            "pool": self._pool is not None,
+            "closed": self._closed,
+        }
+
+
+# Cliente global usado por scrape_oab, criado na primeira consulta
+_client: Optional[OABClient] = None
+_client_lock = threading.Lock()
+
+
+def get_oab_client() -> OABClient:
+    global _client
+    with _client_lock:
+        if _client is None or _client.closed:
+            _client = OABClient()
+            atexit.register(_client.close)
+        return _client
+
+
+def close_oab_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            client, _client = _client, None
+            client.close()
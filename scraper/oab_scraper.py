@@ -1,12 +1,23 @@
-from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import asyncio
-from typing import Dict, Any
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Any, List, Optional, Tuple, Union
+from contextlib import aclosing
 import re
 import pytesseract
 from PIL import Image
-import requests
 from io import BytesIO
+import sqlite3
+import time
 import unicodedata
+from .ocr_cache import get_ocr_cache
+from .ocr_pool import submit_ocr
+from .scraper_config import ScraperConfig
+from .singleflight import get_singleflight
+from .rate_limiter import get_rate_limiter, eh_falha, eh_ocupado
+from .metrics import STAGE_SECONDS, LOOKUP_SECONDS, LOOKUPS, LOOKUPS_IN_FLIGHT, CNA_IN_FLIGHT, OCR_CACHE_LOOKUPS
+
+if TYPE_CHECKING:
+    from .backends import SearchBackend
 
 
 def validar_parametros(name: str, uf: str) -> Dict[str, Any]:
@@ -36,151 +47,185 @@ def validar_parametros(name: str, uf: str) -> Dict[str, Any]:
     return {"name": name_clean, "uf": uf_clean}
 
 
+# Seletores tentados em ordem para cada campo (variacoes de layout do CNA)
+SELETORES_CAMPOS = {
+    "nome": [
+        ".rowName span:nth-child(2)",
+        ".rowName span:last-child",
+        ".rowName .nome",
+        ".nome"
+    ],
+    "inscricao": [
+        ".rowInsc span:last-child",
+        ".rowInsc .inscricao",
+        ".inscricao"
+    ],
+    "uf": [
+        ".rowUf span:last-child",
+        ".rowUf .uf",
+        ".uf"
+    ],
+    "categoria": [
+        ".rowTipoInsc span:last-child",
+        ".rowTipoInsc .tipo",
+        ".tipo",
+        ".categoria"
+    ],
+    "data_inscricao": [
+        ".rowData span:last-child",
+        ".rowData .data",
+        ".data",
+        ".dataInscricao"
+    ],
+    "situacao": [
+        ".rowSituacao span:last-child",
+        ".rowSituacao .situacao",
+        ".situacao",
+        ".status",
+        ".rowStatus span:last-child"
+    ],
+}
+
+SITUACAO_KEYWORDS = ["ATIVO", "INATIVO", "SUSPENSO", "CANCELADO", "REGULAR", "FALECIDO"]
+CATEGORIA_KEYWORDS = ["ADVOGADO", "ESTAGIÁRIO", "ESTAGIARIO"]
+
+# Roda dentro do browser: aplica todos os fallbacks numa unica ida e volta
+EXTRAIR_DADOS_JS = """
+(row, cfg) => {
+    const texto = (el) => (el.innerText || '').trim();
+    const temData = (t) => /\\d{2}\\/\\d{2}\\/\\d{4}/.test(t);
+    const dados = {};
+
+    for (const [campo, seletores] of Object.entries(cfg.campos)) {
+        for (const seletor of seletores) {
+            const el = row.querySelector(seletor);
+            if (!el) continue;
+            const valor = texto(el);
+            // Data so vale se tiver cara de data, senao tenta o proximo seletor
+            if (campo === 'data_inscricao' && !temData(valor)) continue;
+            dados[campo] = valor;
+            break;
+        }
+    }
+
+    // Se nao encontrou situacao especifica, busca no texto completo da linha
+    if (!('situacao' in dados)) {
+        const rowText = (row.innerText || '').toUpperCase();
+        const keyword = cfg.situacoes.find((k) => rowText.includes(k));
+        if (keyword) dados.situacao = keyword;
+    }
+
+    // Busca alternativa: identifica os campos pelos textos dos spans
+    if (Object.keys(dados).length < 4) {
+        const spanTexts = Array.from(row.querySelectorAll('span')).map(texto).filter((t) => t);
+        for (const t of spanTexts) {
+            const upper = t.toUpperCase();
+            if (temData(t) && !('data_inscricao' in dados)) {
+                dados.data_inscricao = t;
+            } else if (/^\\d+$/.test(t) && !('inscricao' in dados)) {
+                dados.inscricao = t;
+            } else if (t.length === 2 && t === upper && t !== t.toLowerCase() && !('uf' in dados)) {
+                dados.uf = t;
+            } else if (cfg.categorias.includes(upper) && !('categoria' in dados)) {
+                dados.categoria = t;
+            } else if (cfg.situacoes.includes(upper) && !('situacao' in dados)) {
+                dados.situacao = t;
+            } else if (t.split(/\\s+/).length >= 2 && !('nome' in dados)) {
+                dados.nome = t;
+            }
+        }
+    }
+    return dados;
+}
+"""
+
+EXTRAIR_TODAS_JS = f"(rows, cfg) => rows.map((row) => ({EXTRAIR_DADOS_JS})(row, cfg))"
+
+_EXTRAIR_DADOS_ARGS = {
+    "campos": SELETORES_CAMPOS,
+    "situacoes": SITUACAO_KEYWORDS,
+    "categorias": CATEGORIA_KEYWORDS,
+}
+
+
 async def extrair_dados_avancados(page, row) -> Dict[str, Any]:
     """
     Extrai dados avancados do resultado, incluindo data de inscricao e situacao.
-    Uso multiplos seletores para a variacoes de layout.
+    Uso multiplos seletores para a variacoes de layout, todos avaliados
+    no browser numa unica chamada (row.evaluate).
     """
-    dados = {}
-    
     try:
-        # Nome - múltiplos seletores possiveis
-        nome_selectors = [
-            ".rowName span:nth-child(2)",
-            ".rowName span:last-child",
-            ".rowName .nome",
-            ".nome"
-        ]
-        
-        for selector in nome_selectors:
-            nome_elem = await row.query_selector(selector)
-            if nome_elem:
-                dados["nome"] = (await nome_elem.inner_text()).strip()
-                break
-        
-        # Inscricao - múltiplos seletores
-        inscricao_selectors = [
-            ".rowInsc span:last-child",
-            ".rowInsc .inscricao",
-            ".inscricao"
-        ]
-        
-        for selector in inscricao_selectors:
-            inscricao_elem = await row.query_selector(selector)
-            if inscricao_elem:
-                dados["inscricao"] = (await inscricao_elem.inner_text()).strip()
-                break
-        
-        # UF - múltiplos seletores
-        uf_selectors = [
-            ".rowUf span:last-child",
-            ".rowUf .uf",
-            ".uf"
-        ]
-        
-        for selector in uf_selectors:
-            uf_elem = await row.query_selector(selector)
-            if uf_elem:
-                dados["uf"] = (await uf_elem.inner_text()).strip()
-                break
-        
-        # Categoria/Tipo - múltiplos seletores
-        tipo_selectors = [
-            ".rowTipoInsc span:last-child",
-            ".rowTipoInsc .tipo",
-            ".tipo",
-            ".categoria"
-        ]
-        
-        for selector in tipo_selectors:
-            tipo_elem = await row.query_selector(selector)
-            if tipo_elem:
-                dados["categoria"] = (await tipo_elem.inner_text()).strip()
-                break
-        
-        # Data de inscricao - busca por padroes de data
-        data_selectors = [
-            ".rowData span:last-child",
-            ".rowData .data",
-            ".data",
-            ".dataInscricao"
-        ]
-        
-        for selector in data_selectors:
-            data_elem = await row.query_selector(selector)
-            if data_elem:
-                data_text = (await data_elem.inner_text()).strip()
-                # Verifica se contém padrao de data
-                if re.search(r'\d{2}/\d{2}/\d{4}', data_text):
-                    dados["data_inscricao"] = data_text
-                    break
-        
-        # Situacao atual - busca por status/situacao
-        situacao_selectors = [
-            ".rowSituacao span:last-child",
-            ".rowSituacao .situacao",
-            ".situacao",
-            ".status",
-            ".rowStatus span:last-child"
-        ]
-        
-        for selector in situacao_selectors:
-            situacao_elem = await row.query_selector(selector)
-            if situacao_elem:
-                dados["situacao"] = (await situacao_elem.inner_text()).strip()
-                break
-        
-        # Se nao encontrou situacao especifica, tenta buscar no texto completo da linha
-        if "situacao" not in dados:
-            row_text = await row.inner_text()
-            # Busca por palavras-chave de situacao
-            situacao_keywords = ["ATIVO", "INATIVO", "SUSPENSO", "CANCELADO", "REGULAR", "FALECIDO"]
-            for keyword in situacao_keywords:
-                if keyword in row_text.upper():
-                    dados["situacao"] = keyword
-                    break
-        
-        # Busca alternativa: tenta extrair todos os spans da linha
-        if len(dados) < 4:  # Se nao conseguiu extrair pelo menos 4 campos
-            all_spans = await row.query_selector_all("span")
-            span_texts = []
-            for span in all_spans:
-                text = (await span.inner_text()).strip()
-                if text:
-                    span_texts.append(text)
-            
-            # Tenta identificar campos pelos textos
-            for i, text in enumerate(span_texts):
-                if re.search(r'\d{2}/\d{2}/\d{4}', text) and "data_inscricao" not in dados:
-                    dados["data_inscricao"] = text
-                elif re.search(r'^\d+$', text) and "inscricao" not in dados:
-                    dados["inscricao"] = text
-                elif len(text) == 2 and text.isupper() and "uf" not in dados:
-                    dados["uf"] = text
-                elif text.upper() in ["ADVOGADO", "ESTAGIÁRIO", "ESTAGIARIO"] and "categoria" not in dados:
-                    dados["categoria"] = text
-                elif text.upper() in ["ATIVO", "INATIVO", "SUSPENSO", "CANCELADO", "REGULAR", "FALECIDO"] and "situacao" not in dados:
-                    dados["situacao"] = text
-                elif len(text.split()) >= 2 and "nome" not in dados:
-                    dados["nome"] = text
-        
+        return await row.evaluate(EXTRAIR_DADOS_JS, _EXTRAIR_DADOS_ARGS)
     except Exception as e:
         print(f"Erro ao extrair dados avancados: {e}")
-    
-    return dados
+        return {}
+
+
+async def extrair_todas_linhas(page, selector: str = "#divResult .row") -> List[Dict[str, Any]]:
+    """
+    Extrai os dados de todas as linhas de resultado da pagina numa unica chamada.
+    """
+    try:
+        return await page.eval_on_selector_all(selector, EXTRAIR_TODAS_JS, _EXTRAIR_DADOS_ARGS)
+    except Exception as e:
+        print(f"Erro ao extrair dados avancados: {e}")
+        return []
+
+
+# Estados possiveis de aguardar_resultados
+RESULTADOS = "resultados"
+SEM_RESULTADOS = "sem_resultados"
+
+# Avaliado no browser a cada frame ate o #divResult ficar pronto
+RESULTADOS_PRONTOS_JS = """
+(mensagensVazio) => {
+    const div = document.querySelector('#divResult');
+    if (!div) return null;
+    if (div.querySelector('.row')) return 'resultados';
+    const texto = (div.innerText || '')
+        .normalize('NFD').replace(/[\\u0300-\\u036f]/g, '').toUpperCase();
+    if (mensagensVazio.some((msg) => texto.includes(msg))) return 'sem_resultados';
+    return null;
+}
+"""
+
+# Mensagens que o CNA mostra quando a busca nao encontra ninguem (sem acento)
+MENSAGENS_SEM_RESULTADO = ["NENHUM", "NAO FORAM ENCONTRADOS", "NAO ENCONTRAD"]
+
+
+async def aguardar_resultados(page, timeout: int = None) -> str:
+    """
+    Espera a busca terminar de verdade em vez de um tempo fixo.
+    Retorna RESULTADOS quando o #divResult tem linhas, SEM_RESULTADOS quando o CNA
+    avisa que nao achou ninguem. Levanta PlaywrightTimeoutError se nada disso acontecer.
+    """
+    timeout = timeout if timeout is not None else ScraperConfig.RESULT_TIMEOUT
+    handle = await page.wait_for_function(
+        RESULTADOS_PRONTOS_JS, arg=MENSAGENS_SEM_RESULTADO, timeout=timeout
+    )
+    return await handle.json_value()
 
 
 def remover_acentos(txt):
     return ''.join(c for c in unicodedata.normalize('NFD', txt) if unicodedata.category(c) != 'Mn')
 
 
-async def extrair_situacao_modal(page):
-    await page.wait_for_selector("#imgDetail", timeout=10000)
-    img_elem = await page.query_selector("#imgDetail")
-    img_url = await img_elem.get_attribute("src")
-    if img_url.startswith("/"):
-        img_url = "https://cna.oab.org.br" + img_url
-    img_data = requests.get(img_url).content
+def normalizar_nome(name: str) -> str:
+    ''' Nome sem acento, maiusculo e com espacos normalizados '''
+    return " ".join(remover_acentos(name or "").upper().split())
+
+
+def chave_consulta(name: str, uf: str, *extras: Any) -> str:
+    ''' Nome normalizado + UF (+ opcoes da consulta) '''
+    partes = [normalizar_nome(name), (uf or "").strip().upper()] + [str(extra) for extra in extras]
+    return "|".join(partes)
+
+
+def ocr_situacao(img_data: bytes) -> str:
+    """
+    Faz o OCR da imagem de detalhe (#imgDetail) e devolve a situacao do advogado.
+    Usado tanto pelo fluxo com browser quanto pelo backend HTTP.
+    """
     image = Image.open(BytesIO(img_data))
     try:
         texto = pytesseract.image_to_string(image, lang="por")
@@ -195,109 +240,438 @@ async def extrair_situacao_modal(page):
     return texto_limpo
 
 
-async def scrape_oab_async(name: str, uf: str) -> Dict[str, Any]:
+async def situacao_da_imagem(img_data: bytes, ocr: Callable[[bytes], str] = ocr_situacao) -> str:
+    """
+    OCR da imagem de detalhe com cache pelo hash dos bytes.
+    Imagens repetidas nao passam de novo pelo Tesseract; as novas vao para
+    o pool de processos para nao travar o event loop.
+    """
+    cache = get_ocr_cache()
+    chave = cache.chave(img_data)
+    situacao = cache.get(chave)
+    OCR_CACHE_LOOKUPS.inc(result="hit" if situacao is not None else "miss")
+    if situacao is None:
+        with STAGE_SECONDS.time(stage="ocr"):
+            situacao = await submit_ocr(ocr, img_data)
+        cache.set(chave, situacao)
+    return situacao
+
+
+async def extrair_situacao_modal(page):
+    # So precisa do src: a imagem e baixada a parte (mesmo se o perfil bloquear imagens na pagina)
+    with STAGE_SECONDS.time(stage="modal_wait"):
+        await page.wait_for_selector("#imgDetail", state="attached", timeout=10000)
+        img_elem = await page.query_selector("#imgDetail")
+        img_url = await img_elem.get_attribute("src")
+    if img_url.startswith("/"):
+        img_url = ScraperConfig.CNA_BASE_URL + img_url
+    # Baixa a imagem pela propria sessao do browser (assincrono, mesmos cookies)
+    with STAGE_SECONDS.time(stage="image_download"):
+        response = await page.request.get(img_url)
+        img_data = await response.body()
+    return await situacao_da_imagem(img_data)
+
+
+def completar_campos(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Garante que todos os campos da resposta estejam presentes"""
+    campos_obrigatorios = ["nome", "inscricao", "uf", "categoria"]
+    for campo in campos_obrigatorios:
+        if campo not in data or not data[campo]:
+            data[campo] = "Nao encontrado"
+    # Adiciona campos opcionais se nao encontrados
+    if "data_inscricao" not in data or not data["data_inscricao"]:
+        data["data_inscricao"] = "Nao encontrada"
+    if "situacao" not in data or not data["situacao"]:
+        data["situacao"] = "Nao encontrada"
+    return data
+
+
+# Controles de paginacao e de fechar o modal de detalhe (variacoes de layout)
+PROXIMA_PAGINA_SELECTORS = [
+    "#divPagination .next:not(.disabled) a",
+    ".pagination li.next:not(.disabled) a",
+    ".pagination a[rel='next']",
+    "a[aria-label='Próxima']"
+]
+
+FECHAR_MODAL_SELECTORS = [
+    ".modal.show .close",
+    ".modal.in .close",
+    "button[data-dismiss='modal']"
+]
+
+# Item que os iteradores com sondar=True geram no fim quando o CNA tem mais advogados que max_results
+MAIS_RESULTADOS = "mais_resultados"
+
+# Espera a primeira linha do #divResult mudar depois de trocar de pagina
+PAGINA_MUDOU_JS = """
+(anterior) => {
+    const row = document.querySelector('#divResult .row');
+    return !!row && row.innerText !== anterior;
+}
+"""
+
+
+async def _pesquisar(page, name_clean: str, uf_clean: str) -> Optional[Dict[str, Any]]:
+    """
+    Abre o CNA, preenche o formulario e espera a busca terminar.
+    Retorna um dicionario de erro, ou None quando ha resultados na pagina.
+    """
+    print(f"Inicianndo busca na pagina da OAB para buscar:: {name_clean} - {uf_clean}")
+    with STAGE_SECONDS.time(stage="goto"):
+        await page.goto(ScraperConfig.CNA_BASE_URL + "/", timeout=ScraperConfig.BROWSER_TIMEOUT)
+        await page.wait_for_load_state("domcontentloaded")
+
+    with STAGE_SECONDS.time(stage="form"):
+        await page.fill("#txtName", name_clean)
+
+        await page.select_option("#cmbSeccional", uf_clean)
+
+        await page.click("#btnFind")
+
+    print("Aguardando resultados...")
+    try:
+        with STAGE_SECONDS.time(stage="wait_results"):
+            estado = await aguardar_resultados(page)
+    except PlaywrightTimeoutError:
+        return {"error": f"Tempo esgotado aguardando resultados do CNA para: {name_clean} - {uf_clean}"}
+    if estado == SEM_RESULTADOS:
+        return {"error": f"Nenhum resultado encontrado para: {name_clean} - {uf_clean}"}
+    return None
+
+
+async def _fechar_modal(page):
+    for selector in FECHAR_MODAL_SELECTORS:
+        botao = await page.query_selector(selector)
+        if botao:
+            await botao.click()
+            return
+    await page.keyboard.press("Escape")
+
+
+async def _link_proxima_pagina(page):
+    for selector in PROXIMA_PAGINA_SELECTORS:
+        link = await page.query_selector(selector)
+        if link:
+            return link
+    return None
+
+
+async def _proxima_pagina(page) -> bool:
+    """
+    Vai para a proxima pagina de resultados, se existir.
+    Retorna False quando nao ha mais paginas.
+    """
+    link = await _link_proxima_pagina(page)
+    if not link:
+        return False
+    primeira = await page.eval_on_selector("#divResult .row", "(row) => row.innerText")
+    await link.click()
+    await page.wait_for_function(PAGINA_MUDOU_JS, arg=primeira, timeout=ScraperConfig.RESULT_TIMEOUT)
+    return True
+
+
+async def _iterar_na_pagina(page, name_clean: str, uf_clean: str, max_results: Optional[int] = None,
+                            com_situacao: bool = True, sondar: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Gera todos os advogados encontrados, seguindo a paginacao do CNA.
+    Para em max_results (com sondar, gera {MAIS_RESULTADOS: True} se houver outra
+    linha ou pagina). Se a busca falhar, gera um unico dicionario de erro.
+    """
+    erro = await _pesquisar(page, name_clean, uf_clean)
+    if erro:
+        yield erro
+        return
+
+    total = 0
+    while True:
+        with STAGE_SECONDS.time(stage="extract"):
+            rows = await page.query_selector_all("#divResult .row")
+            linhas = await extrair_todas_linhas(page)
+        for indice, (row, data) in enumerate(zip(rows, linhas)):
+            # A situacao so aparece no modal de detalhe de cada linha
+            if com_situacao:
+                try:
+                    with STAGE_SECONDS.time(stage="modal_click"):
+                        await row.click()
+                    data["situacao"] = await extrair_situacao_modal(page)
+                except Exception:
+                    pass
+                finally:
+                    try:
+                        await _fechar_modal(page)
+                    except Exception:
+                        pass
+            yield completar_campos(data)
+            total += 1
+            if max_results and total >= max_results:
+                # So olha se existe mais um advogado, sem abrir o detalhe dele
+                if sondar and (indice < len(linhas) - 1 or await _link_proxima_pagina(page)):
+                    yield {MAIS_RESULTADOS: True}
+                return
+        with STAGE_SECONDS.time(stage="next_page"):
+            tem_proxima = await _proxima_pagina(page)
+        if not tem_proxima:
+            return
+
+
+async def _buscar_na_pagina(page, name_clean: str, uf_clean: str) -> Dict[str, Any]:
+    """
+    Executa a busca no CNA usando uma pagina ja aberta (do pool ou avulsa).
+    Erros de navegacao sobem como excecao para quem chamou decidir o que fazer com a pagina.
+    """
+    erro = await _pesquisar(page, name_clean, uf_clean)
+    if erro:
+        return erro
+    
+    # Múltiplas tentativas de encontrar resultados
+    row = None
+    selectors_tentados = ["#divResult .row", ".resultado .row", ".row", ".result-item"]
+    
+    for selector in selectors_tentados:
+        row = await page.query_selector(selector)
+        if row:
+            break
+    
+    if not row:
+        # Tenta buscar por qualquer elemento que contenha o nome
+        nome_elements = await page.query_selector_all(f"*:has-text('{name_clean.split()[0]}')")
+        if nome_elements:
+            # Verifica se algum dos elementos realmente bate com a UF desejada
+            for el in nome_elements:
+                el_text = await el.inner_text()
+                if uf_clean.upper() in el_text.upper():
+                    row = el
+                    break
+        if not row:
+            return {"error": f"Nenhum resultado encontrado para: {name_clean} - {uf_clean}"}
+    # Só executa o restante se encontrou resultado
+    # Extrai dados usando método avancado
+    with STAGE_SECONDS.time(stage="extract"):
+        data = await extrair_dados_avancados(page, row)
+    # Tenta clicar e extrair situacao do modal
+    try:
+        with STAGE_SECONDS.time(stage="modal_click"):
+            await row.click()
+        situacao_modal = await extrair_situacao_modal(page)
+        data["situacao"] = situacao_modal
+    except Exception:
+        if "situacao" not in data or not data["situacao"]:
+            data["situacao"] = "Nao encontrada"
+    # Garante que todos os campos obrigatórios estejam presentes
+    return completar_campos(data)
+
+
+async def scrape_oab_async(name: str, uf: str, backend: Union[str, "SearchBackend", None] = None,
+                           max_age: Optional[float] = None) -> Dict[str, Any]:
     """ 
     Extrai informacoes de um advogado a partir do nome e UF. De forma assincrona.
+    O backend ('playwright' ou 'http', ou uma instancia de SearchBackend) pode ser
+    escolhido por chamada; se nao for informado, usa ScraperConfig.SCRAPER_BACKEND.
+    Se o advogado estiver no registro local com menos de max_age segundos
+    (padrao REGISTRY_MAX_AGE; 0 ignora o registro), responde sem ir ao CNA.
     Retorna um dicionario (Dict[str, Any]) com as informacoes extraidas ou erro.
     """
+    inicio = time.perf_counter()
+    with LOOKUPS_IN_FLIGHT.track_inprogress():
+        result, fonte = await _consultar(name, uf, backend, max_age)
+    LOOKUP_SECONDS.observe(time.perf_counter() - inicio, source=fonte)
+    LOOKUPS.inc(uf=_uf_label(uf), outcome=_resultado(result))
+    return result
+
+
+def _uf_label(uf: str) -> str:
+    uf = (uf or "").strip().upper()
+    return uf if len(uf) == 2 and uf.isalpha() else "invalida"
+
+
+def _resultado(result: Dict[str, Any]) -> str:
+    if "error" not in result:
+        return "success"
+    if eh_ocupado(result):
+        return "busy"
+    return "error" if eh_falha(result) else "not_found"
+
+
+async def _consultar(name: str, uf: str, backend: Union[str, "SearchBackend", None],
+                     max_age: Optional[float]) -> Tuple[Dict[str, Any], str]:
+    ''' Fluxo de scrape_oab_async; retorna (resultado, origem: cna ou registry) '''
     # Validacao dos parâmetros
     validacao = validar_parametros(name, uf)
     if "error" in validacao:
-        return validacao
+        return validacao, "invalid"
     
     name_clean = validacao["name"]
     uf_clean = validacao["uf"]
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+
+    from .registry import get_registry
+    registry = get_registry()
+    if registry is not None:
         try:
-            print(f"Inicianndo busca na pagina da OAB para buscar:: {name_clean} - {uf_clean}")
-            await page.goto("https://cna.oab.org.br/", timeout=120000)
-            await page.wait_for_load_state("domcontentloaded")
-
-            await page.fill("#txtName", name_clean)
-
-            await page.select_option("#cmbSeccional", uf_clean)
-
-            await page.click("#btnFind")
-
-            print("Aguardando resultados...")
-            await page.wait_for_timeout(5000)  # Aguarda 5s para carregamento do DOM
-            
-            # Múltiplas tentativas de encontrar resultados
-            row = None
-            selectors_tentados = ["#divResult .row", ".resultado .row", ".row", ".result-item"]
-            
-            for selector in selectors_tentados:
-                row = await page.query_selector(selector)
-                if row:
-                    break
-            
-            if not row:
-                # Tenta buscar por qualquer elemento que contenha o nome
-                nome_elements = await page.query_selector_all(f"*:has-text('{name_clean.split()[0]}')")
-                if nome_elements:
-                    # Verifica se algum dos elementos realmente bate com a UF desejada
-                    for el in nome_elements:
-                        el_text = await el.inner_text()
-                        if uf_clean.upper() in el_text.upper():
-                            row = el
-                            break
-                if not row:
-                    return {"error": f"Nenhum resultado encontrado para: {name_clean} - {uf_clean}"}
-            # Só executa o restante se encontrou resultado
-            # Extrai dados usando método avancado
-            data = await extrair_dados_avancados(page, row)
-            # Tenta clicar e extrair situacao do modal
-            try:
-                await row.click()
-                situacao_modal = await extrair_situacao_modal(page)
-                data["situacao"] = situacao_modal
-            except Exception:
-                if "situacao" not in data or not data["situacao"]:
-                    data["situacao"] = "Nao encontrada"
-            # Garante que todos os campos obrigatórios estejam presentes
-            campos_obrigatorios = ["nome", "inscricao", "uf", "categoria"]
-            for campo in campos_obrigatorios:
-                if campo not in data or not data[campo]:
-                    data[campo] = "Nao encontrado"
-            # Adiciona campos opcionais se nao encontrados
-            if "data_inscricao" not in data:
-                data["data_inscricao"] = "Nao encontrada"
-
-        except Exception as e:
-            print(f"Erro durante a navegacao ou busca: {e}")
-            data = {"error": f"Erro durante a navegacao ou busca: {e}"}
-        finally:
-            await browser.close()
-        return data
+            registro = registry.lookup(name_clean, uf_clean, max_age)
+            if registro is not None:
+                print(f"Advogado encontrado no registro local: {name_clean} - {uf_clean}")
+                return registro, "registry"
+        except sqlite3.Error as e:
+            print(f"Erro ao consultar o registro local: {e}")
 
+    from .backends import get_backend
+    try:
+        search_backend = get_backend(backend)
+    except ValueError as e:
+        return {"error": str(e)}, "invalid"
+    # Consultas identicas em andamento compartilham a mesma busca
+    result = await get_singleflight().do(
+        chave_consulta(name_clean, uf_clean, search_backend.name),
+        lambda: _buscar_limitado(search_backend, name_clean, uf_clean)
+    )
+    if ScraperConfig.NAME_REWRITE_ENABLED and result.get("error", "").startswith("Nenhum resultado"):
+        result = await _buscar_nome_corrigido(search_backend, name_clean, uf_clean, result)
+    return result, "cna"
 
-def scrape_oab(name: str, uf: str) -> Dict[str, Any]:
+
+async def _buscar_nome_corrigido(search_backend, name_clean: str, uf_clean: str,
+                                 nao_encontrado: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    O CNA nao achou o nome consultado: tenta de novo com o nome conhecido mais
+    parecido (erro de digitacao/sem acento). A resposta traz consulta_original e
+    nome_corrigido para quem chamou saber que e outro nome; sem correcao ou sem
+    resultado com ela, fica o "Nenhum resultado" original.
+    '''
+    from .name_index import get_name_index
+    try:
+        canonico = get_name_index().canonical(name_clean, uf_clean)
+    except sqlite3.Error as e:
+        print(f"Erro ao carregar o indice de nomes: {e}")
+        return nao_encontrado
+    if not canonico:
+        return nao_encontrado
+    print(f"Consulta reescrita: {name_clean} -> {canonico}")
+    result = await get_singleflight().do(
+        chave_consulta(canonico, uf_clean, search_backend.name),
+        lambda: _buscar_limitado(search_backend, canonico, uf_clean)
+    )
+    if "error" in result:
+        return nao_encontrado
+    return {**result, "consulta_original": name_clean, "nome_corrigido": canonico}
+
+
+async def _buscar_limitado(search_backend, name_clean: str, uf_clean: str) -> Dict[str, Any]:
+    ''' Busca respeitando o limitador adaptativo (global e por UF) '''
+    async with get_rate_limiter().slot(uf_clean) as permissao:
+        with CNA_IN_FLIGHT.track_inprogress(uf=_uf_label(uf_clean)), permissao.medir():
+            result = await search_backend.buscar(name_clean, uf_clean)
+        permissao.resultado(result)
+    _registrar([result])
+    return result
+
+
+def _registrar(records: List[Dict[str, Any]]):
+    ''' Guarda os advogados encontrados no registro local e no indice de nomes '''
+    from .registry import get_registry
+    from .name_index import get_name_index
+    try:
+        registry = get_registry()
+        if registry is not None:
+            registry.save_many(records)
+        get_name_index().add_many(records)
+    except sqlite3.Error as e:
+        # Falha no registro nao derruba a consulta
+        print(f"Erro ao gravar no registro local: {e}")
+
+
+async def iterar_oab_async(name: str, uf: str, max_results: Optional[int] = None,
+                           backend: Optional[str] = None, com_situacao: bool = True) -> AsyncIterator[Dict[str, Any]]:
     """
-    Extrai informacoes do advogado a partir do nome e UF. De forma sincrona.
-    Retorna um dicionario (Dict[str, Any]) com as informacoes extraidas ou erro.
+    Gera todos os advogados que batem com o nome e UF, seguindo a paginacao do CNA.
+    Para em max_results (limitado por ScraperConfig.MAX_RESULTS). Para parar antes,
+    basta sair do async for (de preferencia dentro de contextlib.aclosing).
+    Se a busca falhar, gera um dicionario com "error" e termina.
     """
+    max_results = min(max_results or ScraperConfig.MAX_RESULTS, ScraperConfig.MAX_RESULTS)
+    async with aclosing(_iterar(name, uf, max_results, backend, com_situacao)) as itens:
+        async for item in itens:
+            yield item
+
+
+async def _iterar(name: str, uf: str, max_results: int, backend: Optional[str],
+                  com_situacao: bool, sondar: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    ''' Fluxo de iterar_oab_async, sem o teto de MAX_RESULTS '''
+    validacao = validar_parametros(name, uf)
+    if "error" in validacao:
+        yield validacao
+        return
+
+    from .backends import get_backend
     try:
-        loop = asyncio.get_event_loop()
-        if not loop.is_running():
-            import concurrent.futures
+        search_backend = get_backend(backend)
+    except ValueError as e:
+        yield {"error": str(e)}
+        return
+    # Uma vaga do limitador durante toda a paginacao; a latencia e a da espera mais longa
+    # por um item do backend (o tempo de quem consome os itens fica de fora)
+    async with get_rate_limiter().slot(validacao["uf"]) as permissao:
+        async with aclosing(search_backend.iterar(validacao["name"], validacao["uf"], max_results,
+                                                     com_situacao, sondar)) as itens:
+            while True:
+                with permissao.medir():
+                    try:
+                        item = await itens.__anext__()
+                    except StopAsyncIteration:
+                        break
+                permissao.resultado(item)
+                yield item
 
-            def run_in_thread():
-                new_loop = asyncio.new_event_loop()
-                try:
-                    return new_loop.run_until_complete(scrape_oab_async(name, uf))
-                finally:
-                    new_loop.close()
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(run_in_thread)
-                return future.result()
-        else:
-            return loop.run_until_complete(scrape_oab_async(name, uf))
-    except RuntimeError:
-        return asyncio.run(scrape_oab_async(name, uf))
+async def scrape_oab_todos_async(name: str, uf: str, max_results: Optional[int] = None,
+                                 backend: Optional[str] = None, com_situacao: bool = True) -> Dict[str, Any]:
+    """
+    Versao em lista de iterar_oab_async.
+    Retorna {"resultados": [...], "total": n, "truncado": bool} ou {"error": ...}.
+    Se a busca falhar no meio, devolve o que ja foi encontrado junto com o erro.
+    """
+    limite = min(max_results or ScraperConfig.MAX_RESULTS, ScraperConfig.MAX_RESULTS)
+    # Consultas identicas em andamento compartilham a mesma busca
+    chave = chave_consulta(name, uf, "todos", limite, (backend or ScraperConfig.SCRAPER_BACKEND).lower(), com_situacao)
+    return await get_singleflight().do(
+        chave, lambda: _coletar_todos(name, uf, limite, backend, com_situacao)
+    )
+
+
+async def _coletar_todos(name: str, uf: str, limite: int, backend: Optional[str],
+                         com_situacao: bool) -> Dict[str, Any]:
+    resultados = []
+    erro = None
+    truncado = False
+    # So e truncado se existir mesmo mais um advogado (o backend so sonda, sem buscar a situacao dele)
+    async with aclosing(_iterar(name, uf, limite, backend, com_situacao, sondar=True)) as itens:
+        async for item in itens:
+            if "error" in item:
+                erro = item["error"]
+                break
+            if item.get(MAIS_RESULTADOS):
+                truncado = True
+                continue
+            resultados.append(item)
+
+    _registrar(resultados)
+    if erro and not resultados:
+        return {"error": erro}
+    data = {"resultados": resultados, "total": len(resultados), "truncado": truncado}
+    if erro:
+        data["error"] = erro
+    return data
+
+
+def scrape_oab(name: str, uf: str) -> Dict[str, Any]:
+    """
+    Extrai informacoes do advogado a partir do nome e UF. De forma sincrona.
+    Usa o OABClient global: um event loop em segundo plano (e o pool de browsers)
+    reaproveitado entre as chamadas.
+    Retorna um dicionario (Dict[str, Any]) com as informacoes extraidas ou erro.
+    """
+    from .oab_client import get_oab_client
+    return get_oab_client().lookup(name, uf)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .scraper_config import ScraperConfig
+
+
+class OCRCache:
+    """
+    Cache do resultado do OCR pelo hash (sha256) dos bytes da imagem.
+    Em memoria com LRU; se disk_dir for informado, cada resultado tambem
+    vira um arquivo <hash>.txt e sobrevive a reinicios.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries if max_entries is not None else ScraperConfig.OCR_CACHE_SIZE
+        disk_dir = disk_dir if disk_dir is not None else ScraperConfig.OCR_CACHE_DIR
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def chave(img_data: bytes) -> str:
+        return hashlib.sha256(img_data).hexdigest()
+
+    def get(self, chave: str) -> Optional[str]:
+        with self._lock:
+            if chave in self._entries:
+                self._entries.move_to_end(chave)
+                self.hits += 1
+                return self._entries[chave]
+
+        texto = self._ler_disco(chave)
+        with self._lock:
+            if texto is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._guardar(chave, texto)
+            return texto
+
+    def set(self, chave: str, texto: str):
+        with self._lock:
+            self._guardar(chave, texto)
+        self._gravar_disco(chave, texto)
+
+    def _guardar(self, chave: str, texto: str):
+        self._entries[chave] = texto
+        self._entries.move_to_end(chave)
+        while self.max_entries and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _ler_disco(self, chave: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        try:
+            return (self.disk_dir / f"{chave}.txt").read_text(encoding="utf-8")
+        except (FileNotFoundError, OSError):
+            return None
+
+    def _gravar_disco(self, chave: str, texto: str):
+        if not self.disk_dir:
+            return
+        destino = self.disk_dir / f"{chave}.txt"
+        temporario = destino.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            temporario.write_text(texto, encoding="utf-8")
+            os.replace(temporario, destino)
+        except OSError as e:
+            print(f"Erro ao gravar cache de OCR em disco: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+# Cache global, criado no primeiro uso
+_cache: Optional[OCRCache] = None
+
+
+def get_ocr_cache() -> OCRCache:
+    global _cache
+    if _cache is None:
+        _cache = OCRCache()
+    return _cache
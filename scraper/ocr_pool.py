@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from .metrics import OCR_QUEUE_DEPTH
+from .scraper_config import ScraperConfig
+
+
+class OCRQueueFull(Exception):
+    """A fila de OCR ficou cheia por mais tempo que o permitido"""
+
+
+class OCRPool:
+    """
+    Etapa de OCR fora do event loop: um pool de processos do tamanho dos nucleos
+    disponiveis, com fila limitada. Quando a fila enche, submit espera uma vaga
+    (backpressure) ate queue_timeout e depois desiste com OCRQueueFull.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 queue_timeout: Optional[float] = None):
+        self.workers = workers or ScraperConfig.OCR_WORKERS or os.cpu_count() or 1
+        # Vagas = imagens em OCR + imagens aguardando um processo livre
+        self.queue_size = queue_size or ScraperConfig.OCR_QUEUE_SIZE or self.workers * 4
+        self.queue_timeout = queue_timeout if queue_timeout is not None else ScraperConfig.OCR_QUEUE_TIMEOUT
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self._waiting = 0
+        self._pending = 0
+        self._processed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=1000)  # ms, ultimas imagens
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # O semaforo pertence ao event loop em que foi criado
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.queue_size)
+            self._loop = loop
+
+    async def submit(self, fn: Callable[[bytes], Any], img_data: bytes) -> Any:
+        ''' Executa fn(img_data) num processo do pool e aguarda o resultado '''
+        self._ensure_started()
+        inicio = time.perf_counter()
+        self._waiting += 1
+        self.publicar_metricas()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            print(f"Fila de OCR cheia, imagem descartada (fila: {self.queue_depth})")
+            raise OCRQueueFull(f"Fila de OCR cheia ({self.queue_size} imagens) por mais de {self.queue_timeout}s")
+        finally:
+            self._waiting -= 1
+
+        self._pending += 1
+        self.publicar_metricas()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, img_data)
+        finally:
+            self._pending -= 1
+            self.publicar_metricas()
+            self._slots.release()
+            self._processed += 1
+            self._latencies.append((time.perf_counter() - inicio) * 1000)
+
+    @property
+    def queue_depth(self) -> int:
+        ''' Imagens aguardando vaga + imagens na fila/execucao do pool '''
+        return self._waiting + self._pending
+
+    def publicar_metricas(self):
+        ''' Atualiza o gauge da fila (chamado quando uma imagem entra ou sai) '''
+        OCR_QUEUE_DEPTH.set(self.queue_depth)
+
+    def stats(self) -> Dict[str, Any]:
+        latencias = sorted(self._latencies)
+
+        def percentil(p: float) -> Optional[float]:
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(p * len(latencias)))], 1)
+
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queue_depth": self.queue_depth,
+            "processed": self._processed,
+            "rejected": self._rejected,
+            "latency_ms": {
+                "p50": percentil(0.5),
+                "p95": percentil(0.95),
+                "max": round(latencias[-1], 1) if latencias else None,
+            },
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Pool global, criado na primeira imagem
+_pool: Optional[OCRPool] = None
+
+
+def get_ocr_pool() -> OCRPool:
+    global _pool
+    if _pool is None:
+        _pool = OCRPool()
+    return _pool
+
+
+async def submit_ocr(fn: Callable[[bytes], Any], img_data: bytes) -> Any:
+    return await get_ocr_pool().submit(fn, img_data)
+
+
+def stop_ocr_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        pool.shutdown()
@@ -0,0 +1,284 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from .metrics import LIMITER_LIMIT
+from .scraper_config import ScraperConfig
+
+# Janela (segundos) usada para calcular a vazao
+JANELA_VAZAO = 60.0
+
+
+# Inicio do erro de saturacao local (pool de browsers sem pagina livre): o CNA nem foi consultado
+ERRO_OCUPADO = "Servico ocupado"
+
+
+def eh_ocupado(result: Dict[str, Any]) -> bool:
+    return (result.get("error") or "").startswith(ERRO_OCUPADO)
+
+
+def eh_falha(result: Dict[str, Any]) -> bool:
+    ''' Erro do CNA/navegacao (nao encontrar o advogado ou o servico local ocupado nao contam como falha) '''
+    erro = result.get("error")
+    return bool(erro) and not erro.startswith("Nenhum resultado") and not eh_ocupado(result)
+
+
+class AIMDWindow:
+    """
+    Limite de consultas simultaneas ajustado por AIMD:
+    cada consulta boa soma increase/limite (~ +1 por rodada de consultas);
+    erro ou latencia acima do alvo multiplica o limite por decrease
+    (no maximo uma reducao por latency_target segundos, para nao despencar
+    com varias falhas da mesma rodada).
+    """
+
+    def __init__(self, initial: float, min_limit: float, max_limit: float, min_gap: float,
+                 latency_target: float, increase: float = 1.0, decrease: float = 0.5):
+        self.min_limit = max(1.0, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.min_gap = min_gap
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.last_start = 0.0
+        self.last_decrease = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.slow = 0
+        self.latency_ewma: Optional[float] = None
+        self._concluidas: deque = deque()
+
+    def livre(self) -> bool:
+        return self.in_flight < math.floor(self.limit)
+
+    def espera_gap(self, agora: float) -> float:
+        return max(0.0, self.last_start + self.min_gap - agora)
+
+    def registrar(self, latencia: Optional[float], falhou: bool, agora: float):
+        self._concluidas.append(agora)
+        if latencia is not None:
+            self.latency_ewma = latencia if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latencia
+
+        lento = latencia is not None and latencia > self.latency_target
+        if falhou or lento:
+            if falhou:
+                self.failures += 1
+            else:
+                self.slow += 1
+            if agora - self.last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self.last_decrease = agora
+        else:
+            self.successes += 1
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+
+    def vazao(self, agora: float) -> float:
+        ''' Consultas concluidas por segundo na ultima JANELA_VAZAO '''
+        while self._concluidas and self._concluidas[0] < agora - JANELA_VAZAO:
+            self._concluidas.popleft()
+        return round(len(self._concluidas) / JANELA_VAZAO, 3)
+
+    def stats(self, agora: float) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "min_gap": self.min_gap,
+            "successes": self.successes,
+            "failures": self.failures,
+            "slow": self.slow,
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "throughput": self.vazao(agora),
+        }
+
+
+class Permissao:
+    '''
+    Vaga obtida no limitador; o resultado da consulta ajusta os limites.
+    Com medir(), a latencia e a da chamada mais longa ao backend, sem o tempo
+    de espera local (descontar_espera) nem o de quem consome os itens.
+    '''
+
+    def __init__(self):
+        self.falhou = False
+        self.latencia: Optional[float] = None
+        self._espera = 0.0
+
+    def resultado(self, result: Dict[str, Any]):
+        if eh_falha(result):
+            self.falhou = True
+
+    @contextmanager
+    def medir(self) -> Iterator[None]:
+        self._espera = 0.0
+        token = _permissao_atual.set(self)
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            duracao = max(time.monotonic() - inicio - self._espera, 0.0)
+            _permissao_atual.reset(token)
+            self.latencia = max(self.latencia or 0.0, duracao)
+
+
+# Permissao cuja chamada ao backend esta sendo medida (para descontar_espera)
+_permissao_atual: ContextVar[Optional[Permissao]] = ContextVar("permissao_atual", default=None)
+
+
+def descontar_espera(segundos: float):
+    ''' Tempo parado em recurso local (ex: fila do pool de browsers) nao e latencia do CNA '''
+    permissao = _permissao_atual.get()
+    if permissao is not None:
+        permissao._espera += segundos
+
+
+class AdaptiveLimiter:
+    """
+    Limitador de consultas ao CNA: uma janela AIMD global e uma por seccional (UF).
+    Uma consulta so comeca quando as duas janelas tem vaga e respeitam o
+    intervalo minimo entre inicios (min_gap).
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        initial: Optional[float] = None,
+        min_limit: Optional[float] = None,
+        max_limit: Optional[float] = None,
+        uf_max_limit: Optional[float] = None,
+        min_gap: Optional[float] = None,
+        uf_min_gap: Optional[float] = None,
+        latency_target: Optional[float] = None,
+        decrease: Optional[float] = None,
+    ):
+        self.enabled = enabled if enabled is not None else ScraperConfig.LIMITER_ENABLED
+        self.initial = initial if initial is not None else ScraperConfig.LIMITER_INITIAL
+        self.min_limit = min_limit if min_limit is not None else ScraperConfig.LIMITER_MIN
+        self.max_limit = max_limit if max_limit is not None else ScraperConfig.LIMITER_MAX
+        self.uf_max_limit = uf_max_limit if uf_max_limit is not None else ScraperConfig.LIMITER_UF_MAX
+        self.min_gap = min_gap if min_gap is not None else ScraperConfig.LIMITER_MIN_GAP
+        self.uf_min_gap = uf_min_gap if uf_min_gap is not None else ScraperConfig.LIMITER_UF_MIN_GAP
+        self.latency_target = latency_target if latency_target is not None else ScraperConfig.LIMITER_LATENCY_TARGET
+        self.decrease = decrease if decrease is not None else ScraperConfig.LIMITER_DECREASE
+        self.global_window = self._nova_janela(self.max_limit, self.min_gap)
+        self.ufs: Dict[str, AIMDWindow] = {}
+        self._cond: Optional[asyncio.Condition] = None
+        self._cond_loop = None
+        self.waiting = 0
+
+    def _nova_janela(self, max_limit: float, min_gap: float) -> AIMDWindow:
+        return AIMDWindow(min(self.initial, max_limit), self.min_limit, max_limit, min_gap,
+                          self.latency_target, decrease=self.decrease)
+
+    def _janela_uf(self, uf: str) -> AIMDWindow:
+        if uf not in self.ufs:
+            self.ufs[uf] = self._nova_janela(self.uf_max_limit, self.uf_min_gap)
+        return self.ufs[uf]
+
+    @property
+    def cond(self) -> asyncio.Condition:
+        # A condition fica presa ao event loop (scrape_oab cria loops novos)
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._cond_loop is not loop:
+            self._cond = asyncio.Condition()
+            self._cond_loop = loop
+        return self._cond
+
+    async def _adquirir(self, janelas):
+        cond = self.cond
+        async with cond:
+            self.waiting += 1
+            try:
+                while True:
+                    if all(janela.livre() for janela in janelas):
+                        agora = time.monotonic()
+                        espera = max(janela.espera_gap(agora) for janela in janelas)
+                        if espera <= 0:
+                            for janela in janelas:
+                                janela.in_flight += 1
+                                janela.last_start = agora
+                            return
+                        # Respeita o intervalo minimo, mas acorda se algo mudar
+                        try:
+                            await asyncio.wait_for(cond.wait(), espera)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await cond.wait()
+            finally:
+                self.waiting -= 1
+
+    def _liberar(self, janelas, latencia: Optional[float], falhou: bool):
+        agora = time.monotonic()
+        for janela in janelas:
+            janela.in_flight -= 1
+            janela.registrar(latencia, falhou, agora)
+
+    async def _acordar(self):
+        cond = self.cond
+        async with cond:
+            cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, uf: str, medir_latencia: bool = True) -> AsyncIterator[Permissao]:
+        """
+        Reserva uma vaga global e na UF durante a consulta.
+        Excecoes e permissao.resultado() com erro contam como falha.
+        A latencia e a medida por permissao.medir() ou, sem ela, o tempo com a vaga;
+        medir_latencia=False nao registra latencia.
+        """
+        permissao = Permissao()
+        if not self.enabled:
+            yield permissao
+            return
+
+        janelas = (self.global_window, self._janela_uf(uf))
+        await self._adquirir(janelas)
+        inicio = time.monotonic()
+        try:
+            yield permissao
+        except Exception:
+            permissao.falhou = True
+            raise
+        finally:
+            latencia = None
+            if medir_latencia:
+                latencia = permissao.latencia if permissao.latencia is not None else time.monotonic() - inicio
+            self._liberar(janelas, latencia, permissao.falhou)
+            self.publicar_metricas(uf)
+            await asyncio.shield(self._acordar())
+
+    def publicar_metricas(self, uf: Optional[str] = None):
+        ''' Atualiza o gauge dos limites (global e da UF, ou de todas) depois de cada consulta '''
+        LIMITER_LIMIT.set(round(self.global_window.limit, 2), scope="global")
+        for nome, janela in self.ufs.items():
+            if uf is None or nome == uf:
+                LIMITER_LIMIT.set(round(janela.limit, 2), scope=nome)
+
+    def stats(self) -> Dict[str, Any]:
+        agora = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "latency_target": self.latency_target,
+            "waiting": self.waiting,
+            "global": self.global_window.stats(agora),
+            "ufs": {uf: janela.stats(agora) for uf, janela in sorted(self.ufs.items())},
+        }
+
+
+# Limitador global do scraper
+_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_rate_limiter() -> AdaptiveLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveLimiter()
+        _limiter.publicar_metricas()
+    return _limiter
@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from .oab_scraper import normalizar_nome
+from .scraper_config import ScraperConfig
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS advogados (
+    uf TEXT NOT NULL,
+    inscricao TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    nome_normalizado TEXT NOT NULL,
+    categoria TEXT,
+    data_inscricao TEXT,
+    situacao TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (uf, inscricao)
+);
+CREATE INDEX IF NOT EXISTS idx_advogados_nome ON advogados (nome_normalizado, uf);
+"""
+
+_CAMPOS = ("nome", "inscricao", "uf", "categoria", "data_inscricao", "situacao")
+
+
+class LawyerRegistry:
+    """
+    Registro local (SQLite) dos advogados ja encontrados pelo scraper,
+    com a data da coleta. Indexado por (uf, inscricao) e pelo nome normalizado
+    (sem acento, maiusculo), para responder consultas sem abrir o browser
+    enquanto o registro tiver menos de max_age segundos.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_age: Optional[float] = None):
+        self.db_path = db_path if db_path is not None else ScraperConfig.REGISTRY_DB_PATH
+        self.max_age = max_age if max_age is not None else ScraperConfig.REGISTRY_MAX_AGE
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # scrape_oab usa event loops (e threads) diferentes: uma conexao protegida por lock
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0
+
+    def save(self, record: Dict[str, Any], fetched_at: Optional[float] = None) -> bool:
+        return self.save_many([record], fetched_at) > 0
+
+    def save_many(self, records: Iterable[Dict[str, Any]], fetched_at: Optional[float] = None) -> int:
+        ''' Grava (ou atualiza) os advogados; registros sem UF/inscricao ou com erro sao ignorados '''
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        linhas = []
+        for record in records:
+            if "error" in record or not record.get("inscricao") or not record.get("uf") or not record.get("nome"):
+                continue
+            linhas.append((
+                record["uf"].strip().upper(), str(record["inscricao"]).strip(), record["nome"],
+                normalizar_nome(record["nome"]), record.get("categoria"), record.get("data_inscricao"),
+                record.get("situacao"), fetched_at,
+            ))
+        if not linhas:
+            return 0
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO advogados (uf, inscricao, nome, nome_normalizado, categoria, "
+                "data_inscricao, situacao, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", linhas
+            )
+            self._db.commit()
+            self.saved += len(linhas)
+        return len(linhas)
+
+    def get(self, uf: str, inscricao: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM advogados WHERE uf = ? AND inscricao = ?", (uf.strip().upper(), str(inscricao).strip())
+            ).fetchone()
+        return self._registro(row) if row else None
+
+    def find_by_name(self, name: str, uf: Optional[str] = None, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        ''' Advogados com o mesmo nome normalizado (na UF, se informada), mais recentes primeiro '''
+        sql = "SELECT * FROM advogados WHERE nome_normalizado = ?"
+        params: List[Any] = [normalizar_nome(name)]
+        if uf:
+            sql += " AND uf = ?"
+            params.append(uf.strip().upper())
+        if max_age is not None:
+            sql += " AND fetched_at >= ?"
+            params.append(time.time() - max_age)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY fetched_at DESC, inscricao", params).fetchall()
+        return [self._registro(row) for row in rows]
+
+    def lookup(self, name: str, uf: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        '''
+        Advogado fresco (coletado ha menos de max_age segundos) para a consulta, ou None.
+        So responde quando o nome so tem uma inscricao na UF: com homonimos (ex: gravados
+        por uma busca "todos") o registro nao sabe qual e a primeira linha do CNA.
+        '''
+        max_age = self.max_age if max_age is None else max_age
+        encontrados = self.find_by_name(name, uf) if max_age > 0 else []
+        if len(encontrados) != 1 or encontrados[0]["fetched_at"] < time.time() - max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return encontrados[0]
+
+    def all_names(self) -> List[Dict[str, Any]]:
+        ''' Nome, UF e inscricao de todos os advogados (para montar o indice de nomes) '''
+        with self._lock:
+            rows = self._db.execute("SELECT nome, uf, inscricao FROM advogados").fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _registro(row: sqlite3.Row) -> Dict[str, Any]:
+        registro = {campo: row[campo] for campo in _CAMPOS}
+        registro["fetched_at"] = row["fetched_at"]
+        return registro
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._db.execute("SELECT COUNT(*) FROM advogados").fetchone()[0]
+        consultas = self.hits + self.misses
+        return {
+            "lawyers": total,
+            "max_age": self.max_age,
+            "hits": self.hits,
+            "misses": self.misses,
+            "saved": self.saved,
+            "hit_rate": round(self.hits / consultas, 3) if consultas else None,
+        }
+
+
+# Registro global, aberto no primeiro uso (None quando REGISTRY_ENABLED=false)
+_registry: Optional[LawyerRegistry] = None
+
+
+def get_registry() -> Optional[LawyerRegistry]:
+    global _registry
+    if _registry is None and ScraperConfig.REGISTRY_ENABLED:
+        _registry = LawyerRegistry()
+    return _registry
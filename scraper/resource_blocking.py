@@ -0,0 +1,72 @@
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterable, Optional
+from .scraper_config import ScraperConfig
+
+
+def _lista(valor: str):
+    return [item.strip() for item in valor.split(",") if item.strip()]
+
+
+class RoutingProfile:
+    """
+    Perfil de rotas aplicado nas paginas/contextos do scraper.
+    Bloqueia tipos de recurso (imagem, css, fonte...) e URLs da lista de bloqueio;
+    URLs da lista de permissao sempre passam (ex: a imagem de detalhe #imgDetail).
+    Padroes no estilo glob, comparados com a URL completa.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Optional[Iterable[str]] = None,
+        allow_patterns: Optional[Iterable[str]] = None,
+        deny_patterns: Optional[Iterable[str]] = None,
+    ):
+        self.blocked_types = set(blocked_types if blocked_types is not None
+                                 else _lista(ScraperConfig.ROUTING_BLOCKED_TYPES))
+        self.allow_patterns = list(allow_patterns if allow_patterns is not None
+                                   else _lista(ScraperConfig.ROUTING_ALLOW_PATTERNS))
+        self.deny_patterns = list(deny_patterns if deny_patterns is not None
+                                  else _lista(ScraperConfig.ROUTING_DENY_PATTERNS))
+        self.allowed = 0
+        self.blocked = 0
+
+    def permitido(self, url: str, resource_type: str) -> bool:
+        ''' Decide se a requisicao pode seguir '''
+        if any(fnmatch(url, padrao) for padrao in self.allow_patterns):
+            return True
+        if any(fnmatch(url, padrao) for padrao in self.deny_patterns):
+            return False
+        return resource_type not in self.blocked_types
+
+    async def _handle(self, route):
+        request = route.request
+        if self.permitido(request.url, request.resource_type):
+            self.allowed += 1
+            await route.continue_()
+        else:
+            self.blocked += 1
+            await route.abort()
+
+    async def apply(self, target):
+        ''' Aplica o perfil num BrowserContext ou Page do playwright '''
+        await target.route("**/*", self._handle)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "blocked_types": sorted(self.blocked_types),
+            "allow_patterns": self.allow_patterns,
+            "deny_patterns": self.deny_patterns,
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+        }
+
+
+# Perfil global (None quando ROUTING_ENABLED=false)
+_profile: Optional[RoutingProfile] = None
+
+
+def get_routing_profile() -> Optional[RoutingProfile]:
+    global _profile
+    if _profile is None and ScraperConfig.ROUTING_ENABLED:
+        _profile = RoutingProfile()
+    return _profile
@@ -0,0 +1,109 @@
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .scraper_config import ScraperConfig
+
+
+class ResultCache:
+    """
+    Cache dos resultados do scraper com TTL e LRU.
+    Depois do TTL a entrada ainda e servida (stale) por ate stale_ttl segundos
+    enquanto uma atualizacao roda em segundo plano (stale-while-revalidate).
+    Resultados com erro nao sao guardados.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None,
+                 stale_ttl: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.ttl = ttl if ttl is not None else ScraperConfig.RESULT_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else ScraperConfig.RESULT_CACHE_SIZE
+        self.stale_ttl = stale_ttl if stale_ttl is not None else ScraperConfig.RESULT_CACHE_STALE_TTL
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, chave: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        ''' Retorna (valor, idade em segundos) sem olhar o TTL, ou None '''
+        entrada = self._entries.get(chave)
+        if entrada is None:
+            return None
+        self._entries.move_to_end(chave)
+        criado, valor = entrada
+        return copy.deepcopy(valor), self.clock() - criado
+
+    def set(self, chave: str, valor: Dict[str, Any]):
+        if "error" in valor:
+            return
+        self._entries[chave] = (self.clock(), copy.deepcopy(valor))
+        self._entries.move_to_end(chave)
+        while self.max_entries and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def obter(self, chave: str, buscar: Callable[[], Awaitable[Dict[str, Any]]]
+                    ) -> Tuple[Dict[str, Any], bool, Optional[float]]:
+        """
+        Busca no cache ou executa buscar().
+        Retorna (resultado, veio_do_cache, idade_em_segundos).
+        """
+        entrada = self.get(chave)
+        if entrada is not None:
+            valor, idade = entrada
+            if idade <= self.ttl:
+                self.hits += 1
+                return valor, True, idade
+            if idade <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._revalidar(chave, buscar)
+                return valor, True, idade
+
+        self.misses += 1
+        valor = await buscar()
+        self.set(chave, valor)
+        return valor, False, None
+
+    def _revalidar(self, chave: str, buscar: Callable[[], Awaitable[Dict[str, Any]]]):
+        ''' Atualiza a entrada em segundo plano (uma atualizacao por chave) '''
+        if chave in self._refreshing:
+            return
+
+        async def atualizar():
+            try:
+                self.set(chave, await buscar())
+                self.refreshes += 1
+            except Exception as e:
+                print(f"Erro ao atualizar cache de resultados: {e}")
+            finally:
+                self._refreshing.pop(chave, None)
+
+        self._refreshing[chave] = asyncio.create_task(atualizar())
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refreshing": len(self._refreshing),
+            "hit_rate": round((self.hits + self.stale_hits) / total, 3) if total else None,
+        }
+
+
+# Cache global da API, criado no primeiro uso
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
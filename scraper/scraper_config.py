@@ -0,0 +1,99 @@
+import os
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente do arquivo .env
+load_dotenv()
+
+
+class ScraperConfig:
+    """Configurações do scraper OAB"""
+
+    # Site do CNA
+    CNA_BASE_URL: str = os.getenv("CNA_BASE_URL", "https://cna.oab.org.br")
+    CNA_SEARCH_PATH: str = os.getenv("CNA_SEARCH_PATH", "/Home/Search")
+
+    # Backend de busca padrao: playwright (browser) ou http (direto nos endpoints)
+    SCRAPER_BACKEND: str = os.getenv("SCRAPER_BACKEND", "playwright")
+
+    # Limite de resultados na busca de todos os advogados (modo multiplo)
+    MAX_RESULTS: int = int(os.getenv("MAX_RESULTS", "50"))
+
+    # Pool de processos do OCR (0 = automatico: nucleos disponiveis / workers * 4)
+    OCR_WORKERS: int = int(os.getenv("OCR_WORKERS", "0"))
+    OCR_QUEUE_SIZE: int = int(os.getenv("OCR_QUEUE_SIZE", "0"))
+    OCR_QUEUE_TIMEOUT: float = float(os.getenv("OCR_QUEUE_TIMEOUT", "30"))  # segundos
+
+    # Cache do OCR pelo hash da imagem (diretorio vazio = so em memoria)
+    OCR_CACHE_SIZE: int = int(os.getenv("OCR_CACHE_SIZE", "10000"))
+    OCR_CACHE_DIR: str = os.getenv("OCR_CACHE_DIR", "")
+
+    # Perfil de bloqueio de recursos nas paginas do scraper (listas separadas por virgula)
+    ROUTING_ENABLED: bool = os.getenv("ROUTING_ENABLED", "true").lower() == "true"
+    ROUTING_BLOCKED_TYPES: str = os.getenv("ROUTING_BLOCKED_TYPES", "image,stylesheet,font,media")
+    ROUTING_ALLOW_PATTERNS: str = os.getenv("ROUTING_ALLOW_PATTERNS", "*ViewImage*,*imgDetail*")
+    ROUTING_DENY_PATTERNS: str = os.getenv(
+        "ROUTING_DENY_PATTERNS",
+        "*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*facebook.net*,*hotjar.com*"
+    )
+
+    # Cache de resultados da API (segundos). Depois do TTL a entrada ainda e servida
+    # por RESULT_CACHE_STALE_TTL enquanto e atualizada em segundo plano
+    RESULT_CACHE_TTL: float = float(os.getenv("RESULT_CACHE_TTL", "21600"))
+    RESULT_CACHE_STALE_TTL: float = float(os.getenv("RESULT_CACHE_STALE_TTL", "604800"))
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+
+    # Consulta em lote (POST /fetch_oab/batch)
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "5000"))
+
+    # Jobs assincronos (POST /jobs): arquivo SQLite, workers e retencao (segundos)
+    JOBS_DB_PATH: str = os.getenv("JOBS_DB_PATH", "data/jobs.db")
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_RETENTION: float = float(os.getenv("JOBS_RETENTION", "86400"))
+    JOBS_CLEANUP_INTERVAL: float = float(os.getenv("JOBS_CLEANUP_INTERVAL", "600"))
+    JOBS_MAX_WAIT: float = float(os.getenv("JOBS_MAX_WAIT", "60"))  # long-poll
+    JOBS_ERROR_BACKOFF: float = float(os.getenv("JOBS_ERROR_BACKOFF", "1"))  # espera apos erro no SQLite (dobra ate 30s)
+
+    # Limitador adaptativo (AIMD) das consultas ao CNA, global e por UF.
+    # O limite sobe a cada consulta boa e cai pela metade com erro ou latencia acima do alvo
+    LIMITER_ENABLED: bool = os.getenv("LIMITER_ENABLED", "true").lower() == "true"
+    LIMITER_INITIAL: float = float(os.getenv("LIMITER_INITIAL", "4"))
+    LIMITER_MIN: float = float(os.getenv("LIMITER_MIN", "1"))
+    LIMITER_MAX: float = float(os.getenv("LIMITER_MAX", "16"))  # teto de consultas simultaneas
+    LIMITER_UF_MAX: float = float(os.getenv("LIMITER_UF_MAX", "4"))
+    LIMITER_MIN_GAP: float = float(os.getenv("LIMITER_MIN_GAP", "0.1"))  # segundos entre inicios
+    LIMITER_UF_MIN_GAP: float = float(os.getenv("LIMITER_UF_MIN_GAP", "0.25"))
+    LIMITER_LATENCY_TARGET: float = float(os.getenv("LIMITER_LATENCY_TARGET", "15"))  # segundos
+    LIMITER_DECREASE: float = float(os.getenv("LIMITER_DECREASE", "0.5"))
+
+    # Registro local dos advogados encontrados (SQLite). Consultas por nome/UF sao
+    # respondidas pelo registro enquanto o registro tiver menos de REGISTRY_MAX_AGE segundos
+    REGISTRY_ENABLED: bool = os.getenv("REGISTRY_ENABLED", "true").lower() == "true"
+    REGISTRY_DB_PATH: str = os.getenv("REGISTRY_DB_PATH", "data/registry.db")
+    REGISTRY_MAX_AGE: float = float(os.getenv("REGISTRY_MAX_AGE", "21600"))
+
+    # Indice de nomes (trigramas) dos advogados conhecidos: sugestoes "voce quis dizer"
+    # e, quando o CNA nao encontra o nome consultado, nova busca com o nome conhecido
+    NAME_INDEX_MIN_SCORE: float = float(os.getenv("NAME_INDEX_MIN_SCORE", "0.3"))
+    NAME_REWRITE_ENABLED: bool = os.getenv("NAME_REWRITE_ENABLED", "true").lower() == "true"
+    NAME_REWRITE_MIN_SCORE: float = float(os.getenv("NAME_REWRITE_MIN_SCORE", "0.8"))
+
+    # Backend HTTP
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))  # segundos
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+
+    # Playwright
+    HEADLESS: bool = os.getenv("HEADLESS", "true").lower() == "true"
+    BROWSER_TIMEOUT: int = int(os.getenv("BROWSER_TIMEOUT", "120000"))  # ms
+    # Tempo maximo esperando o CNA devolver a busca (#divResult pronto)
+    RESULT_TIMEOUT: int = int(os.getenv("RESULT_TIMEOUT", "30000"))  # ms
+
+    # Pool de browsers (compartilhado entre as consultas da API)
+    POOL_ENABLED: bool = os.getenv("POOL_ENABLED", "true").lower() == "true"
+    POOL_BROWSERS: int = int(os.getenv("POOL_BROWSERS", "1"))
+    POOL_CONTEXTS_PER_BROWSER: int = int(os.getenv("POOL_CONTEXTS_PER_BROWSER", "2"))
+    POOL_PAGES_PER_CONTEXT: int = int(os.getenv("POOL_PAGES_PER_CONTEXT", "2"))
+    POOL_LEASE_TIMEOUT: float = float(os.getenv("POOL_LEASE_TIMEOUT", "30"))  # segundos
+    # Politica de reciclagem: 0 desabilita
+    POOL_MAX_USES_PER_PAGE: int = int(os.getenv("POOL_MAX_USES_PER_PAGE", "50"))
+    POOL_MAX_USES_PER_CONTEXT: int = int(os.getenv("POOL_MAX_USES_PER_CONTEXT", "200"))
@@ -0,0 +1,52 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Junta chamadas identicas em andamento: enquanto uma busca com a mesma chave
+    estiver rodando, as outras esperam por ela e recebem o mesmo resultado
+    (inclusive dicionarios de erro e excecoes).
+    A busca roda numa task propria, entao cancelar quem esperava nao cancela a busca.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, chave: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        # Tasks sao presas ao event loop (scrape_oab roda em loops proprios)
+        chave_loop = (id(loop), chave)
+        task = self._calls.get(chave_loop)
+        if task is not None:
+            self.coalesced += 1
+            # Cada um recebe sua copia: quem chamou pode alterar o dicionario
+            return copy.deepcopy(await asyncio.shield(task))
+
+        self.executed += 1
+        task = loop.create_task(fn())
+        self._calls[chave_loop] = task
+        task.add_done_callback(lambda _: self._calls.pop(chave_loop, None))
+        return copy.deepcopy(await asyncio.shield(task))
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
+
+
+# Instancia global usada pelo scraper
+_singleflight = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    return _singleflight
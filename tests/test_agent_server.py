@@ -0,0 +1,202 @@
+"""
+Testes do servidor HTTP do agente (POST /query e stream SSE) e do pool de agentes
+"""
+
+import asyncio
+import json
+import threading
+import time
+import pytest
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from agent import agent_pool
+from agent import oab_tool
+from agent import tool_cache
+from agent.llm_agent import OABAgent
+from agent.agent_pool import AgentPool, AgentPoolTimeout
+from agent.config import Config
+from agent.tool_cache import ToolCache
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        body = json.dumps({"oab": "123456", "name": payload["name"].upper(), "uf": payload["uf"],
+                           "categoria": "ADVOGADO", "data_inscricao": "01/01/2000",
+                           "situacao": "Regular", "error": None}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    oab_tool.close_clients()
+    server.shutdown()
+    server.server_close()
+
+
+class AgenteLento:
+    """Agente falso: cada query leva 0.2s (bloqueando a thread, como o OABAgent)"""
+
+    construidos = 0
+
+    def __init__(self):
+        AgenteLento.construidos += 1
+        self.last_query = {}
+
+    def query(self, question: str) -> str:
+        time.sleep(0.2)
+        self.last_query = {"path": "llm", "tool_calls": 0, "cache_hits": 0, "elapsed": 0.2}
+        return f"resposta: {question}"
+
+
+def test_pool_responde_perguntas_simultaneas():
+    async def cenario():
+        AgenteLento.construidos = 0
+        pool = await AgentPool(size=4, factory=AgenteLento).start()
+        inicio = time.perf_counter()
+        respostas = await asyncio.gather(*(pool.query(f"pergunta {i}") for i in range(8)))
+        elapsed = time.perf_counter() - inicio
+        stats = pool.stats()
+        await pool.stop()
+        return respostas, elapsed, stats
+
+    respostas, elapsed, stats = asyncio.run(cenario())
+
+    assert [r for r, _ in respostas] == [f"resposta: pergunta {i}" for i in range(8)]
+    # 8 perguntas em 4 agentes: duas rodadas de 0.2s, sem construir agente novo
+    assert elapsed < 0.7
+    assert AgenteLento.construidos == 4
+    assert stats["total_queries"] == 8 and stats["paths"] == {"llm": 8}
+    assert max(info["wait"] for _, info in respostas) > 0.1
+
+
+def test_pool_sem_agente_livre():
+    async def cenario():
+        pool = await AgentPool(size=1, lease_timeout=0.05, factory=AgenteLento).start()
+        try:
+            await asyncio.gather(pool.query("a"), pool.query("b"))
+        finally:
+            await pool.stop()
+
+    with pytest.raises(AgentPoolTimeout):
+        asyncio.run(cenario())
+
+
+def test_servidor_query(api, monkeypatch):
+    monkeypatch.setattr(Config, "LLM_PROVIDER", "mock")
+    monkeypatch.setattr(Config, "SCRAPER_API_URL", f"http://127.0.0.1:{api.server_port}")
+    monkeypatch.setattr(Config, "AGENT_POOL_SIZE", 2)
+    from agent.server import app
+
+    with TestClient(app) as client:
+        health = client.get("/health").json()
+        assert health["agent_pool"]["size"] == 2
+        assert health["agent_pool"]["available"] == 2
+
+        response = client.post("/query", json={"question": "Qual a situação do advogado Fulano de Tal na UF SP?"})
+        assert response.status_code == 200
+        data = response.json()
+        assert "123456" in data["answer"]
+        assert data["path"] == "fast_path"
+        assert data["tool_calls"] == 1
+
+        assert client.post("/query", json={"question": "   "}).status_code == 400
+
+    assert agent_pool.get_agent_pool() is None
+
+
+def test_servidor_fecha_clients_da_ferramenta(api, monkeypatch):
+    monkeypatch.setattr(Config, "LLM_PROVIDER", "mock")
+    monkeypatch.setattr(Config, "SCRAPER_API_URL", f"http://127.0.0.1:{api.server_port}")
+    monkeypatch.setattr(Config, "AGENT_POOL_SIZE", 1)
+    monkeypatch.setattr(tool_cache, "_cache", ToolCache(enabled=False))  # toda chamada vai a API
+    from agent.server import app
+
+    pergunta = "Qual a situação do advogado Fulano de Tal na UF SP?"
+    with TestClient(app) as client:
+        client.post("/query", json={"question": pergunta})
+        client.post("/query/stream", json={"question": pergunta})
+        # Os agentes do servidor usam o mesmo modulo oab_tool que o shutdown fecha
+        clients = list(oab_tool._sync_clients.values())
+        aclients = [c for c, _ in oab_tool._async_clients.values()]
+
+    assert clients and all(c.is_closed for c in clients)
+    assert all(c.is_closed for c in aclients)
+    assert oab_tool._sync_clients == {}
+
+
+def eventos_sse(texto: str):
+    eventos = []
+    for bloco in texto.strip().split("\n\n"):
+        linhas = dict(linha.split(": ", 1) for linha in bloco.splitlines())
+        eventos.append((linhas["event"], json.loads(linhas["data"])))
+    return eventos
+
+
+def test_servidor_stream_sse(api, monkeypatch):
+    monkeypatch.setattr(Config, "LLM_PROVIDER", "mock")
+    monkeypatch.setattr(Config, "SCRAPER_API_URL", f"http://127.0.0.1:{api.server_port}")
+    monkeypatch.setattr(Config, "AGENT_POOL_SIZE", 1)
+    from agent.server import app
+
+    with TestClient(app) as client:
+        with client.stream("POST", "/query/stream",
+                           json={"question": "Qual a situação do advogado Fulano de Tal na UF SP?"}) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            eventos = eventos_sse(response.read().decode())
+
+        response = client.get("/query/stream", params={"question": "Como posso ajudar?"})
+        assert eventos_sse(response.text)[-1][0] == "final"
+
+    assert [tipo for tipo, _ in eventos] == ["tool_start", "tool_result", "token", "final"]
+    assert eventos[0][1]["input"] == {"name": "Fulano de Tal", "uf": "SP"}
+    final = eventos[-1][1]
+    assert "123456" in final["answer"]
+    assert final["path"] == "fast_path" and "wait" in final
+
+
+def test_astream_query_emite_tokens_da_resposta(api, monkeypatch):
+    llm = FakeListChatModel(responses=[
+        'Thought: Vou buscar\nAction: oab_search\nAction Input: {"name": "Fulano de Tal", "uf": "SP"}',
+        "Thought: Agora sei a resposta\nFinal Answer: A OAB é 123456.",
+    ])
+    monkeypatch.setattr(OABAgent, "_setup_llm", lambda self: llm)
+    agent = OABAgent(api_base_url=f"http://127.0.0.1:{api.server_port}", llm_provider="mock", fast_path=False)
+
+    async def coletar():
+        return [evento async for evento in agent.astream_query("Me fale do Fulano")]
+
+    eventos = asyncio.run(coletar())
+    tipos = [e["event"] for e in eventos]
+
+    assert tipos[:4] == ["thought", "tool_start", "tool_result", "thought"]
+    assert eventos[0]["text"] == "Vou buscar"
+    assert "123456" in eventos[2]["output"]
+    assert eventos[3]["text"] == "Agora sei a resposta"
+    # O modelo faz streaming: a resposta chega em varios trechos, antes do evento final
+    tokens = [e["text"] for e in eventos if e["event"] == "token"]
+    assert len(tokens) > 1 and "".join(tokens) == "A OAB é 123456."
+    assert eventos[-1]["event"] == "final" and eventos[-1]["answer"] == "A OAB é 123456."
+    assert agent.last_query["path"] == "llm" and agent.last_query["tool_calls"] == 1
@@ -0,0 +1,232 @@
+"""
+Testes para os backends de busca (backend HTTP contra um servidor local falso do CNA)
+"""
+
+import asyncio
+import json
+import threading
+import pytest
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.backends import HttpBackend, PlaywrightBackend, get_backend
+from scraper.oab_scraper import scrape_oab_async, scrape_oab_todos_async
+from scraper.registry import LawyerRegistry
+from scraper.name_index import NameIndex
+
+TOKEN = "token-de-teste"
+
+ADVOGADOS = [
+    {"Nome": "FULANO DE TAL", "TipoInscOab": "ADVOGADO", "Inscricao": "123456", "UF": "SP",
+     "DetailUrl": "/Home/DetailUrl?id=1"},
+] + [
+    {"Nome": "JOSE DA SILVA", "TipoInscOab": "ADVOGADO", "Inscricao": str(200000 + i), "UF": "RJ",
+     "DetailUrl": f"/Home/DetailUrl?id={10 + i}"}
+    for i in range(5)
+]
+
+POR_PAGINA = 2
+
+# DetailUrl pedidos ao servidor falso (um por situacao buscada)
+DETALHES = []
+
+
+def fake_ocr(img: bytes) -> str:
+    # Roda no pool de processos do OCR, precisa ser uma funcao de modulo
+    return "Regular" if img == b"imagem-falsa" else "Desconhecida"
+
+
+class StubCNAHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/":
+            html = f'<form><input name="__RequestVerificationToken" type="hidden" value="{TOKEN}" /></form>'
+            self._send(html.encode(), "text/html")
+        elif self.path.startswith("/Home/DetailUrl"):
+            DETALHES.append(self.path)
+            self._send(json.dumps({"Success": True, "Data": {"DetailUrl": "/Product/ViewImage?id=1"}}).encode(),
+                       "application/json")
+        elif self.path.startswith("/Product/ViewImage"):
+            self._send(b"imagem-falsa", "image/png")
+        else:
+            self._send(b"", "text/plain", 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        if form.get("__RequestVerificationToken") != [TOKEN]:
+            self._send(b"", "text/plain", 403)
+            return
+        nome = form.get("NomeAdvo", [""])[0].upper()
+        uf = form.get("Uf", [""])[0].upper()
+        data = [a for a in ADVOGADOS if a["Nome"] == nome and a["UF"] == uf]
+        pagina = int(form.get("Pagina", ["1"])[0])
+        total_paginas = max(1, -(-len(data) // POR_PAGINA))
+        data = data[(pagina - 1) * POR_PAGINA:pagina * POR_PAGINA]
+        self._send(json.dumps({"Success": True, "Data": data, "TotalPaginas": total_paginas}).encode(),
+                   "application/json")
+
+
+@pytest.fixture(scope="module")
+def stub_cna():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCNAHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def registro_vazio(tmp_path, monkeypatch):
+    # Registro local isolado: as consultas dos testes nao podem vir de um registro antigo
+    registry = LawyerRegistry(db_path=str(tmp_path / "registry.db"))
+    monkeypatch.setattr("scraper.registry._registry", registry)
+    monkeypatch.setattr("scraper.name_index._index", NameIndex())
+    yield
+    registry.close()
+
+
+def test_get_backend():
+    assert isinstance(get_backend("playwright"), PlaywrightBackend)
+    assert isinstance(get_backend("http"), HttpBackend)
+    with pytest.raises(ValueError):
+        get_backend("selenium")
+
+
+@pytest.mark.asyncio
+async def test_http_backend_found(stub_cna):
+    backend = HttpBackend(base_url=stub_cna, ocr=fake_ocr)
+    try:
+        result = await backend.buscar("FULANO DE TAL", "SP")
+    finally:
+        await backend.close()
+
+    assert result["nome"] == "FULANO DE TAL"
+    assert result["inscricao"] == "123456"
+    assert result["uf"] == "SP"
+    assert result["categoria"] == "ADVOGADO"
+    assert result["situacao"] == "Regular"
+    assert result["data_inscricao"] == "Nao encontrada"
+
+
+@pytest.mark.asyncio
+async def test_http_backend_closes_clients_of_every_loop(stub_cna):
+    backend = HttpBackend(base_url=stub_cna, ocr=fake_ocr)
+    # Outro event loop vivo numa thread (como o do OABClient) usando o mesmo backend
+    outro_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=outro_loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        await backend.buscar("FULANO DE TAL", "SP")
+        asyncio.run_coroutine_threadsafe(backend.buscar("FULANO DE TAL", "SP"), outro_loop).result(10)
+        clients = list(backend._clients.values())
+        assert len(clients) == 2 and clients[0] is not clients[1]
+
+        await backend.close()
+        # O client do outro loop fecha no proprio loop
+        for _ in range(100):
+            if all(c.is_closed for c in clients):
+                break
+            await asyncio.sleep(0.01)
+        assert all(c.is_closed for c in clients)
+        assert backend._clients == {}
+    finally:
+        outro_loop.call_soon_threadsafe(outro_loop.stop)
+        thread.join(5)
+        outro_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_http_backend_not_found(stub_cna):
+    backend = HttpBackend(base_url=stub_cna, ocr=fake_ocr)
+    try:
+        result = await backend.buscar("CICLANO DE TAL", "SP")
+    finally:
+        await backend.close()
+
+    assert "Nenhum resultado" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_http_backend_connection_error():
+    backend = HttpBackend(base_url="http://127.0.0.1:9", ocr=fake_ocr)
+    try:
+        result = await backend.buscar("FULANO DE TAL", "SP")
+    finally:
+        await backend.close()
+
+    assert "error" in result
+
+
+@pytest.mark.asyncio
+async def test_scrape_oab_async_invalid_backend():
+    result = await scrape_oab_async("FULANO DE TAL", "SP", backend="selenium")
+    assert "Backend invalido" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_http_backend_iterar_follows_pagination(stub_cna):
+    backend = HttpBackend(base_url=stub_cna, ocr=fake_ocr)
+    try:
+        itens = [item async for item in backend.iterar("JOSE DA SILVA", "RJ")]
+        limitados = [item async for item in backend.iterar("JOSE DA SILVA", "RJ", max_results=3)]
+    finally:
+        await backend.close()
+
+    assert [i["inscricao"] for i in itens] == [str(200000 + i) for i in range(5)]
+    assert all(i["situacao"] == "Regular" for i in itens)
+    assert len(limitados) == 3
+
+
+@pytest.mark.asyncio
+async def test_http_backend_iterar_early_stop(stub_cna):
+    backend = HttpBackend(base_url=stub_cna, ocr=fake_ocr)
+    vistos = []
+    try:
+        async for item in backend.iterar("JOSE DA SILVA", "RJ", com_situacao=False):
+            vistos.append(item)
+            if len(vistos) == 2:
+                break
+    finally:
+        await backend.close()
+
+    assert len(vistos) == 2
+    assert vistos[0]["situacao"] == "Nao encontrada"
+
+
+@pytest.mark.asyncio
+async def test_scrape_oab_todos_async(stub_cna, monkeypatch):
+    backend = HttpBackend(base_url=stub_cna, ocr=fake_ocr)
+    monkeypatch.setattr("scraper.backends._instances", {"http": backend})
+    try:
+        DETALHES.clear()
+        result = await scrape_oab_todos_async("JOSE DA SILVA", "RJ", max_results=4, backend="http")
+        # O quinto advogado (proxima pagina) so e sondado: nenhuma situacao buscada para ele
+        detalhes = len(DETALHES)
+        meio_da_pagina = await scrape_oab_todos_async("JOSE DA SILVA", "RJ", max_results=3, backend="http")
+        # Exatamente no limite: nao ha um sexto advogado, entao nao foi truncado
+        exato = await scrape_oab_todos_async("JOSE DA SILVA", "RJ", max_results=5, backend="http")
+        vazio = await scrape_oab_todos_async("NINGUEM DE TAL", "RJ", backend="http")
+    finally:
+        await backend.close()
+
+    assert result["total"] == 4
+    assert result["truncado"] is True
+    assert detalhes == 4
+    assert meio_da_pagina["total"] == 3 and meio_da_pagina["truncado"] is True
+    assert exato["total"] == 5 and exato["truncado"] is False
+    assert "error" in vazio
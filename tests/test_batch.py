@@ -0,0 +1,115 @@
+"""
+Testes para a consulta em lote (POST /fetch_oab/batch)
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper import api
+from scraper.name_index import NameIndex
+from scraper.result_cache import ResultCache
+from scraper.scraper_config import ScraperConfig
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Cache novo por teste para nao misturar resultados
+    cache = ResultCache(ttl=60, max_entries=100, stale_ttl=0)
+    monkeypatch.setattr(api, "get_result_cache", lambda: cache)
+    # Sugestoes de nome sem carregar o registro local
+    monkeypatch.setattr("scraper.name_index._index", NameIndex())
+    return TestClient(api.app)
+
+
+def ler_linhas(response):
+    return [json.loads(linha) for linha in response.text.splitlines() if linha.strip()]
+
+
+def test_batch_streams_every_item_with_index(client, monkeypatch):
+    async def fake_scrape(name, uf, backend=None):
+        if name == "QUEBRADO":
+            raise RuntimeError("site fora do ar")
+        if name == "INEXISTENTE":
+            return {"error": "Nenhum resultado encontrado"}
+        await asyncio.sleep(0.01)
+        return {"nome": name, "uf": uf, "inscricao": "123456", "situacao": "Ativo"}
+
+    monkeypatch.setattr(api, "scrape_oab_async", fake_scrape)
+    items = [
+        {"name": "FULANO DE TAL", "uf": "SP"},
+        {"name": "QUEBRADO", "uf": "SP"},
+        {"name": "INEXISTENTE", "uf": "RJ"},
+        {"name": "BELTRANO", "uf": "XX"},
+        {"name": "CICLANO", "uf": "MG"},
+    ]
+
+    response = client.post("/fetch_oab/batch", json={"items": items, "concurrency": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    linhas = {linha["index"]: linha for linha in ler_linhas(response)}
+    assert sorted(linhas) == [0, 1, 2, 3, 4]
+
+    # Uma falha nao derruba o resto do lote
+    assert linhas[0]["status"] == 200 and linhas[0]["result"]["oab"] == "123456"
+    assert linhas[1]["status"] == 500 and "site fora do ar" in linhas[1]["result"]["error"]
+    assert linhas[2]["status"] == 200 and linhas[2]["result"]["error"] == "Nenhum resultado encontrado"
+    assert linhas[3]["status"] == 400 and "UF invalida" in linhas[3]["result"]["error"]
+    assert linhas[4]["result"]["name"] == "CICLANO"
+
+
+def test_batch_reports_malformed_items_per_line(client, monkeypatch):
+    async def fake_scrape(name, uf, backend=None):
+        return {"nome": name, "uf": uf, "inscricao": "123456"}
+
+    monkeypatch.setattr(api, "scrape_oab_async", fake_scrape)
+    items = [
+        {"name": "FULANO DE TAL", "uf": "SP"},
+        {"name": "SEM UF"},
+        "nao e um objeto",
+        {"name": "BELTRANO", "uf": "SPX"},
+    ]
+
+    response = client.post("/fetch_oab/batch", json={"items": items})
+    assert response.status_code == 200
+
+    linhas = {linha["index"]: linha for linha in ler_linhas(response)}
+    assert linhas[0]["status"] == 200 and linhas[0]["result"]["oab"] == "123456"
+    assert linhas[1]["status"] == 422 and "uf: Field required" in linhas[1]["result"]["error"]
+    assert linhas[2]["status"] == 422 and linhas[2]["result"]["error"].startswith("Erro de validação")
+    assert linhas[3]["status"] == 422 and "uf:" in linhas[3]["result"]["error"]
+
+
+def test_batch_respects_concurrency_limit(client, monkeypatch):
+    rodando = 0
+    maximo = 0
+
+    async def fake_scrape(name, uf, backend=None):
+        nonlocal rodando, maximo
+        rodando += 1
+        maximo = max(maximo, rodando)
+        await asyncio.sleep(0.02)
+        rodando -= 1
+        return {"nome": name, "uf": uf}
+
+    monkeypatch.setattr(api, "scrape_oab_async", fake_scrape)
+    items = [{"name": f"ADVOGADO {i}", "uf": "SP"} for i in range(8)]
+
+    response = client.post("/fetch_oab/batch", json={"items": items, "concurrency": 3})
+    assert len(ler_linhas(response)) == 8
+    assert maximo == 3
+
+
+def test_batch_rejects_too_many_items(client, monkeypatch):
+    monkeypatch.setattr(ScraperConfig, "BATCH_MAX_ITEMS", 2)
+    items = [{"name": "FULANO", "uf": "SP"}] * 3
+
+    response = client.post("/fetch_oab/batch", json={"items": items})
+    assert response.status_code == 413
@@ -0,0 +1,164 @@
+"""
+Testes para o pool de browsers (com browser falso, sem Chromium) e o perfil de rotas
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.browser_pool import BrowserPool, PoolLeaseTimeout
+from scraper.metrics import BROWSER_POOL_PAGES
+from scraper.resource_blocking import RoutingProfile
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        return FakeContext()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePool(BrowserPool):
+    async def start(self):
+        self._playwright = None
+        return await super().start()
+
+    async def _launch_browser(self):
+        return FakeBrowser()
+
+
+@pytest.fixture(autouse=True)
+def fake_playwright(monkeypatch):
+    class FakeAsyncPlaywright:
+        async def start(self):
+            return None
+    monkeypatch.setattr("scraper.browser_pool.async_playwright", FakeAsyncPlaywright)
+
+
+@pytest.mark.asyncio
+async def test_pool_lease_and_release():
+    pool = await FakePool(browsers=1, contexts_per_browser=1, pages_per_context=2, lease_timeout=1).start()
+    assert pool.size == 2
+
+    async with pool.page() as page:
+        assert isinstance(page, FakePage)
+        assert pool.stats()["leased"] == 1
+        # O gauge acompanha o emprestimo, sem esperar uma leitura do /metrics
+        assert BROWSER_POOL_PAGES.value(state="leased") == 1
+        assert BROWSER_POOL_PAGES.value(state="available") == 1
+
+    assert pool.stats()["leased"] == 0
+    assert pool.stats()["available"] == 2
+    assert BROWSER_POOL_PAGES.value(state="leased") == 0
+    assert BROWSER_POOL_PAGES.value(state="available") == 2
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_lease_timeout():
+    pool = await FakePool(browsers=1, contexts_per_browser=1, pages_per_context=1, lease_timeout=0.05).start()
+
+    async with pool.page():
+        with pytest.raises(PoolLeaseTimeout):
+            await pool.acquire()
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_page_after_max_uses():
+    pool = await FakePool(browsers=1, contexts_per_browser=1, pages_per_context=1,
+                          max_uses_per_page=2, max_uses_per_context=0).start()
+
+    async with pool.page() as first:
+        pass
+    async with pool.page() as second:
+        assert second is first
+    async with pool.page() as third:
+        assert third is not first
+
+    assert first.closed
+    assert pool.stats()["recycled_pages"] == 1
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_discards_page_on_error():
+    pool = await FakePool(browsers=1, contexts_per_browser=1, pages_per_context=1).start()
+
+    with pytest.raises(ValueError):
+        async with pool.page() as page:
+            raise ValueError("navegacao quebrou")
+
+    async with pool.page() as other:
+        assert other is not page
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_context_after_max_uses():
+    pool = await FakePool(browsers=1, contexts_per_browser=1, pages_per_context=2,
+                          max_uses_per_page=0, max_uses_per_context=2).start()
+
+    slot_a = await pool.acquire()
+    slot_b = await pool.acquire()
+    old_context = slot_a.context_entry.context
+    await pool.release(slot_a)
+    await pool.release(slot_b)
+
+    assert old_context.closed
+    assert pool.stats()["recycled_contexts"] == 1
+    async with pool.page() as page:
+        assert page not in old_context.pages
+    await pool.stop()
+
+
+def test_routing_profile_rules():
+    perfil = RoutingProfile(
+        blocked_types=["image", "stylesheet", "font"],
+        allow_patterns=["*ViewImage*"],
+        deny_patterns=["*google-analytics.com*"],
+    )
+
+    assert perfil.permitido("https://cna.oab.org.br/", "document")
+    assert perfil.permitido("https://cna.oab.org.br/Scripts/busca.js", "script")
+    assert not perfil.permitido("https://cna.oab.org.br/Content/site.css", "stylesheet")
+    assert not perfil.permitido("https://cna.oab.org.br/Content/logo.png", "image")
+    assert not perfil.permitido("https://www.google-analytics.com/analytics.js", "script")
+    # A imagem de detalhe passa mesmo sendo do tipo image
+    assert perfil.permitido("https://cna.oab.org.br/Product/ViewImage?id=1", "image")
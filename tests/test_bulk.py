@@ -0,0 +1,143 @@
+"""
+Testes para a consulta em lote pelo CLI (CSV/JSONL com checkpoint)
+"""
+
+import asyncio
+import csv
+import io
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.bulk import Checkpoint, ler_entrada, run_bulk
+
+
+async def fake_scrape(name, uf, backend=None, max_age=None):
+    await asyncio.sleep(0.001)
+    if name.startswith("NINGUEM"):
+        return {"error": f"Nenhum resultado encontrado para: {name} - {uf}"}
+    return {"nome": name, "uf": uf, "inscricao": str(len(name)), "situacao": "Ativo"}
+
+
+def escrever_csv(path, linhas):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["nome", "uf"])
+        writer.writerows(linhas)
+
+
+def ler_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def test_ler_entrada_csv_and_jsonl(tmp_path):
+    escrever_csv(tmp_path / "in.csv", [["JOÃO DA SILVA", "SP"], ["", "RJ"]])
+    assert list(ler_entrada(str(tmp_path / "in.csv"))) == [(0, "JOÃO DA SILVA", "SP"), (1, "", "RJ")]
+
+    (tmp_path / "in.jsonl").write_text('{"name": "FULANO DE TAL", "uf": "MG"}\n\nnao e json\n', encoding="utf-8")
+    assert list(ler_entrada(str(tmp_path / "in.jsonl"))) == [(0, "FULANO DE TAL", "MG"), (1, "", "")]
+
+    with pytest.raises(ValueError):
+        list(ler_entrada(str(tmp_path / "in.txt")))
+
+
+def test_checkpoint_watermark_stays_small(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "cp.json"), "in.csv")
+    for index in [1, 2, 0, 4]:
+        checkpoint.marcar(index)
+    assert checkpoint.ate == 3 and checkpoint.extras == {4}
+    assert checkpoint.feito(2) and checkpoint.feito(4) and not checkpoint.feito(3)
+
+    checkpoint.salvar()
+    carregado = Checkpoint.carregar(str(tmp_path / "cp.json"), "in.csv")
+    assert carregado.ate == 3 and carregado.extras == {4}
+    with pytest.raises(ValueError):
+        Checkpoint.carregar(str(tmp_path / "cp.json"), "outro.csv")
+
+
+@pytest.mark.asyncio
+async def test_run_bulk_csv_to_jsonl(tmp_path):
+    escrever_csv(tmp_path / "in.csv", [["FULANO DE TAL", "SP"], ["NINGUEM AQUI", "RJ"], ["", "SP"]])
+    progresso = io.StringIO()
+
+    resumo = await run_bulk(str(tmp_path / "in.csv"), str(tmp_path / "out.jsonl"), concurrency=2,
+                            buscar=fake_scrape, progresso_out=progresso)
+
+    linhas = sorted(ler_jsonl(tmp_path / "out.jsonl"), key=lambda r: r["index"])
+    assert [r["index"] for r in linhas] == [0, 1, 2]
+    assert linhas[0]["oab"] == "13" and linhas[0]["error"] is None
+    assert linhas[1]["error"].startswith("Nenhum resultado")
+    assert "obrigatorios" in linhas[2]["error"]
+    assert resumo == {**resumo, "total": 3, "processed": 3, "errors": 2}
+    assert "3/3 (100.0%)" in progresso.getvalue() and "ETA" in progresso.getvalue()
+    assert not (tmp_path / "out.jsonl.checkpoint.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_run_bulk_resumes_after_interruption(tmp_path):
+    entrada = str(tmp_path / "in.csv")
+    saida = str(tmp_path / "out.csv")
+    escrever_csv(entrada, [[f"ADVOGADO NUMERO {i}", "SP"] for i in range(40)])
+    feitos = []
+
+    async def scrape_interrompido(name, uf, backend=None, max_age=None):
+        if len(feitos) >= 15:
+            # Simula o Ctrl+C no meio do lote
+            raise asyncio.CancelledError()
+        feitos.append(name)
+        return await fake_scrape(name, uf)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_bulk(entrada, saida, concurrency=4, buscar=scrape_interrompido, progresso_out=io.StringIO())
+    assert (tmp_path / "out.csv.checkpoint.json").exists()
+    with open(saida, newline="", encoding="utf-8") as f:
+        gravados = len(list(csv.DictReader(f)))
+    assert 0 < gravados <= 15
+
+    resumo = await run_bulk(entrada, saida, concurrency=4, buscar=fake_scrape, progresso_out=io.StringIO())
+    assert resumo["processed"] == 40 - gravados
+
+    with open(saida, newline="", encoding="utf-8") as f:
+        indices = sorted(int(row["index"]) for row in csv.DictReader(f))
+    # Cada linha aparece uma vez so, e o cabecalho nao foi repetido
+    assert indices == list(range(40))
+
+
+@pytest.mark.asyncio
+async def test_run_bulk_uses_browser_pool_for_playwright(tmp_path, monkeypatch):
+    escrever_csv(tmp_path / "in.csv", [[f"ADVOGADO NUMERO {i}", "SP"] for i in range(5)])
+    eventos = []
+
+    async def start_browser_pool(**kwargs):
+        eventos.append(("start", kwargs["context_setup"] is not None))
+
+    async def stop_browser_pool():
+        eventos.append(("stop", None))
+
+    async def scrape(name, uf, backend=None, max_age=None):
+        eventos.append(("scrape", backend))
+        if name.endswith("3"):
+            raise OSError("disco cheio")
+        return await fake_scrape(name, uf)
+
+    monkeypatch.setattr("scraper.browser_pool.start_browser_pool", start_browser_pool)
+    monkeypatch.setattr("scraper.browser_pool.stop_browser_pool", stop_browser_pool)
+    monkeypatch.setattr("scraper.bulk.scrape_oab_async", scrape)
+
+    resumo = await run_bulk(str(tmp_path / "in.csv"), str(tmp_path / "out.jsonl"), concurrency=2,
+                            backend="playwright", progresso_out=io.StringIO())
+
+    # Um pool para o lote inteiro, aberto antes da primeira linha e fechado no fim
+    assert eventos[0] == ("start", True) and eventos[-1] == ("stop", None)
+    assert [e for e in eventos if e[0] == "scrape"] == [("scrape", "playwright")] * 5
+    assert resumo["errors"] == 1
+
+    eventos.clear()
+    await run_bulk(str(tmp_path / "in.csv"), str(tmp_path / "out2.jsonl"), backend="http",
+                   progresso_out=io.StringIO())
+    assert {e[0] for e in eventos} == {"scrape"}
@@ -0,0 +1,54 @@
+"""
+Testes do CNA local dos benchmarks (benchmarks/cna_local.py) com o backend HTTP
+"""
+
+import sys
+import httpx
+import pytest
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+
+from scraper.backends import HttpBackend
+from cna_local import CNALocal, imagem_situacao
+
+
+def fake_ocr(img: bytes) -> str:
+    # Roda no pool de processos do OCR, precisa ser uma funcao de modulo
+    return "Regular" if img == imagem_situacao("Regular") else "Desconhecida"
+
+
+@pytest.fixture(scope="module")
+def cna():
+    with CNALocal(latency=0, detail_latency=0, results=5, page_size=2) as cna:
+        yield cna
+
+
+def test_pagina_inicial_tem_formulario(cna):
+    html = httpx.get(cna.base_url + "/").text
+    for seletor in ('id="txtName"', 'id="cmbSeccional"', 'id="btnFind"', 'id="divResult"',
+                    "__RequestVerificationToken", "imgDetail"):
+        assert seletor in html
+
+
+@pytest.mark.asyncio
+async def test_http_backend_contra_cna_local(cna):
+    backend = HttpBackend(base_url=cna.base_url, ocr=fake_ocr)
+    try:
+        result = await backend.buscar("Maria  da Silva", "SP")
+        todos = [item async for item in backend.iterar("MARIA DA SILVA", "SP")]
+        vazio = await backend.buscar("INEXISTENTE DA SILVA", "SP")
+    finally:
+        await backend.close()
+
+    assert result["nome"] == "MARIA DA SILVA"
+    assert result["uf"] == "SP"
+    assert result["situacao"] == "Regular"
+    assert result["data_inscricao"].count("/") == 2
+    # 5 advogados em 3 paginas, inscricoes deterministicas por nome/UF
+    assert [item["inscricao"] for item in todos][0] == result["inscricao"]
+    assert len({item["inscricao"] for item in todos}) == 5
+    assert "Nenhum resultado" in vazio["error"]
+    assert cna.requests["search"] >= 4
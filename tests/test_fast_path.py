@@ -0,0 +1,153 @@
+"""
+Testes do atalho sem LLM para perguntas com nome completo e UF explicitos
+"""
+
+import json
+import threading
+import pytest
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent import oab_tool
+from agent import tool_cache
+from agent.llm_agent import OABAgent
+from agent.fast_path import extrair_consulta, responder
+from agent.tool_cache import ToolCache
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.server.requisicoes.append(payload)
+        if payload["name"].upper().startswith("INEXISTENTE"):
+            data = {"error": "Nenhum resultado encontrado"}
+        else:
+            data = {"oab": "123456", "name": payload["name"].upper(), "uf": payload["uf"],
+                    "categoria": "ADVOGADO", "data_inscricao": "01/01/2000",
+                    "situacao": "Regular", "error": None}
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+    server.daemon_threads = True
+    server.requisicoes = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    oab_tool.close_clients()
+    server.shutdown()
+    server.server_close()
+
+
+class ContadorLLM:
+    """LLM falso que so conta as chamadas"""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def invoke(self, prompt, *args, **kwargs) -> str:
+        self.chamadas += 1
+        return "Final Answer: Para buscar um advogado, você precisa do nome completo e da UF/Seccional"
+
+    def __call__(self, prompt, *args, **kwargs) -> str:
+        return self.invoke(prompt)
+
+    def bind(self, **kwargs):
+        return self
+
+
+@pytest.fixture
+def agente(api, monkeypatch):
+    llm = ContadorLLM()
+    monkeypatch.setattr(tool_cache, "_cache", ToolCache(ttl=60, enabled=True))
+    monkeypatch.setattr(OABAgent, "_setup_llm", lambda self: llm)
+    agent = OABAgent(api_base_url=f"http://127.0.0.1:{api.server_port}", llm_provider="mock", fast_path=True)
+    return agent, llm
+
+
+@pytest.mark.parametrize("pergunta,esperado", [
+    ("Qual a situação do advogado Fulano de Tal na UF SP?", ("Fulano de Tal", "SP")),
+    ("nome: João da Silva, uf: sp", ("João da Silva", "SP")),
+    ("Qual a OAB de Maria Aparecida Dias Ribeiro Cruz em BA?", ("Maria Aparecida Dias Ribeiro Cruz", "BA")),
+    ("Dr. Pedro Álvares Cabral (RJ)", ("Pedro Álvares Cabral", "RJ")),
+    ("Ana Lima - MG", ("Ana Lima", "MG")),
+])
+def test_extrai_perguntas_diretas(pergunta, esperado):
+    assert extrair_consulta(pergunta) == esperado
+
+
+@pytest.mark.parametrize("pergunta", [
+    "Como posso ajudá-lo?",
+    "Quantos advogados existem em SP?",
+    "advogado João SP",                               # nome incompleto
+    "João da Silva de SP ou RJ?",                     # mais de uma UF
+    "Compare João da Silva e Maria Souza em SP",      # mais de um nome
+    "Qual a OAB de João da Silva em SP? E a data?",   # pede mais que a busca
+    "Mostre Pedro Cabral em MG",
+    "qual a situação de pedro cabral no estado de mg",  # sem marcador e sem maiusculas
+    "advogado Ana Paula de Souza em Sao Paulo SP",    # cidade depois do nome
+])
+def test_perguntas_ambiguas_vao_para_o_llm(pergunta):
+    assert extrair_consulta(pergunta) is None
+
+
+def test_resposta_do_modelo():
+    observacao = json.dumps({"oab": "123456", "name": "FULANO DE TAL", "uf": "SP", "categoria": "ADVOGADO",
+                             "data_inscricao": "01/01/2000", "situacao": "Regular"})
+    resposta = responder("Fulano de Tal", "SP", observacao)
+    assert "FULANO DE TAL (SP)" in resposta and "123456" in resposta and "Regular" in resposta
+
+    nao_achou = responder("Fulano de Tal", "SP", "Erro na busca: Nenhum resultado encontrado")
+    assert nao_achou == "Não encontrei nenhum advogado com o nome Fulano de Tal na seccional SP."
+
+
+def test_agente_responde_sem_llm(agente, api):
+    agent, llm = agente
+
+    resposta = agent.query("Qual a situação do advogado Fulano de Tal na UF SP?")
+
+    assert "123456" in resposta and "Regular" in resposta
+    assert llm.chamadas == 0
+    assert api.requisicoes == [{"name": "Fulano de Tal", "uf": "SP"}]
+    assert agent.last_query["path"] == "fast_path"
+    assert agent.last_query["tool_calls"] == 1
+    assert agent.last_query["elapsed"] >= 0
+
+    assert "Não encontrei" in agent.query("nome: Inexistente da Silva, uf: RJ")
+
+
+def test_agente_manda_ambiguas_para_o_llm(agente, api):
+    agent, llm = agente
+
+    agent.query("Quantos advogados existem em SP?")
+
+    assert llm.chamadas == 1
+    assert agent.last_query["path"] == "llm"
+    assert api.requisicoes == []
+
+
+def test_atalho_desligado(api, monkeypatch):
+    llm = ContadorLLM()
+    monkeypatch.setattr(OABAgent, "_setup_llm", lambda self: llm)
+    agent = OABAgent(api_base_url=f"http://127.0.0.1:{api.server_port}", llm_provider="mock", fast_path=False)
+
+    agent.query("Qual a situação do advogado Fulano de Tal na UF SP?")
+
+    assert agent.last_query["path"] == "llm"
+    assert llm.chamadas == 1
@@ -0,0 +1,139 @@
+"""
+Testes para a fila de jobs assincronos (SQLite)
+"""
+
+import asyncio
+import pytest
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper import api
+from scraper.job_queue import DONE, JobQueue, RUNNING
+from scraper.result_cache import ResultCache
+from scraper.scraper_config import ScraperConfig
+
+
+async def runner_ok(request):
+    await asyncio.sleep(0.01)
+    return {"name": request["name"], "uf": request["uf"]}
+
+
+@pytest.mark.asyncio
+async def test_job_runs_and_long_poll_returns_result(tmp_path):
+    queue = await JobQueue(runner_ok, db_path=str(tmp_path / "jobs.db"), workers=2, cleanup_interval=0).start()
+
+    job = queue.submit({"name": "FULANO DE TAL", "uf": "SP"})
+    assert job["status"] == "queued"
+
+    job = await queue.wait(job["job_id"], timeout=2)
+    assert job["status"] == "done"
+    assert job["result"] == {"name": "FULANO DE TAL", "uf": "SP"}
+    assert job["finished_at"] >= job["started_at"] >= job["created_at"]
+    assert await queue.wait("nao-existe", timeout=0) is None
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_job_failure_is_recorded(tmp_path):
+    async def runner_erro(request):
+        raise RuntimeError("UF invalida: XX")
+
+    queue = await JobQueue(runner_erro, db_path=str(tmp_path / "jobs.db"), workers=1, cleanup_interval=0).start()
+    job = await queue.wait(queue.submit({"name": "FULANO", "uf": "XX"})["job_id"], timeout=2)
+    assert job["status"] == "failed"
+    assert job["error"] == "UF invalida: XX"
+    assert queue.stats()["failed"] == 1
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_jobs_survive_restart(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    travado = asyncio.Event()
+
+    async def runner_lento(request):
+        await travado.wait()
+        return {}
+
+    queue = await JobQueue(runner_lento, db_path=db, workers=1, cleanup_interval=0).start()
+    rodando = queue.submit({"name": "A", "uf": "SP"})["job_id"]
+    na_fila = queue.submit({"name": "B", "uf": "SP"})["job_id"]
+    await asyncio.sleep(0.01)
+    assert queue.get(rodando)["status"] == "running"
+    # Processo cai com um job rodando e outro na fila
+    await queue.stop()
+
+    queue = await JobQueue(runner_ok, db_path=db, workers=1, cleanup_interval=0).start()
+    assert queue.recovered == 1
+    assert (await queue.wait(rodando, timeout=2))["status"] == "done"
+    assert (await queue.wait(na_fila, timeout=2))["result"] == {"name": "B", "uf": "SP"}
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_sqlite_errors(tmp_path):
+    queue = await JobQueue(runner_ok, db_path=str(tmp_path / "jobs.db"), workers=1, cleanup_interval=0,
+                           error_backoff=0.01).start()
+    atualizar = queue._atualizar
+    falhas = {RUNNING: 2, DONE: 2}
+
+    def atualizar_instavel(job_id, **campos):
+        if falhas.get(campos["status"], 0) > 0:
+            falhas[campos["status"]] -= 1
+            raise sqlite3.OperationalError("database is locked")
+        atualizar(job_id, **campos)
+
+    queue._atualizar = atualizar_instavel
+    try:
+        primeiro = queue.submit({"name": "FULANO DE TAL", "uf": "SP"})
+        job = await queue.wait(primeiro["job_id"], timeout=5)
+        assert job["status"] == "done"
+        # O mesmo worker continua pegando jobs depois dos erros
+        segundo = queue.submit({"name": "BELTRANO", "uf": "RJ"})
+        assert (await queue.wait(segundo["job_id"], timeout=5))["status"] == "done"
+        assert queue.stats()["db_errors"] == 4
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_removes_only_expired_finished_jobs(tmp_path):
+    queue = await JobQueue(runner_ok, db_path=str(tmp_path / "jobs.db"), workers=1,
+                           retention=60, cleanup_interval=0).start()
+    antigo = (await queue.wait(queue.submit({"name": "A", "uf": "SP"})["job_id"], timeout=2))["job_id"]
+    novo = (await queue.wait(queue.submit({"name": "B", "uf": "SP"})["job_id"], timeout=2))["job_id"]
+    queue._atualizar(antigo, finished_at=time.time() - 120)
+
+    assert queue.cleanup() == 1
+    assert queue.get(antigo) is None
+    assert queue.get(novo) is not None
+    await queue.stop()
+
+
+def test_jobs_api(tmp_path, monkeypatch):
+    async def fake_scrape(name, uf, backend=None):
+        return {"nome": name, "uf": uf, "inscricao": "123456"}
+
+    monkeypatch.setattr(ScraperConfig, "POOL_ENABLED", False)
+    monkeypatch.setattr(ScraperConfig, "JOBS_DB_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(api, "scrape_oab_async", fake_scrape)
+    cache = ResultCache(ttl=60, max_entries=100, stale_ttl=0)
+    monkeypatch.setattr(api, "get_result_cache", lambda: cache)
+
+    with TestClient(api.app) as client:
+        response = client.post("/jobs", json={"name": "FULANO DE TAL", "uf": "SP"})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        job = client.get(f"/jobs/{job_id}", params={"wait": 5}).json()
+        assert job["status"] == "done"
+        assert job["result"]["oab"] == "123456"
+
+        assert client.post("/jobs", json={"name": "FULANO", "uf": "XX"}).status_code == 400
+        assert client.get("/jobs/nao-existe").status_code == 404
@@ -0,0 +1,95 @@
+"""
+Testes do cache (SQLite) das respostas do LLM
+"""
+
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from langchain_core.language_models.fake import FakeListLLM
+
+from agent import llm_agent
+from agent.config import Config
+from agent.llm_cache import LLMCache, ProviderCache
+
+
+class LentoLLM(FakeListLLM):
+    """Modelo falso do LangChain que leva 0.05s por chamada"""
+
+    def _call(self, *args, **kwargs) -> str:
+        time.sleep(0.05)
+        return super()._call(*args, **kwargs)
+
+
+def test_persistencia_e_despejo(tmp_path):
+    db = str(tmp_path / "llm.db")
+    cache = LLMCache(db_path=db, max_entries=2)
+    cache.set("openai", "gpt|0.1", "p1", "r1", 1.5)
+    cache.set("openai", "gpt|0.1", "p2", "r2", 1.0)
+    assert cache.get("openai", "gpt|0.1", "p1") == "r1"  # p2 vira a menos usada
+    cache.set("openai", "gpt|0.1", "p3", "r3", 1.0)
+    cache.close()
+
+    reaberto = LLMCache(db_path=db, max_entries=2)
+    assert reaberto.get("openai", "gpt|0.1", "p2") is None
+    assert reaberto.get("openai", "gpt|0.1", "p1") == "r1"
+    assert reaberto.get("openai", "gpt|0.1", "p3") == "r3"
+    # Provedor, modelo/temperatura e prompt fazem parte da chave
+    assert reaberto.get("ollama", "gpt|0.1", "p1") is None
+    assert reaberto.get("openai", "gpt|0.7", "p1") is None
+
+    stats = reaberto.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2 and stats["misses"] == 3
+    assert stats["saved_seconds"] == 2.5
+
+
+def test_modelo_do_langchain_usa_o_cache():
+    store = LLMCache(db_path=":memory:")
+    llm = LentoLLM(responses=["primeira", "segunda"], cache=ProviderCache(store, "openai"))
+
+    assert llm.invoke("Question: Fulano de Tal SP") == "primeira"
+    assert llm.invoke("Question: Fulano de Tal SP") == "primeira"  # nao chamou o modelo de novo
+    assert llm.invoke("Question: Beltrano RJ") == "segunda"
+
+    stats = store.stats()
+    assert stats["hits"] == 1 and stats["entries"] == 2
+    assert stats["saved_seconds"] >= 0.05
+
+
+def test_cloudflare_usa_o_cache(monkeypatch):
+    monkeypatch.setattr(Config, "CF_ACCOUNT_ID", "conta")
+    monkeypatch.setattr(Config, "CF_API_TOKEN", "token")
+    chamadas = []
+
+    class Resposta:
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.data
+
+    def post(url, headers=None, json=None, timeout=None):
+        chamadas.append(json)
+        if json["messages"][1]["content"] == "falha":
+            return Resposta({"success": False, "errors": ["limite"]})
+        return Resposta({"success": True, "result": {"response": f"resposta {len(chamadas)}"}})
+
+    monkeypatch.setattr(llm_agent.requests, "post", post)
+    llm = llm_agent.CloudflareLLM(cache=LLMCache(db_path=":memory:"))
+
+    assert llm.invoke("pergunta") == "resposta 1"
+    assert llm.invoke("pergunta") == "resposta 1"
+    assert len(chamadas) == 1
+
+    # Erros do provedor nao ficam no cache
+    llm.invoke("falha")
+    llm.invoke("falha")
+    assert len(chamadas) == 3
@@ -0,0 +1,98 @@
+"""
+Testes para as metricas do scraper e o endpoint /metrics (formato do Prometheus)
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper import api
+from scraper.metrics import MetricsRegistry, LOOKUPS, LOOKUP_SECONDS, STAGE_SECONDS
+from scraper.name_index import NameIndex
+from scraper.oab_scraper import scrape_oab_async, situacao_da_imagem
+from scraper.registry import LawyerRegistry
+
+
+def test_histogram_and_counter_render():
+    registry = MetricsRegistry()
+    etapas = registry.histogram("teste_etapa_seconds", "Etapas", ["stage"], buckets=(0.1, 1.0))
+    consultas = registry.counter("teste_consultas_total", "Consultas", ["uf", "outcome"])
+    andamento = registry.gauge("teste_em_andamento", "Em andamento")
+
+    etapas.observe(0.05, stage="goto")
+    etapas.observe(0.5, stage="goto")
+    etapas.observe(5, stage="goto")
+    consultas.inc(uf="SP", outcome="success")
+    consultas.inc(2, uf="SP", outcome="success")
+    with andamento.track_inprogress():
+        assert andamento.value() == 1
+
+    texto = registry.render()
+    assert "# TYPE teste_etapa_seconds histogram" in texto
+    assert 'teste_etapa_seconds_bucket{stage="goto",le="0.1"} 1' in texto
+    assert 'teste_etapa_seconds_bucket{stage="goto",le="1"} 2' in texto
+    assert 'teste_etapa_seconds_bucket{stage="goto",le="+Inf"} 3' in texto
+    assert 'teste_etapa_seconds_sum{stage="goto"} 5.55' in texto
+    assert 'teste_etapa_seconds_count{stage="goto"} 3' in texto
+    assert 'teste_consultas_total{uf="SP",outcome="success"} 3' in texto
+    assert "teste_em_andamento 0" in texto
+
+    with pytest.raises(ValueError):
+        consultas.inc(uf="SP")
+
+
+class FakeBackend:
+    name = "http"
+
+    async def buscar(self, name_clean, uf_clean):
+        if name_clean.startswith("NINGUEM"):
+            return {"error": f"Nenhum resultado encontrado para: {name_clean} - {uf_clean}"}
+        if name_clean.startswith("QUEBRADO"):
+            return {"error": "Erro durante a busca HTTP: 503"}
+        return {"nome": name_clean, "uf": uf_clean, "inscricao": "123456"}
+
+
+@pytest.mark.asyncio
+async def test_scrape_oab_async_counts_outcomes_by_uf(tmp_path, monkeypatch):
+    registry = LawyerRegistry(db_path=str(tmp_path / "registry.db"))
+    monkeypatch.setattr("scraper.registry._registry", registry)
+    monkeypatch.setattr("scraper.name_index._index", NameIndex())
+    monkeypatch.setattr("scraper.backends._instances", {"http": FakeBackend()})
+    antes = {outcome: LOOKUPS.value(uf="AC", outcome=outcome) for outcome in ("success", "not_found", "error")}
+    cna_antes = LOOKUP_SECONDS.count(source="cna")
+
+    await scrape_oab_async("FULANO DE TAL", "AC", backend="http")
+    await scrape_oab_async("FULANO DE TAL", "AC", backend="http")  # do registro
+    await scrape_oab_async("NINGUEM AQUI", "AC", backend="http")
+    await scrape_oab_async("QUEBRADO DE TAL", "AC", backend="http")
+    registry.close()
+
+    assert LOOKUPS.value(uf="AC", outcome="success") - antes["success"] == 2
+    assert LOOKUPS.value(uf="AC", outcome="not_found") - antes["not_found"] == 1
+    assert LOOKUPS.value(uf="AC", outcome="error") - antes["error"] == 1
+    assert LOOKUP_SECONDS.count(source="cna") - cna_antes == 3
+
+
+@pytest.mark.asyncio
+async def test_ocr_stage_is_timed(monkeypatch):
+    async def fake_submit(fn, img_data):
+        return "Regular"
+
+    monkeypatch.setattr("scraper.oab_scraper.submit_ocr", fake_submit)
+    antes = STAGE_SECONDS.count(stage="ocr")
+    await situacao_da_imagem(b"imagem-de-teste-metricas")
+    assert STAGE_SECONDS.count(stage="ocr") == antes + 1
+
+
+def test_metrics_endpoint():
+    client = TestClient(api.app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE oab_stage_duration_seconds histogram" in response.text
+    assert "oab_lookups_in_flight 0" in response.text
+    assert 'oab_limiter_limit{scope="global"}' in response.text
@@ -0,0 +1,191 @@
+"""
+Testes para o indice de nomes (trigramas) e as sugestoes "voce quis dizer"
+"""
+
+import pytest
+import sys
+import time
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper import api
+from scraper.name_index import NameIndex, mesma_ordem, trigramas
+from scraper.registry import LawyerRegistry
+from scraper.result_cache import ResultCache
+from scraper.oab_scraper import normalizar_nome, scrape_oab_async
+
+ADVOGADOS = [
+    {"nome": "JOÃO CARLOS DA SILVA", "uf": "SP", "inscricao": "100001"},
+    {"nome": "JOÃO DA SILVA", "uf": "RJ", "inscricao": "200002"},
+    {"nome": "MARIA APARECIDA SOUZA", "uf": "SP", "inscricao": "100003"},
+    {"nome": "JOSÉ PEREIRA LIMA", "uf": "MG", "inscricao": "300004"},
+]
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = NameIndex()
+    index.add_many(ADVOGADOS)
+    registry = LawyerRegistry(db_path=str(tmp_path / "registry.db"))
+    monkeypatch.setattr("scraper.name_index._index", index)
+    monkeypatch.setattr("scraper.registry._registry", registry)
+    yield index
+    registry.close()
+
+
+def test_trigramas():
+    assert trigramas("ANA") == {"  A", " AN", "ANA", "NA "}
+
+
+def test_search_ranks_typos_accents_and_missing_middle_names(index):
+    # Sem acento e sem o nome do meio
+    assert index.search("joao silva", "SP")[0]["inscricao"] == "100001"
+    # Erro de digitacao
+    assert index.search("MARIA APARECIDA SOUSA")[0]["inscricao"] == "100003"
+    # Filtro por UF
+    assert [r["uf"] for r in index.search("JOAO DA SILVA", "RJ")] == ["RJ"]
+    assert index.search("JOAO DA SILVA", "RJ")[0]["score"] == 1.0
+    assert index.search("XYZ QWERTY") == []
+
+
+def _muitos_nomes() -> NameIndex:
+    index = NameIndex()
+    nomes = ["ANA", "BRUNO", "CARLOS", "DANIELA", "EDUARDO", "FERNANDA", "GUSTAVO", "HELENA"]
+    sobrenomes = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "COSTA", "RODRIGUES"]
+    i = 0
+    for a in nomes:
+        for b in sobrenomes:
+            for c in sobrenomes:
+                for uf in ("SP", "RJ", "MG", "RS"):
+                    index.add(f"{a} {b} {c}", uf, str(i))
+                    i += 1
+    return index
+
+
+def test_search_is_fast_on_many_names():
+    index = _muitos_nomes()
+    assert len(index) == 2048
+
+    for uf in ("SP", None):
+        # Melhor de algumas rodadas, para uma pausa da maquina nao derrubar o teste
+        medias = []
+        for _ in range(5):
+            inicio = time.perf_counter()
+            for _ in range(20):
+                index.search("DANIELA OLIVERA COSTA", uf)
+            medias.append((time.perf_counter() - inicio) / 20)
+        assert min(medias) < 0.001
+
+
+@pytest.mark.parametrize("query,uf,limit,min_score", [
+    ("DANIELA OLIVERA COSTA", "SP", 5, 0.3),
+    ("DANIELA OLIVERA COSTA", None, 10, 0.3),
+    ("ANA SILVA", "RJ", 5, 0.3),
+    ("GUSTAVO PEREIRA RODRIGUES", None, 10, 0.8),
+    ("HELENA SOUSA", "MG", 3, 0.5),
+])
+def test_search_matches_exhaustive_ranking(query, uf, limit, min_score):
+    # O corte pelos trigramas mais raros nao pode mudar o resultado
+    index = _muitos_nomes()
+    grams = trigramas(normalizar_nome(query))
+    esperado = []
+    for (uf_nome, inscricao), entrada in index._nomes.items():
+        if uf and uf_nome != uf:
+            continue
+        n = len(grams & entrada["grams"])
+        score = n / (len(grams) + len(entrada["grams"]) - n)
+        if score >= min_score:
+            esperado.append({"nome": entrada["nome"], "uf": uf_nome, "inscricao": inscricao, "score": round(score, 3)})
+    esperado.sort(key=lambda r: (-r["score"], r["nome"], r["inscricao"]))
+
+    assert index.search(query, uf, limit=limit, min_score=min_score) == esperado[:limit]
+
+
+def test_canonical_rewrites_only_unambiguous_close_names(index):
+    assert index.canonical("JOAO CARLOS DA SILVA", "SP") is None  # ja e o nome conhecido
+    assert index.canonical("JOAO CARLOS DA SILVAA", "SP") == "JOÃO CARLOS DA SILVA"
+    assert index.canonical("JOAO CARLOS", "SP") is None  # parecido demais com nada
+
+    index.add("JOAO CARLOS DA SILVB", "SP", "100009")
+    # Dois nomes diferentes empatados: nao reescreve
+    assert index.canonical("JOAO CARLOS DA SILV", "SP") is None
+
+
+def test_canonical_keeps_word_order(index):
+    index.add("JOAO SANTOS SILVA", "SP", "100010")
+    # Mesmos trigramas (score 1.0), mas os sobrenomes trocados sao outra pessoa
+    assert index.search("JOAO SILVA SANTOS", "SP")[0]["score"] == 1.0
+    assert index.canonical("JOAO SILVA SANTOS", "SP") is None
+    assert index.canonical("JOAO SANTOS SILVAA", "SP") == "JOAO SANTOS SILVA"
+    assert mesma_ordem("MARIA DA SILVA DA COSTA", "MARIA DA SILVA DA COSTAA")
+    assert mesma_ordem("JOAO SILVA", "JOAO CARLOS DA SILVA")
+    assert not mesma_ordem("JOAO SILVA SANTOS", "JOAO SANTOS SILVA")
+
+
+class FakeBackend:
+    name = "http"
+
+    def __init__(self, conhecidos):
+        self.conhecidos = conhecidos
+        self.consultas = []
+
+    async def buscar(self, name_clean, uf_clean):
+        self.consultas.append(name_clean)
+        if name_clean not in self.conhecidos:
+            return {"error": f"Nenhum resultado encontrado para: {name_clean} - {uf_clean}"}
+        return {"nome": name_clean, "uf": uf_clean, "inscricao": "100001"}
+
+
+@pytest.mark.asyncio
+async def test_scrape_oab_async_retries_not_found_with_known_name(index, monkeypatch):
+    backend = FakeBackend({"JOÃO CARLOS DA SILVA"})
+    monkeypatch.setattr("scraper.backends._instances", {"http": backend})
+
+    result = await scrape_oab_async("Joao Carlos da Silvaa", "SP", backend="http")
+    # Primeiro o nome consultado; o nome conhecido so depois do "Nenhum resultado"
+    assert backend.consultas == ["Joao Carlos da Silvaa", "JOÃO CARLOS DA SILVA"]
+    assert result["inscricao"] == "100001"
+    assert result["consulta_original"] == "Joao Carlos da Silvaa"
+    assert result["nome_corrigido"] == "JOÃO CARLOS DA SILVA"
+
+
+@pytest.mark.asyncio
+async def test_scrape_oab_async_keeps_names_the_cna_finds(index, monkeypatch):
+    backend = FakeBackend({"JOAO CARLOS DA SILVAA"})
+    monkeypatch.setattr("scraper.backends._instances", {"http": backend})
+
+    # Nome parecido com um conhecido, mas e outra pessoa que o CNA encontra
+    result = await scrape_oab_async("JOAO CARLOS DA SILVAA", "SP", backend="http")
+    assert backend.consultas == ["JOAO CARLOS DA SILVAA"]
+    assert result["nome"] == "JOAO CARLOS DA SILVAA" and "nome_corrigido" not in result
+
+
+@pytest.mark.asyncio
+async def test_scrape_oab_async_keeps_original_not_found(index, monkeypatch):
+    backend = FakeBackend(set())
+    monkeypatch.setattr("scraper.backends._instances", {"http": backend})
+
+    result = await scrape_oab_async("Joao Carlos da Silvaa", "SP", backend="http")
+    assert backend.consultas == ["Joao Carlos da Silvaa", "JOÃO CARLOS DA SILVA"]
+    assert result == {"error": "Nenhum resultado encontrado para: Joao Carlos da Silvaa - SP"}
+
+
+def test_api_suggestions(index, monkeypatch):
+    async def fake_scrape(name, uf, backend=None):
+        return {"error": f"Nenhum resultado encontrado para: {name} - {uf}"}
+
+    monkeypatch.setattr(api, "scrape_oab_async", fake_scrape)
+    cache = ResultCache(ttl=60, max_entries=100, stale_ttl=0)
+    monkeypatch.setattr(api, "get_result_cache", lambda: cache)
+    client = TestClient(api.app)
+
+    data = client.post("/fetch_oab", json={"name": "Joao Silva", "uf": "SP"}).json()
+    assert data["error"].startswith("Nenhum resultado")
+    assert data["suggestions"][0]["oab"] == "100001"
+
+    sugestoes = client.get("/suggest", params={"name": "maria souza", "uf": "SP"}).json()
+    assert sugestoes[0]["name"] == "MARIA APARECIDA SOUZA"
+    assert client.get("/suggest", params={"name": " "}).status_code == 400
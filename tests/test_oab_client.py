@@ -0,0 +1,212 @@
+"""
+Testes do cliente sincrono (OABClient) contra o CNA local dos benchmarks
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+
+from scraper import oab_client
+from scraper.backends import HttpBackend, PlaywrightBackend
+from scraper.browser_pool import BrowserPool
+from cna_local import CNALocal, imagem_situacao
+from scraper.name_index import NameIndex
+from scraper.oab_client import OABClient
+from scraper.oab_scraper import scrape_oab
+from scraper.rate_limiter import AdaptiveLimiter
+from scraper.registry import LawyerRegistry
+from scraper.scraper_config import ScraperConfig
+
+
+RAIZ = Path(__file__).parent.parent
+
+
+def fake_ocr(img: bytes) -> str:
+    # Roda no pool de processos do OCR, precisa ser uma funcao de modulo
+    return "Regular" if img == imagem_situacao("Regular") else "Desconhecida"
+
+
+@pytest.fixture(scope="module")
+def cna():
+    with CNALocal(latency=0.01, detail_latency=0) as cna:
+        yield cna
+
+
+@pytest.fixture
+def client(cna, tmp_path, monkeypatch):
+    registry = LawyerRegistry(db_path=str(tmp_path / "registry.db"))
+    monkeypatch.setattr("scraper.registry._registry", registry)
+    monkeypatch.setattr("scraper.name_index._index", NameIndex())
+    monkeypatch.setattr("scraper.rate_limiter._limiter", AdaptiveLimiter(enabled=False))
+    # Nomes parecidos de proposito: a reescrita trocaria um pelo outro
+    monkeypatch.setattr(ScraperConfig, "NAME_REWRITE_ENABLED", False)
+    monkeypatch.setattr("scraper.backends._instances", {"http": HttpBackend(base_url=cna.base_url, ocr=fake_ocr)})
+    client = OABClient(backend="http", max_age=0)
+    yield client
+    client.close()
+    registry.close()
+
+
+def test_lookup_reaproveita_loop_e_client_http(client):
+    from scraper import backends
+    backend = backends._instances["http"]
+
+    primeiro = client.lookup("MARIA DA SILVA", "SP")
+    http_client = backend._clients[client._loop]
+    segundo = client.lookup("JOAO DE SOUZA", "RJ")
+
+    assert primeiro["nome"] == "MARIA DA SILVA"
+    assert primeiro["situacao"] == "Regular"
+    assert segundo["uf"] == "RJ"
+    # Mesmo event loop e mesmo httpx.AsyncClient (keep-alive) nas duas consultas
+    assert backend._clients == {client._loop: http_client}
+    assert client.stats()["lookups"] == 2
+
+
+def test_lookup_many_mantem_a_ordem(client):
+    consultas = [(f"ADVOGADO TESTE {i}", "SP") for i in range(6)] + [("INEXISTENTE DA SILVA", "SP")]
+    resultados = client.lookup_many(consultas, concurrency=3)
+
+    assert [r.get("nome") for r in resultados[:6]] == [nome for nome, _ in consultas[:6]]
+    assert "Nenhum resultado" in resultados[6]["error"]
+
+
+def test_lookup_de_varias_threads(client):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        resultados = list(executor.map(lambda i: client.lookup(f"ADVOGADO THREAD {i}", "MG"), range(8)))
+
+    assert all(r["nome"] == f"ADVOGADO THREAD {i}" for i, r in enumerate(resultados))
+
+
+def test_close(client):
+    client.close()
+    client.close()
+
+    assert client.closed
+    assert not client._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        client.lookup("MARIA DA SILVA", "SP")
+
+
+def test_scrape_oab_usa_cliente_global(client, monkeypatch):
+    monkeypatch.setattr(oab_client, "_client", client)
+
+    assert scrape_oab("MARIA DA SILVA", "SP")["nome"] == "MARIA DA SILVA"
+    assert scrape_oab("MARIA DA SILVA", "BA")["uf"] == "BA"
+    assert client.stats()["lookups"] == 2
+
+
+class FakePage:
+    def is_closed(self):
+        return False
+
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    async def new_context(self):
+        return FakeContext()
+
+    async def close(self):
+        pass
+
+
+class FakePool(BrowserPool):
+    def __init__(self, **kwargs):
+        super().__init__(browsers=1, contexts_per_browser=1, pages_per_context=2, lease_timeout=5, **kwargs)
+
+    async def _launch_browser(self):
+        return FakeBrowser()
+
+
+@pytest.fixture
+def clientes_playwright(tmp_path, monkeypatch):
+    class FakeAsyncPlaywright:
+        async def start(self):
+            return None
+
+    paginas = []
+
+    async def fake_buscar_na_pagina(page, name_clean, uf_clean):
+        paginas.append((page, asyncio.get_running_loop()))
+        return {"nome": name_clean, "uf": uf_clean, "inscricao": str(len(paginas)), "situacao": "Regular"}
+
+    registry = LawyerRegistry(db_path=str(tmp_path / "registry.db"))
+    monkeypatch.setattr("scraper.registry._registry", registry)
+    monkeypatch.setattr("scraper.name_index._index", NameIndex())
+    monkeypatch.setattr("scraper.rate_limiter._limiter", AdaptiveLimiter(enabled=False))
+    monkeypatch.setattr(ScraperConfig, "NAME_REWRITE_ENABLED", False)
+    monkeypatch.setattr("scraper.backends._instances", {})
+    monkeypatch.setattr("scraper.browser_pool.async_playwright", FakeAsyncPlaywright)
+    monkeypatch.setattr("scraper.browser_pool.BrowserPool", FakePool)
+    monkeypatch.setattr("scraper.backends._buscar_na_pagina", fake_buscar_na_pagina)
+    clientes = [OABClient(backend="playwright", max_age=0, pool=True) for _ in range(2)]
+    yield clientes, paginas
+    for cliente in clientes:
+        cliente.close()
+    registry.close()
+
+
+def test_clientes_playwright_usam_o_proprio_pool(clientes_playwright):
+    clientes, paginas = clientes_playwright
+    primeiro, segundo = clientes
+
+    for i in range(3):
+        for cliente in clientes:
+            assert cliente.lookup(f"ADVOGADO POOL {i}", "SP")["nome"] == f"ADVOGADO POOL {i}"
+
+    assert primeiro._pool is not segundo._pool
+    assert all(cliente.stats()["pool"] for cliente in clientes)
+    # Cada consulta pegou uma pagina do pool do proprio cliente, dentro do loop dele
+    for indice, (page, loop) in enumerate(paginas):
+        cliente = clientes[indice % 2]
+        assert loop is cliente._loop
+        assert any(page is slot.page for entry in cliente._pool._browser_entries
+                   for contexto in entry.contexts for slot in contexto.slots)
+
+
+def test_pool_global_de_outro_loop_nao_e_reaproveitado(clientes_playwright, monkeypatch):
+    clientes, paginas = clientes_playwright
+    cliente = clientes[0]
+    # Pool global iniciado pelo loop de outro cliente (ou da API)
+    monkeypatch.setattr("scraper.browser_pool._pool", clientes[1]._pool)
+
+    async def pool_usado():
+        return PlaywrightBackend()._pool()
+
+    assert cliente._executar(pool_usado()) is None
+    assert clientes[1]._executar(pool_usado()) is clientes[1]._pool
+
+
+def test_import_do_pacote_sem_sys_path():
+    # Processo limpo, so com a raiz do projeto como diretorio atual (sem scraper/ no sys.path)
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    resultado = subprocess.run(
+        [sys.executable, "-c", "import scraper; from scraper import OABClient, scrape_oab; print(OABClient.__module__)"],
+        cwd=str(RAIZ), env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout.strip() == "scraper.oab_client"
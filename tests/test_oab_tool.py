@@ -0,0 +1,128 @@
+"""
+Testes da ferramenta oab_search contra uma API do scraper falsa
+"""
+
+import json
+import threading
+import pytest
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent import oab_tool
+from agent.oab_tool import OABSearchTool
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabecalho e corpo saem em writes separados: sem isso o keep-alive esbarra no delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        # Uma chamada por conexao TCP (keep-alive faz varias requisicoes por conexao)
+        self.server.conexoes += 1
+        super().handle()
+
+    def _send(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.server.requisicoes += 1
+        # Nome "INSTAVEL": a API falha com 503 nas primeiras requisicoes
+        if payload["name"] == "INSTAVEL" and self.server.falhas > 0:
+            self.server.falhas -= 1
+            self._send(503, {"detail": "reiniciando"})
+        elif payload["name"] == "INVALIDO":
+            self._send(400, {"detail": "Nome invalido"})
+        else:
+            self._send(200, {"oab": "123456", "name": payload["name"], "uf": payload["uf"],
+                             "categoria": "ADVOGADO", "data_inscricao": "01/01/2000",
+                             "situacao": "Regular", "error": None})
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+    server.daemon_threads = True
+    server.conexoes = 0
+    server.requisicoes = 0
+    server.falhas = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    oab_tool.close_clients()
+    server.shutdown()
+    server.server_close()
+
+
+def url(server) -> str:
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def test_run_reaproveita_conexao(api):
+    tool = OABSearchTool(api_base_url=url(api))
+    outra = OABSearchTool(api_base_url=url(api))
+
+    resultados = [tool._run("FULANO DE TAL", "SP") for _ in range(3)] + [outra._run("BELTRANO", "RJ")]
+
+    assert json.loads(resultados[0])["oab"] == "123456"
+    assert json.loads(resultados[3])["name"] == "BELTRANO"
+    assert api.requisicoes == 4
+    assert api.conexoes == 1
+
+
+def test_run_json_no_nome(api):
+    tool = OABSearchTool(api_base_url=url(api))
+
+    result = json.loads(tool.run('{"name": "FULANO DE TAL", "uf": "SP"}'))
+
+    assert result["uf"] == "SP"
+
+
+@pytest.mark.asyncio
+async def test_arun_nao_bloqueia(api):
+    import asyncio
+    tool = OABSearchTool(api_base_url=url(api))
+    try:
+        resultados = await asyncio.gather(*(tool._arun(f"ADVOGADO {i}", "MG") for i in range(5)))
+    finally:
+        await oab_tool.aclose_clients()
+
+    assert [json.loads(r)["name"] for r in resultados] == [f"ADVOGADO {i}" for i in range(5)]
+
+
+def test_retry_em_503(api):
+    api.falhas = 2
+    tool = OABSearchTool(api_base_url=url(api), retries=2, retry_backoff=0)
+
+    result = json.loads(tool._run("INSTAVEL", "SP"))
+
+    assert result["oab"] == "123456"
+    assert api.requisicoes == 3
+
+
+def test_sem_retry_em_erro_do_cliente(api):
+    tool = OABSearchTool(api_base_url=url(api), retries=2, retry_backoff=0)
+
+    result = tool._run("INVALIDO", "SP")
+
+    assert result.startswith("Erro na API: 400")
+    assert api.requisicoes == 1
+
+
+def test_erro_de_conexao():
+    tool = OABSearchTool(api_base_url="http://127.0.0.1:9", retries=1, retry_backoff=0, connect_timeout=1)
+
+    assert "Erro na conecao da API" in tool._run("Teste", "SP")
@@ -0,0 +1,83 @@
+"""
+Testes para a etapa de OCR (pool de processos e cache)
+"""
+
+import asyncio
+import time
+import pytest
+import sys
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.ocr_pool import OCRPool, OCRQueueFull
+from scraper.metrics import OCR_QUEUE_DEPTH
+from scraper.ocr_cache import OCRCache
+
+
+def ocr_lento(img: bytes) -> str:
+    # Roda num processo do pool, precisa ser uma funcao de modulo
+    time.sleep(0.3)
+    return img.decode().upper()
+
+
+@pytest.mark.asyncio
+async def test_ocr_pool_runs_off_loop():
+    pool = OCRPool(workers=2, queue_size=4, queue_timeout=5)
+    try:
+        resultados = await asyncio.gather(pool.submit(ocr_lento, b"regular"), pool.submit(ocr_lento, b"suspenso"))
+    finally:
+        pool.shutdown()
+
+    assert resultados == ["REGULAR", "SUSPENSO"]
+    stats = pool.stats()
+    assert stats["processed"] == 2
+    assert stats["queue_depth"] == 0
+    assert stats["latency_ms"]["p50"] > 0
+
+
+@pytest.mark.asyncio
+async def test_ocr_pool_backpressure():
+    pool = OCRPool(workers=1, queue_size=1, queue_timeout=0.05)
+    try:
+        primeira = asyncio.create_task(pool.submit(ocr_lento, b"regular"))
+        await asyncio.sleep(0.01)
+        assert pool.queue_depth == 1
+        assert OCR_QUEUE_DEPTH.value() == 1
+        with pytest.raises(OCRQueueFull):
+            await pool.submit(ocr_lento, b"suspenso")
+        assert await primeira == "REGULAR"
+        assert OCR_QUEUE_DEPTH.value() == 0
+    finally:
+        pool.shutdown()
+
+    assert pool.stats()["rejected"] == 1
+
+
+def test_ocr_cache_lru():
+    cache = OCRCache(max_entries=2, disk_dir="")
+    a, b, c = (cache.chave(img) for img in (b"a", b"b", b"c"))
+
+    assert cache.get(a) is None
+    cache.set(a, "Regular")
+    cache.set(b, "Suspenso")
+    assert cache.get(a) == "Regular"  # a passa a ser o mais recente
+    cache.set(c, "Cancelado")         # b sai
+
+    assert cache.get(b) is None
+    assert cache.get(c) == "Cancelado"
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["entries"] == 2
+
+
+def test_ocr_cache_disk(tmp_path):
+    chave = OCRCache.chave(b"imagem")
+    OCRCache(max_entries=10, disk_dir=str(tmp_path)).set(chave, "Regular")
+
+    # Outra instancia (ex: depois de reiniciar a API) le do disco
+    cache = OCRCache(max_entries=10, disk_dir=str(tmp_path))
+    assert cache.get(chave) == "Regular"
+    assert cache.stats()["hits"] == 1
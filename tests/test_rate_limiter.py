@@ -0,0 +1,156 @@
+"""
+Testes para o limitador adaptativo (AIMD) das consultas ao CNA
+"""
+
+import asyncio
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.rate_limiter import AdaptiveLimiter, AIMDWindow, descontar_espera, eh_falha
+from scraper.oab_scraper import iterar_oab_async
+from scraper.metrics import LIMITER_LIMIT
+
+
+def novo_limiter(**kwargs):
+    opcoes = dict(enabled=True, initial=2, min_limit=1, max_limit=8, uf_max_limit=8,
+                  min_gap=0, uf_min_gap=0, latency_target=5, decrease=0.5)
+    opcoes.update(kwargs)
+    return AdaptiveLimiter(**opcoes)
+
+
+def test_aimd_window_increases_and_decreases():
+    janela = AIMDWindow(initial=2, min_limit=1, max_limit=4, min_gap=0, latency_target=5)
+
+    janela.registrar(0.5, False, agora=100)
+    janela.registrar(0.5, False, agora=100)
+    assert janela.limit > 2
+
+    janela.registrar(0.5, True, agora=100)
+    limite = janela.limit
+    # Varias falhas da mesma rodada reduzem uma vez so
+    janela.registrar(0.5, True, agora=101)
+    assert janela.limit == limite
+    # Latencia acima do alvo tambem reduz
+    janela.registrar(9.0, False, agora=106)
+    assert janela.limit == max(1, limite * 0.5)
+    assert janela.failures == 2 and janela.slow == 1
+
+    for _ in range(100):
+        janela.registrar(0.1, False, agora=200)
+    assert janela.limit == 4
+
+
+def test_not_found_is_not_a_failure():
+    assert not eh_falha({"nome": "FULANO"})
+    assert not eh_falha({"error": "Nenhum resultado encontrado para: FULANO - SP"})
+    assert eh_falha({"error": "Erro durante a busca HTTP: 429 Too Many Requests"})
+    # Pool de browsers local lotado: o CNA nem foi consultado
+    assert not eh_falha({"error": "Servico ocupado, tente novamente: Nenhuma pagina livre no pool apos 30s"})
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_per_uf_and_global():
+    limiter = novo_limiter(initial=3, max_limit=3, uf_max_limit=2)
+    rodando = {"SP": 0, "RJ": 0, "total": 0}
+    maximo = {"SP": 0, "RJ": 0, "total": 0}
+
+    async def consulta(uf):
+        async with limiter.slot(uf):
+            for chave in (uf, "total"):
+                rodando[chave] += 1
+                maximo[chave] = max(maximo[chave], rodando[chave])
+            await asyncio.sleep(0.02)
+            for chave in (uf, "total"):
+                rodando[chave] -= 1
+
+    await asyncio.gather(*[consulta(uf) for uf in ["SP"] * 6 + ["RJ"] * 6])
+    assert maximo["SP"] <= 2 and maximo["RJ"] <= 2
+    assert maximo["total"] == 3
+    stats = limiter.stats()
+    assert stats["global"]["in_flight"] == 0
+    assert stats["ufs"]["SP"]["successes"] == 6
+
+
+@pytest.mark.asyncio
+async def test_limiter_min_gap_between_starts():
+    limiter = novo_limiter(initial=8, uf_min_gap=0.05)
+    inicios = []
+
+    async def consulta():
+        async with limiter.slot("SP"):
+            inicios.append(time.monotonic())
+
+    await asyncio.gather(*[consulta() for _ in range(4)])
+    intervalos = [b - a for a, b in zip(inicios, inicios[1:])]
+    assert all(intervalo >= 0.045 for intervalo in intervalos)
+
+
+@pytest.mark.asyncio
+async def test_limiter_backs_off_on_errors():
+    limiter = novo_limiter(initial=4)
+
+    async with limiter.slot("SP") as permissao:
+        permissao.resultado({"error": "Erro durante a navegacao ou busca: Timeout"})
+    with pytest.raises(RuntimeError):
+        async with limiter.slot("SP"):
+            raise RuntimeError("conexao recusada")
+
+    stats = limiter.stats()
+    assert stats["global"]["limit"] == 2
+    assert stats["ufs"]["SP"]["failures"] == 2
+    # O gauge muda junto com o limite
+    assert LIMITER_LIMIT.value(scope="global") == 2
+    assert LIMITER_LIMIT.value(scope="SP") == stats["ufs"]["SP"]["limit"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_limiter_is_a_no_op():
+    limiter = novo_limiter(enabled=False)
+    async with limiter.slot("SP") as permissao:
+        permissao.resultado({"error": "Erro"})
+    assert limiter.stats()["ufs"] == {}
+
+
+@pytest.mark.asyncio
+async def test_latency_excludes_local_wait_and_consumer_time():
+    limiter = novo_limiter(latency_target=0.05)
+
+    async with limiter.slot("SP") as permissao:
+        with permissao.medir():
+            await asyncio.sleep(0.1)
+            descontar_espera(0.09)  # fila do pool de browsers
+        await asyncio.sleep(0.1)  # depois da chamada ao backend
+
+    stats = limiter.stats()["ufs"]["SP"]
+    assert stats["latency_ewma"] < 0.05
+    assert stats["slow"] == 0 and stats["successes"] == 1
+
+
+class PaginasBackend:
+    name = "http"
+
+    async def iterar(self, name_clean, uf_clean, max_results=None, com_situacao=True, sondar=False):
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            yield {"nome": name_clean, "uf": uf_clean, "inscricao": str(i)}
+
+
+@pytest.mark.asyncio
+async def test_iterar_measures_only_backend_awaits(monkeypatch):
+    limiter = novo_limiter(latency_target=0.1)
+    monkeypatch.setattr("scraper.rate_limiter._limiter", limiter)
+    monkeypatch.setattr("scraper.backends._instances", {"http": PaginasBackend()})
+
+    itens = []
+    async for item in iterar_oab_async("FULANO DE TAL", "SP", backend="http"):
+        itens.append(item)
+        await asyncio.sleep(0.1)  # quem consome demora, com a vaga ainda presa
+
+    assert len(itens) == 3
+    stats = limiter.stats()["ufs"]["SP"]
+    assert stats["latency_ewma"] < 0.05 and stats["slow"] == 0
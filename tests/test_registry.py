@@ -0,0 +1,93 @@
+"""
+Testes para o registro local de advogados (SQLite)
+"""
+
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.registry import LawyerRegistry
+from scraper.name_index import NameIndex
+from scraper.oab_scraper import scrape_oab_async
+
+FULANO = {"nome": "JOÃO DA SILVA", "inscricao": "123456", "uf": "SP",
+          "categoria": "ADVOGADO", "data_inscricao": "01/01/2000", "situacao": "Ativo"}
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    registry = LawyerRegistry(db_path=str(tmp_path / "registry.db"), max_age=3600)
+    monkeypatch.setattr("scraper.registry._registry", registry)
+    monkeypatch.setattr("scraper.name_index._index", NameIndex())
+    yield registry
+    registry.close()
+
+
+def test_registry_indexes_by_inscricao_and_name(registry):
+    assert registry.save(FULANO)
+    assert not registry.save({"error": "Nenhum resultado encontrado"})
+    assert not registry.save({"nome": "SEM INSCRICAO", "uf": "SP", "inscricao": None})
+
+    assert registry.get("sp", "123456")["nome"] == "JOÃO DA SILVA"
+    # Nome sem acento, minusculo e com espacos extras acha o mesmo advogado
+    encontrados = registry.find_by_name("  joao da  silva ", "SP")
+    assert [r["inscricao"] for r in encontrados] == ["123456"]
+    assert registry.find_by_name("JOAO DA SILVA", "RJ") == []
+
+    # Mesma (uf, inscricao) atualiza em vez de duplicar
+    registry.save({**FULANO, "situacao": "Suspenso"})
+    assert registry.stats()["lawyers"] == 1
+    assert registry.get("SP", "123456")["situacao"] == "Suspenso"
+
+
+def test_registry_lookup_respects_max_age(registry):
+    registry.save(FULANO, fetched_at=time.time() - 7200)
+    assert registry.lookup("JOAO DA SILVA", "SP") is None
+    assert registry.lookup("JOAO DA SILVA", "SP", max_age=86400)["inscricao"] == "123456"
+    assert registry.lookup("JOAO DA SILVA", "SP", max_age=0) is None
+
+
+def test_registry_lookup_skips_homonyms(registry):
+    registry.save(FULANO)
+    assert registry.lookup("JOAO DA SILVA", "SP")["inscricao"] == "123456"
+
+    # Outro advogado com o mesmo nome (ex: de uma busca "todos"): qual e o do CNA fica para o CNA
+    registry.save({**FULANO, "inscricao": "654321"})
+    assert registry.lookup("JOAO DA SILVA", "SP") is None
+    assert registry.lookup("JOAO DA SILVA", "SP", max_age=86400) is None
+    assert registry.lookup("JOAO DA SILVA", "RJ") is None
+    assert len(registry.find_by_name("JOAO DA SILVA", "SP")) == 2
+
+
+class FakeBackend:
+    name = "http"
+
+    def __init__(self):
+        self.chamadas = 0
+
+    async def buscar(self, name_clean, uf_clean):
+        self.chamadas += 1
+        return dict(FULANO)
+
+
+@pytest.mark.asyncio
+async def test_scrape_oab_async_answers_from_registry(registry, monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr("scraper.backends._instances", {"http": backend})
+
+    primeiro = await scrape_oab_async("João da Silva", "SP", backend="http")
+    segundo = await scrape_oab_async("JOAO DA SILVA", "sp", backend="http")
+
+    # A segunda consulta vem do registro, sem ir ao CNA
+    assert backend.chamadas == 1
+    assert primeiro["inscricao"] == segundo["inscricao"] == "123456"
+    assert "fetched_at" in segundo
+    assert registry.stats()["hits"] == 1
+
+    # max_age=0 ignora o registro
+    await scrape_oab_async("JOAO DA SILVA", "SP", backend="http", max_age=0)
+    assert backend.chamadas == 2
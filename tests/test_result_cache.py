@@ -0,0 +1,139 @@
+"""
+Testes para o cache de resultados da API
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scraper.result_cache import ResultCache
+from scraper.oab_scraper import chave_consulta
+from scraper.singleflight import SingleFlight
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_chave_consulta_normaliza_nome():
+    assert chave_consulta("  João  da Silva ", "sp") == chave_consulta("JOAO DA SILVA", "SP")
+    assert chave_consulta("JOAO DA SILVA", "SP") != chave_consulta("JOAO DA SILVA", "RJ")
+    assert chave_consulta("JOAO DA SILVA", "SP") != chave_consulta("JOAO DA SILVA", "SP", "todos")
+
+
+@pytest.mark.asyncio
+async def test_result_cache_hit_and_ttl():
+    relogio = Relogio()
+    cache = ResultCache(ttl=60, max_entries=10, stale_ttl=0, clock=relogio)
+    chamadas = []
+
+    async def buscar():
+        chamadas.append(1)
+        return {"nome": "JOAO DA SILVA", "uf": "SP"}
+
+    result, cached, idade = await cache.obter("k", buscar)
+    assert not cached and idade is None
+
+    relogio.agora += 30
+    result, cached, idade = await cache.obter("k", buscar)
+    assert cached and idade == 30
+    assert result["nome"] == "JOAO DA SILVA"
+
+    # Depois do TTL (sem janela stale) busca de novo
+    relogio.agora += 31
+    result, cached, idade = await cache.obter("k", buscar)
+    assert not cached
+    assert len(chamadas) == 2
+
+
+@pytest.mark.asyncio
+async def test_result_cache_stale_while_revalidate():
+    relogio = Relogio()
+    cache = ResultCache(ttl=60, max_entries=10, stale_ttl=600, clock=relogio)
+    versoes = iter(["antigo", "novo"])
+
+    async def buscar():
+        return {"situacao": next(versoes)}
+
+    await cache.obter("k", buscar)
+    relogio.agora += 120
+
+    # Entrada vencida e servida enquanto atualiza em segundo plano
+    result, cached, idade = await cache.obter("k", buscar)
+    assert cached and idade == 120
+    assert result["situacao"] == "antigo"
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    result, cached, idade = await cache.obter("k", buscar)
+    assert cached and idade == 0
+    assert result["situacao"] == "novo"
+    assert cache.stats()["refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_result_cache_lru_and_errors():
+    cache = ResultCache(ttl=60, max_entries=2, stale_ttl=0)
+
+    async def erro():
+        return {"error": "Nenhum resultado encontrado"}
+
+    await cache.obter("erro", erro)
+    assert cache.get("erro") is None
+
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_singleflight_coalesces_identical_calls():
+    flight = SingleFlight()
+    chamadas = []
+
+    async def buscar():
+        chamadas.append(1)
+        await asyncio.sleep(0.05)
+        return {"error": "Nenhum resultado encontrado"}
+
+    resultados = await asyncio.gather(*[flight.do("k", buscar) for _ in range(5)])
+
+    # Uma so busca; todos recebem o mesmo resultado (inclusive erro), cada um com sua copia
+    assert len(chamadas) == 1
+    assert all(r == {"error": "Nenhum resultado encontrado"} for r in resultados)
+    assert resultados[0] is not resultados[1]
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 4}
+
+    # Terminada a busca, a proxima chamada busca de novo
+    await flight.do("k", buscar)
+    assert len(chamadas) == 2
+
+
+@pytest.mark.asyncio
+async def test_singleflight_cancelled_waiter_does_not_cancel_search():
+    flight = SingleFlight()
+
+    async def buscar():
+        await asyncio.sleep(0.05)
+        return {"nome": "JOAO DA SILVA"}
+
+    primeiro = asyncio.create_task(flight.do("k", buscar))
+    await asyncio.sleep(0)
+    segundo = asyncio.create_task(flight.do("k", buscar))
+    await asyncio.sleep(0)
+    primeiro.cancel()
+
+    assert (await segundo)["nome"] == "JOAO DA SILVA"
+    assert flight.stats()["executed"] == 1
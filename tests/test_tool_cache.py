@@ -0,0 +1,136 @@
+"""
+Testes da memoizacao das chamadas da ferramenta oab_search no agente
+"""
+
+import json
+import threading
+import pytest
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Adicionar path do projeto
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent import oab_tool
+from agent import tool_cache
+from agent.llm_agent import OABAgent
+from agent.tool_cache import ToolCache, chave_ferramenta, contar_consulta
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.server.requisicoes.append(payload)
+        body = json.dumps({"oab": "123456", "name": payload["name"].upper(), "uf": payload["uf"],
+                           "categoria": "ADVOGADO", "data_inscricao": "01/01/2000",
+                           "situacao": "Regular", "error": None}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+    server.daemon_threads = True
+    server.requisicoes = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    oab_tool.close_clients()
+    server.shutdown()
+    server.server_close()
+
+
+class RoteiroLLM:
+    """LLM falso que repete a mesma busca (com grafia diferente) antes de responder"""
+
+    def __init__(self):
+        self.passos = [
+            'Thought: Vou buscar\nAction: oab_search\nAction Input: {"name": "João da Silva", "uf": "SP"}',
+            'Thought: Vou conferir\nAction: oab_search\nAction Input: {"name": "JOAO  DA SILVA", "uf": "sp"}',
+            "Thought: Agora sei a resposta\nFinal Answer: OAB 123456",
+        ]
+        self.chamadas = 0
+
+    def invoke(self, prompt, *args, **kwargs) -> str:
+        passo = self.passos[min(self.chamadas, len(self.passos) - 1)]
+        self.chamadas += 1
+        return passo
+
+    def __call__(self, prompt, *args, **kwargs) -> str:
+        return self.invoke(prompt)
+
+    def bind(self, **kwargs):
+        return self
+
+
+def test_chave_normalizada():
+    assert chave_ferramenta("João  da Silva ", "sp") == chave_ferramenta("JOAO DA SILVA", "SP")
+    assert chave_ferramenta("João da Silva", None) is None
+
+
+def test_ttl_e_tamanho(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: agora[0])
+    cache = ToolCache(ttl=60, max_size=2, enabled=True)
+
+    cache.set("A|SP", "a")
+    cache.set("B|SP", "b")
+    assert cache.get("A|SP") == "a"
+    cache.set("C|SP", "c")  # B e o menos usado
+    assert cache.get("B|SP") is None
+
+    agora[0] += 61
+    assert cache.get("A|SP") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_ferramenta_usa_cache_e_conta_por_consulta(api):
+    cache = ToolCache(ttl=60, enabled=True)
+    tool = oab_tool.OABSearchTool(api_base_url=f"http://127.0.0.1:{api.server_port}", cache=cache)
+
+    with contar_consulta() as contagem:
+        primeiro = tool._run("Maria Souza", "RJ")
+        segundo = tool._run("MARIA SOUZA", "rj")
+    with contar_consulta() as outra:
+        tool._run("Maria Souza", "RJ")
+
+    assert primeiro == segundo
+    assert len(api.requisicoes) == 1
+    assert contagem == {"tool_calls": 2, "cache_hits": 1}
+    assert outra == {"tool_calls": 1, "cache_hits": 1}
+
+
+def test_erro_nao_fica_no_cache():
+    cache = ToolCache(ttl=60, enabled=True)
+    tool = oab_tool.OABSearchTool(api_base_url="http://127.0.0.1:9", retries=0, cache=cache)
+
+    tool._run("Maria Souza", "RJ")
+
+    assert cache.stats()["size"] == 0
+
+
+def test_agente_memoiza_entre_passos_e_queries(api, monkeypatch):
+    monkeypatch.setattr(tool_cache, "_cache", ToolCache(ttl=60, enabled=True))
+    monkeypatch.setattr(OABAgent, "_setup_llm", lambda self: RoteiroLLM())
+    agent = OABAgent(api_base_url=f"http://127.0.0.1:{api.server_port}", llm_provider="mock", fast_path=False)
+
+    assert "123456" in agent.query("Qual a OAB de João da Silva em SP?")
+    assert agent.last_query["tool_calls"] == 2
+    assert agent.last_query["cache_hits"] == 1
+
+    # Outra query (outro agente, mesmo cache do processo): nenhuma chamada nova a API
+    outro = OABAgent(api_base_url=f"http://127.0.0.1:{api.server_port}", llm_provider="mock",
+                     fast_path=False)
+    outro.query("Qual a OAB de João da Silva em SP?")
+    assert outro.last_query["cache_hits"] == 2
+    assert len(api.requisicoes) == 1